@@ -0,0 +1,106 @@
+"""
+A fake :code:`arduino-cli` for the benchmarks, answering every command with JSON after a set latency.
+
+It is configured through environment variables:
+
+* :code:`FAKE_ARDUINO_CLI_LATENCY`: the time taken by each command, in seconds (default 0)
+* :code:`FAKE_ARDUINO_CLI_OUTPUT_SIZE`: the approximate size of the output of the commands other than
+  :code:`version` and :code:`config`, in bytes (default 1024)
+* :code:`FAKE_ARDUINO_CLI_RETURNCODE`: the return code of the commands other than :code:`version` and
+  :code:`config` (default 0)
+
+The :code:`config init` and :code:`config set` commands really write the :code:`directories` of the configuration
+file, so that the bootstrap of the wrapper behaves as with the real :code:`arduino-cli`.
+
+Use :func:`install` to get an executable copy of it.
+"""
+import json
+import os
+import stat
+import sys
+import time
+
+VERSION = {"Application": "arduino-cli", "VersionString": "0.35.3", "Commit": "fake", "Status": "benchmark"}
+
+
+def install(directory):
+    """
+    Writes an executable copy of this script, run by the current interpreter
+
+    :param directory: The directory where the executable is written
+    :type directory: str
+    :return: The path to the executable
+    :rtype: str
+    """
+    path = os.path.join(directory, "arduino-cli")
+    with open(__file__, "r") as source, open(path, "w") as executable:
+        executable.write("#!%s\n" % sys.executable)
+        executable.write(source.read())
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
+
+
+def output(size):
+    """
+    Builds a :code:`lib search`-like output of about the given size
+
+    :param size: The size of the output, in bytes
+    :type size: int
+    :return: The output
+    :rtype: bytes
+    """
+    item = {"name": "Library", "latest": {"version": "1.0.0", "author": "pyduinocli", "sentence": "x" * 64,
+                                          "paragraph": "y" * 128, "website": "https://example.com"}}
+    item_size = len(json.dumps(item)) + 2
+    count = max(1, size // item_size)
+    libraries = ",".join(json.dumps(dict(item, name="Library%d" % i)) for i in range(count))
+    return ('{"libraries": [%s]}' % libraries).encode("utf-8")
+
+
+def _config_file(argv):
+    if "--config-file" in argv:
+        return argv[argv.index("--config-file") + 1]
+    return None
+
+
+def _write_directories(config_file, directories):
+    lines = ["directories:"] + ["    %s: %s" % (name, value) for name, value in sorted(directories.items())]
+    with open(config_file, "w") as config:
+        config.write("\n".join(lines) + "\n")
+
+
+def _read_directories(config_file):
+    directories = dict()
+    if config_file and os.path.isfile(config_file):
+        with open(config_file) as config:
+            for line in config:
+                if line.startswith("    ") and ":" in line:
+                    name, value = line.strip().split(":", 1)
+                    directories[name] = value.strip()
+    return directories
+
+
+def main(argv):
+    time.sleep(float(os.environ.get("FAKE_ARDUINO_CLI_LATENCY", "0")))
+    words = [word for word in argv if not word.startswith("--")]
+    if "version" in words:
+        sys.stdout.write(json.dumps(VERSION))
+        return 0
+    if "config" in words:
+        config_file = _config_file(argv)
+        if "init" in words:
+            config_file = argv[argv.index("--dest-file") + 1] if "--dest-file" in argv else config_file
+            _write_directories(config_file, dict())
+        elif "set" in words:
+            setting, value = argv[-2], argv[-1]
+            directories = _read_directories(config_file)
+            directories[setting.split(".", 1)[1]] = value
+            _write_directories(config_file, directories)
+        sys.stdout.write("{}")
+        return 0
+    sys.stdout.buffer.write(output(int(os.environ.get("FAKE_ARDUINO_CLI_OUTPUT_SIZE", "1024"))))
+    return int(os.environ.get("FAKE_ARDUINO_CLI_RETURNCODE", "0"))
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""
+Measures the time taken by :code:`import pyduinocli` in fresh interpreters, and lists the modules it loads that are
+not part of the standard library.
+
+Usage: :code:`python benchmarks/import_time.py [--runs N] [--json]`
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import sys, time, json
+before = set(sys.modules)
+start = time.perf_counter()
+import pyduinocli
+elapsed = time.perf_counter() - start
+stdlib = getattr(sys, "stdlib_module_names", ())
+loaded = sorted(m for m in set(sys.modules) - before
+                if not m.startswith("pyduinocli") and stdlib and m.split(".")[0].lstrip("_") not in stdlib
+                and m.split(".")[0] not in stdlib)
+print(json.dumps(dict(seconds=elapsed, third_party=loaded)))
+"""
+
+
+def measure(runs):
+    """
+    Imports pyduinocli in new interpreters
+
+    :param runs: The number of interpreters to start
+    :type runs: int
+    :return: The import times, in seconds, and the third party modules loaded
+    :rtype: dict
+    """
+    times = list()
+    third_party = set()
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True, env=env)
+        sample = json.loads(output.stdout)
+        times.append(sample["seconds"])
+        third_party.update(sample["third_party"])
+    return dict(runs=runs, min=min(times), median=statistics.median(times), max=max(times),
+                third_party=sorted(third_party))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+    results = measure(args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print("import pyduinocli: min %.1f ms, median %.1f ms, max %.1f ms over %d runs" % (
+        results["min"] * 1000, results["median"] * 1000, results["max"] * 1000, results["runs"]))
+    print("third party modules: %s" % (", ".join(results["third_party"]) or "none"))
+
+
+if __name__ == "__main__":
+    main()
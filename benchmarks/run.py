@@ -0,0 +1,245 @@
+"""
+Runs the pyduinocli benchmarks offline, against a fake :code:`arduino-cli` (see :code:`fake_arduino_cli.py`), and
+saves the results as JSON so that runs can be compared.
+
+Suites:
+
+* :code:`import`: time taken by :code:`import pyduinocli` in fresh interpreters
+* :code:`construction`: cost of creating an :code:`Arduino`, with a new configuration file, with a configuration
+  file that is already set up, and with the arguments of an existing instance
+* :code:`call`: per call overhead of the wrapper over running the same :code:`arduino-cli` process directly, and
+  cost of a call replayed from a cassette, which is the wrapper alone
+* :code:`parse`: cost of parsing outputs from 1 KB to 50 MB, whole and item by item
+* :code:`throughput`: calls per second from 1 to 64 concurrent threads and processes
+
+Usage: :code:`python benchmarks/run.py [--suites import,call] [--output results.json] [--compare baseline.json]`
+"""
+import argparse
+import concurrent.futures
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_arduino_cli  # noqa: E402
+import import_time  # noqa: E402
+
+SUITES = ("import", "construction", "call", "parse", "throughput")
+PARSE_SIZES = (1024, 64 * 1024, 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024)
+WORKERS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def _stats(times):
+    return dict(runs=len(times), min_seconds=min(times), median_seconds=statistics.median(times),
+                max_seconds=max(times))
+
+
+def _timed(function, runs):
+    times = list()
+    for _ in range(runs):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return _stats(times)
+
+
+class Bench:
+    """
+    The environment of a benchmark run: the fake :code:`arduino-cli`, its configuration and the options of the run
+    """
+
+    def __init__(self, directory, quick, latency, max_workers):
+        self.directory = directory
+        self.quick = quick
+        self.latency = latency
+        self.max_workers = max_workers
+        self.cli = fake_arduino_cli.install(directory)
+        self.__configs = itertools.count()
+
+    def runs(self, full):
+        return max(1, full // 10) if self.quick else full
+
+    def config_file(self):
+        return os.path.join(self.directory, "arduino-cli-%d.yaml" % next(self.__configs))
+
+    @staticmethod
+    def fake(latency=0.0, output_size=1024):
+        os.environ["FAKE_ARDUINO_CLI_LATENCY"] = str(latency)
+        os.environ["FAKE_ARDUINO_CLI_OUTPUT_SIZE"] = str(output_size)
+
+
+def bench_import(bench):
+    results = import_time.measure(bench.runs(20))
+    return dict(min_seconds=results["min"], median_seconds=results["median"], max_seconds=results["max"],
+                runs=results["runs"], third_party=results["third_party"])
+
+
+def bench_construction(bench):
+    import pyduinocli
+    Bench.fake()
+    sizes = itertools.count(1000)
+    config_file = bench.config_file()
+    pyduinocli.Arduino(bench.cli, config_file=config_file)
+    return dict(
+        new_config=_timed(lambda: pyduinocli.Arduino(bench.cli, config_file=bench.config_file()), bench.runs(10)),
+        existing_config=_timed(lambda: pyduinocli.Arduino(bench.cli, config_file=config_file,
+                                                          cache_size=next(sizes)), bench.runs(100)),
+        shared=_timed(lambda: pyduinocli.Arduino(bench.cli, config_file=config_file), bench.runs(10000)),
+    )
+
+
+def bench_call(bench):
+    import pyduinocli
+    Bench.fake()
+    runs = bench.runs(200)
+    config_file = bench.config_file()
+    cassette = os.path.join(bench.directory, "call.cassette")
+    arduino = pyduinocli.Arduino(bench.cli, config_file=config_file, record_to=cassette)
+    command = arduino.lib._base_args + ["search", "benchmark"]
+    raw = _timed(lambda: subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE), runs)
+    wrapped = _timed(lambda: arduino.lib.search(["benchmark"]), runs)
+    arduino.close()
+    replayer = pyduinocli.Arduino(bench.cli, config_file=config_file, replay_from=cassette)
+    replayed = _timed(lambda: replayer.lib.search(["benchmark"]), bench.runs(10000))
+    replayer.close()
+    return dict(raw_subprocess=raw, wrapper=wrapped, replayed=replayed,
+                overhead_seconds=wrapped["median_seconds"] - raw["median_seconds"])
+
+
+def bench_parse(bench):
+    from pyduinocli.commands import result
+    results = dict()
+    for size in PARSE_SIZES:
+        if bench.quick and size > 1024 * 1024:
+            continue
+        data = fake_arduino_cli.output(size)
+        runs = max(3, bench.runs(min(1000, 50 * 1024 * 1024 // (size * 10) + 3)))
+        whole = _timed(lambda: result.CommandResult(0, data, b"").result, runs)
+        items = _timed(lambda: sum(1 for _ in result.CommandResult(0, data, b"").iter_items("libraries")), runs)
+        results[str(size)] = dict(bytes=len(data), whole=whole, items=items,
+                                  whole_bytes_per_second=len(data) / whole["median_seconds"],
+                                  items_bytes_per_second=len(data) / items["median_seconds"])
+    result.loads(b"{}")
+    results["json"] = result._fast_json.__name__
+    return results
+
+
+def _search(arduino, query):
+    return arduino.lib.search([query])["result"]
+
+
+def _throughput(pool_class, arduino, workers, calls):
+    with pool_class(workers) as pool:
+        list(pool.map(_search, itertools.repeat(arduino, workers), ("warmup%d" % i for i in range(workers))))
+        start = time.perf_counter()
+        list(pool.map(_search, itertools.repeat(arduino, calls), ("query%d" % i for i in range(calls))))
+        elapsed = time.perf_counter() - start
+    return dict(workers=workers, calls=calls, seconds=elapsed, calls_per_second=calls / elapsed)
+
+
+def bench_throughput(bench):
+    import pyduinocli
+    Bench.fake(latency=bench.latency)
+    arduino = pyduinocli.Arduino(bench.cli, config_file=bench.config_file())
+    results = dict(latency=bench.latency, threads=dict(), processes=dict())
+    for workers in WORKERS:
+        if workers > bench.max_workers:
+            continue
+        calls = workers * (2 if bench.quick else 8)
+        results["threads"][str(workers)] = _throughput(concurrent.futures.ThreadPoolExecutor, arduino, workers,
+                                                       calls)
+        results["processes"][str(workers)] = _throughput(concurrent.futures.ProcessPoolExecutor, arduino,
+                                                         workers, calls)
+    return results
+
+
+def _flatten(results, prefix=""):
+    for key, value in results.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            yield from _flatten(value, name + ".")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and \
+                (key == "median_seconds" or key.endswith("_per_second")):
+            yield name, value
+
+
+def compare(baseline, results, threshold):
+    """
+    Compares the results of two runs
+
+    :param baseline: The results of the reference run
+    :type baseline: dict
+    :param results: The results of the new run
+    :type results: dict
+    :param threshold: The relative slowdown from which a metric is reported as a regression, e.g. 0.2 for 20%
+    :type threshold: float
+    :return: The lines of the report and the names of the regressed metrics
+    :rtype: tuple
+    """
+    reference = dict(_flatten(baseline))
+    lines = list()
+    regressions = list()
+    for name, value in _flatten(results):
+        if name not in reference or reference[name] <= 0 or value <= 0:
+            continue
+        slowdown = reference[name] / value - 1 if name.endswith("_per_second") else value / reference[name] - 1
+        regressed = slowdown > threshold
+        if regressed:
+            regressions.append(name)
+        lines.append("%-70s %12.6g -> %12.6g %+7.1f%%%s" % (name, reference[name], value, slowdown * 100,
+                                                          "  REGRESSION" if regressed else ""))
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--suites", default=",".join(SUITES), help="Comma separated suites to run")
+    parser.add_argument("--output", help="Path to the JSON file where the results are saved")
+    parser.add_argument("--compare", help="Path to the JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative slowdown reported as a regression (default 0.2)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Latency of the fake arduino-cli in the throughput suite, in seconds")
+    parser.add_argument("--max-workers", type=int, default=64, help="Max concurrency of the throughput suite")
+    parser.add_argument("--quick", action="store_true", help="Fewer runs and smaller outputs")
+    args = parser.parse_args()
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error("unknown suites: %s" % ", ".join(sorted(unknown)))
+    functions = {"import": bench_import, "construction": bench_construction, "call": bench_call,
+                 "parse": bench_parse, "throughput": bench_throughput}
+    results = dict(meta=dict(python=sys.version.split()[0], implementation=platform.python_implementation(),
+                             platform=platform.platform(), cpus=os.cpu_count(), time=time.time(),
+                             quick=args.quick))
+    with tempfile.TemporaryDirectory() as directory:
+        bench = Bench(directory, args.quick, args.latency, args.max_workers)
+        for suite in suites:
+            print("running %s..." % suite, file=sys.stderr)
+            results[suite] = functions[suite](bench)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    if args.compare:
+        with open(args.compare) as file:
+            lines, regressions = compare(json.load(file), results, args.threshold)
+        print("\n".join(lines), file=sys.stderr)
+        if regressions:
+            print("%d regressions" % len(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,12 @@
 from pyduinocli.commands.arduino import ArduinoCliCommand as Arduino
+from pyduinocli.aio.arduino import AsyncArduinoCliCommand as AsyncArduino
+from pyduinocli.commands.handle import ArduinoHandle
+from pyduinocli.commands.hooks import CommandHook, CommandCall
+from pyduinocli.commands.metrics import MetricsRegistry
+from pyduinocli.commands.tracing import Tracer
 from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.errors.arduinotimeouterror import ArduinoTimeoutError
+from pyduinocli.errors.arduinocancellederror import ArduinoCancelledError
+from pyduinocli.errors.arduinoreplayerror import ArduinoReplayError
+from pyduinocli.executors.deadline import Deadline, CancellationToken
+from pyduinocli.executors.progress import Progress, ProgressEvent
@@ -0,0 +1,136 @@
+"""
+Command line interface of pyduinocli, installed as the :code:`pyduinocli` console script.
+
+:code:`pyduinocli batch` runs JSON lines jobs on a single :code:`arduino-cli` wrapper, so that a pipeline issuing many
+commands only pays for the interpreter startup and the bootstrap once:
+
+.. code-block:: shell
+
+    printf '%s\\n' '{"id": "a", "command": "board details", "args": ["arduino:avr:uno"]}' \\
+                   '{"id": "b", "command": "compile", "args": ["Blink"], "kwargs": {"fqbn": "arduino:avr:uno"}}' \\
+        | pyduinocli batch --jobs 8
+
+See :func:`pyduinocli.batch.parse_job` and :func:`pyduinocli.batch.run_job` for the formats of the jobs and results.
+
+:code:`pyduinocli serve` runs the same jobs for several clients through a local HTTP service, see
+:func:`pyduinocli.service.serve`.
+"""
+import argparse
+import os
+import sys
+
+
+def _arduino(args, **options):
+    import pyduinocli
+    return pyduinocli.Arduino(args.cli_path, config_file=args.config_file,
+                              additional_urls=args.additional_urls.split(",") if args.additional_urls else None,
+                              backend=args.backend, daemons=args.daemons, cache_results=args.cache_results,
+                              keep_output=False, file_locks=args.file_locks, trace_file=args.trace_file,
+                              compile_scheduler=args.compile_scheduler or None, build_dirs=args.build_dirs,
+                              **options)
+
+
+def _batch(args):
+    from pyduinocli.batch import run_batch
+    arduino = _arduino(args)
+    source = sys.stdin if args.input in (None, "-") else open(args.input)
+    output = sys.stdout if args.output in (None, "-") else open(args.output, "w")
+
+    def write(line):
+        output.write(line + "\n")
+        output.flush()
+
+    try:
+        succeeded, failed = run_batch(arduino, source, write, jobs=args.jobs)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+        arduino.close()
+    if not args.quiet:
+        print("%d jobs succeeded, %d failed" % (succeeded, failed), file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _serve(args):
+    from pyduinocli.service import JobService, serve
+    arduino = _arduino(args, metrics=True)
+    service = JobService(arduino, workers=args.workers, max_queue=args.max_queue)
+    server = serve(service, args.host, args.port, verbose=not args.quiet)
+    if not args.quiet:
+        print("Serving on http://%s:%d" % server.server_address[:2], file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        arduino.close()
+    return 0
+
+
+def _add_arduino_arguments(parser):
+    parser.add_argument("--cli-path", default="arduino-cli", help="The arduino-cli executable")
+    parser.add_argument("--config-file", help="The arduino-cli configuration file")
+    parser.add_argument("--additional-urls", help="Comma separated URLs to custom board definitions files")
+    parser.add_argument("--backend", choices=("subprocess", "daemon"), default="subprocess",
+                        help="Run each command in its own process or through arduino-cli daemons")
+    parser.add_argument("--daemons", type=int, help="The number of daemons with the daemon backend")
+    parser.add_argument("--cache-results", action="store_true", help="Cache the outputs of the read-only commands")
+    parser.add_argument("--file-locks", action="store_true",
+                        help="Lock the data and configuration directories against other processes")
+    parser.add_argument("--compile-scheduler", action="store_true",
+                        help="Share the CPUs between the concurrent builds instead of running each with all of them")
+    parser.add_argument("--build-dirs",
+                        help="Keep a build directory per sketch and board in this directory for incremental builds")
+    parser.add_argument("--trace-file",
+                        help="Write a Chrome trace of the arduino-cli invocations to this file, named after the "
+                             "process id")
+
+
+def main(argv=None):
+    """
+    Runs the :code:`pyduinocli` command line
+
+    :param argv: The arguments, those of the process if None
+    :type argv: list or NoneType
+    :return: The exit code
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(prog="pyduinocli", description="Wrapper library around arduino-cli")
+    subparsers = parser.add_subparsers(dest="action")
+    subparsers.required = True
+    batch = subparsers.add_parser("batch", help="Run JSON lines jobs and write their results as JSON lines",
+                                  description="Reads one job per line, e.g. {\"id\": 1, \"command\": \"board details\", "
+                                              "\"args\": [\"arduino:avr:uno\"]}, runs them in parallel on a single "
+                                              "arduino-cli wrapper and writes their results in completion order. "
+                                              "Exits with 1 if a job failed.")
+    batch.add_argument("input", nargs="?", help="The file with the jobs, the standard input if missing or -")
+    batch.add_argument("-o", "--output", help="The file where the results are written, the standard output if missing")
+    batch.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 4,
+                       help="The max number of jobs running at the same time (default: the number of CPUs)")
+    _add_arduino_arguments(batch)
+    batch.add_argument("-q", "--quiet", action="store_true", help="Do not print the summary to the standard error")
+    batch.set_defaults(run=_batch)
+    serve = subparsers.add_parser("serve", help="Run a local HTTP service queuing arduino-cli jobs",
+                                  description="Serves a JSON API to queue compile, upload, board, lib and core jobs "
+                                              "and read their status, see pyduinocli.service.serve. All the clients "
+                                              "share one arduino-cli wrapper and its caches.")
+    serve.add_argument("--host", default="127.0.0.1", help="The address to listen on (default: 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=8080, help="The port to listen on (default: 8080)")
+    serve.add_argument("-j", "--workers", type=int, default=os.cpu_count() or 4,
+                       help="The max number of jobs running at the same time (default: the number of CPUs)")
+    serve.add_argument("--max-queue", type=int, default=1024, help="The max number of jobs waiting to run")
+    _add_arduino_arguments(serve)
+    serve.add_argument("-q", "--quiet", action="store_true", help="Do not log the requests")
+    serve.set_defaults(run=_serve)
+    args = parser.parse_args(argv)
+    if getattr(args, "jobs", 1) < 1 or getattr(args, "workers", 1) < 1:
+        parser.error("the number of jobs must be at least 1")
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,208 @@
+from pyduinocli.aio.commands import (
+    AsyncBoardCommand, AsyncBurnBootloaderCommand, AsyncCacheCommand, AsyncCompileCommand,
+    AsyncCompletionCommand, AsyncConfigCommand, AsyncCoreCommand, AsyncDaemonCommand,
+    AsyncDebugCommand, AsyncLibCommand, AsyncMonitorCommand, AsyncOutdatedCommand,
+    AsyncSketchCommand, AsyncUpdateCommand, AsyncUpgradeCommand, AsyncUploadCommand,
+    AsyncVersionCommand
+)
+from pyduinocli.commands.arduino import ArduinoCliCommand
+
+
+class AsyncArduinoCliCommand:
+    """
+    Asynchronous version of :class:`pyduinocli.commands.arduino.ArduinoCliCommand`. It exposes the same command
+    wrappers, whose methods take the same arguments and return the same results, but must be awaited. Many commands
+    can run concurrently from a single event loop.
+
+    Creating an instance is still blocking, since it goes through the setup of
+    :class:`pyduinocli.commands.arduino.ArduinoCliCommand`, so it should be created before entering the loop or
+    once per application.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Takes the same parameters as :class:`pyduinocli.commands.arduino.ArduinoCliCommand`
+        """
+        self.__arduino = ArduinoCliCommand(*args, **kwargs)
+        self.__commands = dict()
+
+    def __command(self, command_class):
+        command = self.__commands.get(command_class)
+        if command is None:
+            command = command_class(self.__arduino._base_args, self.__arduino._context)
+            command = self.__commands.setdefault(command_class, command)
+        return command
+
+    @property
+    def sync(self):
+        """
+        The blocking wrapper sharing the configuration of this one
+
+        :type: :class:`pyduinocli.commands.arduino.ArduinoCliCommand`
+        """
+        return self.__arduino
+
+    @property
+    def board(self):
+        """
+        The asynchronous board command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncBoardCommand`
+        """
+        return self.__command(AsyncBoardCommand)
+
+    @property
+    def cache(self):
+        """
+        The asynchronous cache command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncCacheCommand`
+        """
+        return self.__command(AsyncCacheCommand)
+
+    @property
+    def compile(self):
+        """
+        The asynchronous compile command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncCompileCommand`
+        """
+        return self.__command(AsyncCompileCommand)
+
+    @property
+    def config(self):
+        """
+        The asynchronous config command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncConfigCommand`
+        """
+        return self.__command(AsyncConfigCommand)
+
+    @property
+    def core(self):
+        """
+        The asynchronous core command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncCoreCommand`
+        """
+        return self.__command(AsyncCoreCommand)
+
+    @property
+    def daemon(self):
+        """
+        The asynchronous daemon command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncDaemonCommand`
+        """
+        return self.__command(AsyncDaemonCommand)
+
+    @property
+    def debug(self):
+        """
+        The asynchronous debug command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncDebugCommand`
+        """
+        return self.__command(AsyncDebugCommand)
+
+    @property
+    def lib(self):
+        """
+        The asynchronous lib command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncLibCommand`
+        """
+        return self.__command(AsyncLibCommand)
+
+    @property
+    def sketch(self):
+        """
+        The asynchronous sketch command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncSketchCommand`
+        """
+        return self.__command(AsyncSketchCommand)
+
+    @property
+    def upload(self):
+        """
+        The asynchronous upload command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncUploadCommand`
+        """
+        return self.__command(AsyncUploadCommand)
+
+    @property
+    def version(self):
+        """
+        The asynchronous version command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncVersionCommand`
+        """
+        return self.__command(AsyncVersionCommand)
+
+    @property
+    def burn_bootloader(self):
+        """
+        The asynchronous burn-bootloader command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncBurnBootloaderCommand`
+        """
+        return self.__command(AsyncBurnBootloaderCommand)
+
+    @property
+    def completion(self):
+        """
+        The asynchronous completion command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncCompletionCommand`
+        """
+        return self.__command(AsyncCompletionCommand)
+
+    @property
+    def outdated(self):
+        """
+        The asynchronous outdated command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncOutdatedCommand`
+        """
+        return self.__command(AsyncOutdatedCommand)
+
+    @property
+    def update(self):
+        """
+        The asynchronous update command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncUpdateCommand`
+        """
+        return self.__command(AsyncUpdateCommand)
+
+    @property
+    def upgrade(self):
+        """
+        The asynchronous upgrade command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncUpgradeCommand`
+        """
+        return self.__command(AsyncUpgradeCommand)
+
+    @property
+    def monitor(self):
+        """
+        The asynchronous monitor command wrapper for this :code:`arduino-cli` wrapper
+
+        :type: :class:`pyduinocli.aio.commands.AsyncMonitorCommand`
+        """
+        return self.__command(AsyncMonitorCommand)
+
+    def close(self):
+        """
+        Releases the resources held by this wrapper
+        """
+        self.__arduino.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
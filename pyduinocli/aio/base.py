@@ -0,0 +1,27 @@
+from pyduinocli.commands.base import CommandBase
+from pyduinocli.commands.hooks import CommandCall
+from pyduinocli.executors.progress import Progress
+
+
+class AsyncCommandBase(CommandBase):
+    """
+    Makes a command wrapper asynchronous. Mixed in before a command wrapper class, the methods of that class build
+    their arguments the same way but return coroutines that run :code:`arduino-cli` without blocking the event loop.
+    """
+
+    async def _iter(self, args, key=None):
+        result = await self._exec(args)
+        for item in result.iter_items(key):
+            yield item
+
+    async def _run(self, command, on_progress=None):
+        call = CommandCall.begin(self._context, command)
+        if call is None:
+            with Progress(on_progress):
+                returncode, stdout, stderr = await self._executor.execute_async(command)
+            return self._result(returncode, stdout, stderr)
+        with call:
+            with Progress(on_progress):
+                returncode, stdout, stderr = await self._executor.execute_async(call.command)
+            call.done(returncode, stdout, stderr)
+            return self._result(returncode, stdout, stderr, call)
@@ -0,0 +1,120 @@
+from pyduinocli.aio.base import AsyncCommandBase
+from pyduinocli.commands.board import BoardCommand
+from pyduinocli.commands.burn_bootloader import BurnBootloaderCommand
+from pyduinocli.commands.cache import CacheCommand
+from pyduinocli.commands.compile import CompileCommand
+from pyduinocli.commands.completion import CompletionCommand
+from pyduinocli.commands.config import ConfigCommand
+from pyduinocli.commands.core import CoreCommand
+from pyduinocli.commands.daemon import DaemonCommand
+from pyduinocli.commands.debug import DebugCommand
+from pyduinocli.commands.lib import LibCommand
+from pyduinocli.commands.monitor import MonitorCommand
+from pyduinocli.commands.outdated import OutdatedCommand
+from pyduinocli.commands.sketch import SketchCommand
+from pyduinocli.commands.update import UpdateCommand
+from pyduinocli.commands.upgrade import UpgradeCommand
+from pyduinocli.commands.upload import UploadCommand
+from pyduinocli.commands.version import VersionCommand
+
+
+class AsyncBoardCommand(AsyncCommandBase, BoardCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.board.BoardCommand`, its methods must be awaited
+    """
+
+
+class AsyncBurnBootloaderCommand(AsyncCommandBase, BurnBootloaderCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.burn_bootloader.BurnBootloaderCommand`, its methods must be awaited
+    """
+
+
+class AsyncCacheCommand(AsyncCommandBase, CacheCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.cache.CacheCommand`, its methods must be awaited
+    """
+
+
+class AsyncCompileCommand(AsyncCommandBase, CompileCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.compile.CompileCommand`, its methods must be awaited
+    """
+
+
+class AsyncCompletionCommand(AsyncCommandBase, CompletionCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.completion.CompletionCommand`, its methods must be awaited
+    """
+
+
+class AsyncConfigCommand(AsyncCommandBase, ConfigCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.config.ConfigCommand`, its methods must be awaited
+    """
+
+
+class AsyncCoreCommand(AsyncCommandBase, CoreCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.core.CoreCommand`, its methods must be awaited
+    """
+
+
+class AsyncDaemonCommand(AsyncCommandBase, DaemonCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.daemon.DaemonCommand`, its methods must be awaited
+    """
+
+
+class AsyncDebugCommand(AsyncCommandBase, DebugCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.debug.DebugCommand`, its methods must be awaited
+    """
+
+
+class AsyncLibCommand(AsyncCommandBase, LibCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.lib.LibCommand`, its methods must be awaited
+    """
+
+
+class AsyncMonitorCommand(AsyncCommandBase, MonitorCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.monitor.MonitorCommand`, its methods must be awaited
+    """
+
+
+class AsyncOutdatedCommand(AsyncCommandBase, OutdatedCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.outdated.OutdatedCommand`, its methods must be awaited
+    """
+
+
+class AsyncSketchCommand(AsyncCommandBase, SketchCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.sketch.SketchCommand`, its methods must be awaited
+    """
+
+
+class AsyncUpdateCommand(AsyncCommandBase, UpdateCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.update.UpdateCommand`, its methods must be awaited
+    """
+
+
+class AsyncUpgradeCommand(AsyncCommandBase, UpgradeCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.upgrade.UpgradeCommand`, its methods must be awaited
+    """
+
+
+class AsyncUploadCommand(AsyncCommandBase, UploadCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.upload.UploadCommand`, its methods must be awaited
+    """
+
+
+class AsyncVersionCommand(AsyncCommandBase, VersionCommand):
+    """
+    Asynchronous version of :class:`pyduinocli.commands.version.VersionCommand`, its methods must be awaited
+    """
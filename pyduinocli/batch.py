@@ -0,0 +1,154 @@
+import concurrent.futures
+import json
+import time
+from pyduinocli.commands.base import CommandBase
+from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.executors.deadline import Deadline
+
+
+class BatchJobError(ValueError):
+    """
+    Raised when a job description is invalid, e.g. when its command does not exist
+    """
+    pass
+
+
+def resolve(arduino, command):
+    """
+    Gets the wrapper method running a command, e.g. :code:`arduino.board.details` for :code:`"board details"`
+
+    :param arduino: The wrapper
+    :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+    :param command: The command path, as a string (e.g. :code:`"lib update-index"`) or a list of names
+    :type command: str or list
+    :return: The method
+    :rtype: callable
+    """
+    names = command.split() if isinstance(command, str) else list(command)
+    if not names or not all(isinstance(name, str) for name in names):
+        raise BatchJobError("Invalid command: %r" % (command,))
+    unknown = BatchJobError("Unknown command: %s" % " ".join(names))
+    if any(name.startswith("_") for name in names):
+        raise unknown
+    # only the sub-command wrappers and their methods can be reached, not the rest of the API
+    target = getattr(arduino, names[0].replace("-", "_"), None)
+    if not isinstance(target, CommandBase) or target is arduino:
+        raise unknown
+    for name in names[1:]:
+        owner = target
+        target = getattr(owner, name.replace("-", "_"), None)
+        if getattr(target, "__self__", None) is not owner:
+            raise unknown
+    if not callable(target):
+        raise unknown
+    return target
+
+
+def parse_job(line, number):
+    """
+    Parses a job description, a JSON object with:
+
+    * :code:`command`: the command path, e.g. :code:`"compile"` or :code:`"board details"`
+    * :code:`args` (optional): the positional arguments of the wrapper method
+    * :code:`kwargs` (optional): the keyword arguments of the wrapper method
+    * :code:`id` (optional): the ID of the job, repeated in its result, the line number if missing
+    * :code:`timeout` (optional): the max time the job can take, in seconds
+
+    :param line: The JSON line
+    :type line: str
+    :param number: The line number
+    :type number: int
+    :return: The job
+    :rtype: dict
+    """
+    try:
+        job = json.loads(line)
+    except ValueError as e:
+        raise BatchJobError("Invalid JSON: %s" % e)
+    if not isinstance(job, dict) or "command" not in job:
+        raise BatchJobError("A job must be an object with a command")
+    job.setdefault("id", number)
+    if not isinstance(job.setdefault("args", []), list):
+        raise BatchJobError("args must be an array")
+    if not isinstance(job.setdefault("kwargs", {}), dict):
+        raise BatchJobError("kwargs must be an object")
+    return job
+
+
+def run_job(arduino, job, cancel=None):
+    """
+    Runs a job and describes its outcome
+
+    :param arduino: The wrapper running the job
+    :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+    :param job: The job, see :func:`parse_job`
+    :type job: dict
+    :param cancel: A token to cancel the job from another thread
+    :type cancel: pyduinocli.executors.deadline.CancellationToken or NoneType
+    :return: The result of the job: its :code:`id`, :code:`command`, :code:`ok`, :code:`duration` in seconds and
+        either the :code:`result` of the command, or an :code:`error` with its :code:`type`, and either a
+        :code:`message` or, when the command failed or was interrupted, its :code:`returncode`, :code:`result` and
+        :code:`stderr`
+    :rtype: dict
+    """
+    outcome = dict(id=job["id"], command=job["command"])
+    start = time.monotonic()
+    try:
+        method = resolve(arduino, job["command"])
+        with Deadline(timeout=job.get("timeout"), cancel=cancel):
+            result = method(*job["args"], **job["kwargs"])
+        outcome.update(ok=True, result=result["result"])
+    except ArduinoError as e:
+        result = e.result
+        outcome.update(ok=False, error=dict(type=type(e).__name__, returncode=result.returncode,
+                                            result=result.result, stderr=result.stderr))
+    except Exception as e:
+        outcome.update(ok=False, error=dict(type=type(e).__name__, message=str(e)))
+    outcome["duration"] = time.monotonic() - start
+    return outcome
+
+
+def run_batch(arduino, lines, write, jobs=4):
+    """
+    Runs jobs read from JSON lines and writes their results as they complete. At most :code:`2 * jobs` jobs are read
+    ahead, so the input can be a stream of any length.
+
+    :param arduino: The wrapper running the jobs, shared by all of them
+    :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+    :param lines: The job descriptions, one JSON object per line, see :func:`parse_job`
+    :type lines: iterable
+    :param write: Called with each result as a JSON line, see :func:`run_job`, in completion order
+    :type write: callable
+    :param jobs: The max number of jobs running at the same time
+    :type jobs: int
+    :return: The number of jobs that succeeded and failed
+    :rtype: tuple
+    """
+    succeeded = failed = 0
+    pending = set()
+
+    def report(outcome):
+        nonlocal succeeded, failed
+        if outcome["ok"]:
+            succeeded += 1
+        else:
+            failed += 1
+        write(json.dumps(outcome, default=str))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="pyduinocli-batch") as pool:
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                job = parse_job(line, number)
+            except BatchJobError as e:
+                report(dict(id=number, ok=False, error=dict(type=type(e).__name__, message=str(e)), duration=0.0))
+                continue
+            pending.add(pool.submit(run_job, arduino, job))
+            if len(pending) >= 2 * jobs:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    report(future.result())
+        for future in concurrent.futures.as_completed(pending):
+            report(future.result())
+    return succeeded, failed
@@ -1,11 +1,54 @@
 from pyduinocli.commands.base import CommandBase
+from pyduinocli.commands.board import BoardCommand
+from pyduinocli.commands.bootstrap import ensure_directories
+from pyduinocli.commands.burn_bootloader import BurnBootloaderCommand
+from pyduinocli.commands.cache import CacheCommand
+from pyduinocli.commands.compile import CompileCommand
+from pyduinocli.commands.completion import CompletionCommand
+from pyduinocli.commands.config import ConfigCommand
+from pyduinocli.commands.context import CommandContext
+from pyduinocli.commands.core import CoreCommand
+from pyduinocli.commands.daemon import DaemonCommand
+from pyduinocli.commands.debug import DebugCommand
+from pyduinocli.commands.handle import ArduinoHandle
+from pyduinocli.commands.lib import LibCommand
+from pyduinocli.commands.logs import LogTimings
+from pyduinocli.commands.metrics import MetricsRegistry
+from pyduinocli.commands.monitor import MonitorCommand
+from pyduinocli.commands.outdated import OutdatedCommand
+from pyduinocli.commands.sketch import SketchCommand
+from pyduinocli.commands.tracing import Tracer, process_path
+from pyduinocli.commands.update import UpdateCommand
+from pyduinocli.commands.upgrade import UpgradeCommand
+from pyduinocli.commands.upload import UploadCommand
+from pyduinocli.commands.version import VersionCommand
 from pyduinocli.constants import flags, paths
+from pyduinocli.executors.base import SubprocessExecutor
+from pyduinocli.executors.caching import CachingExecutor
+from pyduinocli.executors.cassette import Cassette, RecordingExecutor, ReplayExecutor
+from pyduinocli.executors.coalescing import CoalescingExecutor
 
-import pkgutil
-import importlib
-import pyduinocli.commands as commands
-import os, requests
-from zipfile import ZipFile
+import contextlib
+import os
+import threading
+
+
+class _SharedState:
+
+    __slots__ = ("base_args", "options", "context", "result_cache", "compile_cache", "build_dirs", "metrics", "tracer",
+                 "key", "users")
+
+    def __init__(self, base_args, options, context, result_cache, compile_cache, build_dirs, metrics, tracer):
+        self.base_args = base_args
+        self.options = options
+        self.context = context
+        self.result_cache = result_cache
+        self.compile_cache = compile_cache
+        self.build_dirs = build_dirs
+        self.metrics = metrics
+        self.tracer = tracer
+        self.key = None
+        self.users = 0
 
 
 class ArduinoCliCommand(CommandBase):
@@ -16,9 +59,19 @@ class ArduinoCliCommand(CommandBase):
     """
 
     __FORMAT_JSON = 'json'
+    __BACKEND_SUBPROCESS = 'subprocess'
+    __BACKEND_DAEMON = 'daemon'
+
+    __states = dict()
+    __lock = threading.RLock()
 
     def __init__(self, cli_path='arduino-cli', config_file=None, additional_urls=None, log_file=None, log_format=None,
-                 log_level=None, no_color=None):
+                 log_level=None, no_color=None, backend='subprocess', daemon_address=None, daemons=None,
+                 cache_results=False, cache_size=128, cache_ttl=None, keep_output=True,
+                 spool_threshold=None, stderr_limit=None, record_to=None, replay_from=None, replay_latency=0.0,
+                 metrics=False, trace_file=None, log_timings=False, file_locks=False, compile_cache=None,
+                 compile_cache_size=1 << 30, compile_scheduler=None, build_dirs=None, build_dirs_size=4 << 30,
+                 build_dirs_ram=None, build_dirs_ram_size=512 << 20):
         """
         :param cli_path: The :code:`arduino-cli` command name if available in :code:`$PATH`. Can also be a direct path to the executable
         :type cli_path: str
@@ -34,16 +87,54 @@ class ArduinoCliCommand(CommandBase):
         :type log_level: str or NoneType
         :param no_color: Disable colored output
         :type no_color: bool or NoneType
+        :param backend: How the commands are run, either :code:`"subprocess"` to start a new :code:`arduino-cli` process for each call, or :code:`"daemon"` to run them through a single :code:`arduino-cli daemon` over gRPC
+        :type backend: str
+        :param daemon_address: With the daemon backend, the address of an already running daemon to use instead of starting one, e.g.: 127.0.0.1:50051
+        :type daemon_address: str or NoneType
+        :param daemons: With the daemon backend, the number of daemons to start. With more than one, the daemons are supervised and the commands are spread between them
+        :type daemons: int or NoneType
+        :param cache_results: Cache the output of the read-only commands (e.g. :code:`board details`, :code:`core list`) until a command or another process changes the configuration, platforms, libraries or indexes
+        :type cache_results: bool
+        :param cache_size: The max number of outputs kept in the cache
+        :type cache_size: int
+        :param cache_ttl: The time after which a cached output expires, in seconds, they do not expire if None
+        :type cache_ttl: float or NoneType
+        :param keep_output: Keep the raw standard output and error of the successful commands in their results. When disabled, the results only hold their parsed output, which saves memory with large outputs
+        :type keep_output: bool
+        :param spool_threshold: The size from which the standard output of a command is moved to a temporary file instead of being kept in memory, in bytes. Combined with the iterators such as :meth:`pyduinocli.commands.lib.LibCommand.iter_search`, it keeps the memory used by large outputs flat
+        :type spool_threshold: int or NoneType
+        :param stderr_limit: The max number of bytes of standard error kept for each command, only its end is kept
+        :type stderr_limit: int or NoneType
+        :param record_to: The path to a cassette file where every invocation of :code:`arduino-cli` is recorded, see :class:`pyduinocli.executors.cassette.Cassette`
+        :type record_to: str or NoneType
+        :param replay_from: The path to a cassette file whose recorded invocations answer the commands instead of :code:`arduino-cli`, which is then neither looked for nor run. Commands that were not recorded raise a :class:`pyduinocli.errors.arduinoreplayerror.ArduinoReplayError`
+        :type replay_from: str or NoneType
+        :param replay_latency: With :code:`replay_from`, the fraction of the recorded durations waited before answering, e.g. 1.0 to replay the original latencies
+        :type replay_latency: float
+        :param metrics: Collect metrics about every invocation of :code:`arduino-cli` in :attr:`metrics`
+        :type metrics: bool
+        :param trace_file: The path to a file where a timeline of the invocations of :code:`arduino-cli` is written as Chrome trace events, see :class:`pyduinocli.commands.tracing.Tracer`
+        :type trace_file: str or NoneType
+        :param log_timings: Give each invocation of :code:`arduino-cli` its own JSON log file and attach the time spent in each phase of the command (index loading, discovery, toolchain...) to its result, see :class:`pyduinocli.commands.logs.LogTimings`
+        :type log_timings: bool
+        :param file_locks: Lock the data and configuration directories around each command, so that several processes can share them: the read-only commands run in parallel while the commands changing them run alone. The time spent waiting is given by :attr:`pyduinocli.commands.result.CommandResult.lock_wait`, see :class:`pyduinocli.executors.locking.LockingExecutor`
+        :type file_locks: bool
+        :param compile_cache: The path to a directory where the builds made with an :code:`output_dir` are kept, so that a build whose sketch, options, libraries and installed platforms did not change restores its binaries without running :code:`arduino-cli compile`, see :class:`pyduinocli.executors.compilecache.CompileCacheExecutor`
+        :type compile_cache: str or NoneType
+        :param compile_cache_size: The max size of the compile cache, in bytes, the least recently used builds are evicted
+        :type compile_cache_size: int
+        :param compile_scheduler: The scheduler sharing the CPUs between the builds, so that concurrent builds do not start more compiler processes than there are CPUs and the interactive builds go before the background ones, or :code:`True` for the scheduler shared by the whole process, see :class:`pyduinocli.executors.scheduling.CompileScheduler`
+        :type compile_scheduler: pyduinocli.executors.scheduling.CompileScheduler, bool or NoneType
+        :param build_dirs: The path to a directory holding a persistent build directory per sketch and board, given to the builds without a :code:`build_path` so that building the same target again only rebuilds what changed, see :class:`pyduinocli.executors.builddirs.BuildDirectories`
+        :type build_dirs: str or NoneType
+        :param build_dirs_size: The max size of the build directories on disk, in bytes, the least recently used ones are removed
+        :type build_dirs_size: int
+        :param build_dirs_ram: The path to a directory on a RAM-backed file system (e.g. :code:`/dev/shm/pyduinocli`) where the new build directories are placed, the least recently used ones being moved to :code:`build_dirs` when they take more than :code:`build_dirs_ram_size`
+        :type build_dirs_ram: str or NoneType
+        :param build_dirs_ram_size: The max size of the build directories in :code:`build_dirs_ram`, in bytes
+        :type build_dirs_ram_size: int
         """
         
-        # automagically import all the command classes from `pyduinocli/commands/`
-        for loader, module_name, is_pkg in pkgutil.iter_modules(commands.__path__):
-            module = importlib.import_module(f"{commands.__name__}.{module_name}")
-            globals().update({
-                name: obj for name, obj in vars(module).items()
-                if name.endswith("Command")  # or any naming rule you want
-            })
-        
         # print(f"library path: {paths.LIB_DIR}")
         # print(f"cli path: {cli_path}")
         # print(f"defaault cli tool dir: {paths.DEFAULT_CLI_TOOL_DIR}")
@@ -55,14 +146,40 @@ class ArduinoCliCommand(CommandBase):
         # while(True):
         #     time.sleep(1)
         
+        # instances created with the same arguments share their state, the bootstrap only runs for the first one
+        key = (os.getpid(), cli_path, config_file, tuple(additional_urls or ()), log_file, log_format, log_level,
+               no_color, backend, daemon_address, daemons, cache_results, cache_size, cache_ttl, keep_output,
+               spool_threshold, stderr_limit, record_to, replay_from, replay_latency, metrics,
+               trace_file, log_timings, file_locks, compile_cache, compile_cache_size, compile_scheduler,
+               build_dirs, build_dirs_size, build_dirs_ram, build_dirs_ram_size)
+        with ArduinoCliCommand.__lock:
+            state = ArduinoCliCommand.__states.get(key)
+            if state is None:
+                options = dict(
+                    backend=backend, daemon_address=daemon_address, daemons=daemons, cache_results=cache_results,
+                    cache_size=cache_size, cache_ttl=cache_ttl, keep_output=keep_output,
+                    spool_threshold=spool_threshold, stderr_limit=stderr_limit, record_to=record_to,
+                    replay_from=replay_from, replay_latency=replay_latency, metrics=metrics,
+                    trace_file=trace_file, log_timings=log_timings, file_locks=file_locks,
+                    compile_cache=compile_cache, compile_cache_size=compile_cache_size,
+                    compile_scheduler=compile_scheduler, build_dirs=build_dirs, build_dirs_size=build_dirs_size,
+                    build_dirs_ram=build_dirs_ram, build_dirs_ram_size=build_dirs_ram_size
+                )
+                state = self.__bootstrap(cli_path, config_file, additional_urls, log_file, log_format, log_level,
+                                         no_color, options)
+                state.key = key
+                ArduinoCliCommand.__states[key] = state
+            state.users += 1
+        self.__attach(state)
+
+    def __bootstrap(self, cli_path, config_file, additional_urls, log_file, log_format, log_level, no_color, options):
+        # when replaying, arduino-cli is neither looked for nor run
+        replay = options["replay_from"] is not None
+
         # if there is no CLI tool at `cli_path`, download the official tool
-        
-        loc_cli_exists = (os.path.isfile(os.path.join(paths.DEFAULT_CLI_TOOL_DIR, 'arduino-cli.exe'))) or (os.path.isfile(os.path.join(paths.DEFAULT_CLI_TOOL_DIR, 'arduino-cli')))
-        arg_cli_exists = os.path.isfile(cli_path)
-        
-        if arg_cli_exists:
+        if replay or os.path.isfile(cli_path):
             pass
-        elif loc_cli_exists:
+        elif (os.path.isfile(os.path.join(paths.DEFAULT_CLI_TOOL_DIR, 'arduino-cli.exe'))) or (os.path.isfile(os.path.join(paths.DEFAULT_CLI_TOOL_DIR, 'arduino-cli'))):
             if os.name == 'nt':
                 exec_name = 'arduino-cli.exe'
             elif os.name == 'posix':
@@ -90,35 +207,264 @@ class ArduinoCliCommand(CommandBase):
             base_args.extend([flags.LOG_LEVEL, CommandBase._strip_arg(log_level)])
         if no_color is True:
             base_args.append(flags.NO_COLOR)
-        CommandBase.__init__(self, base_args)
-        
-        self.__board = BoardCommand(self._base_args)
-        self.__cache = CacheCommand(self._base_args)
-        self.__compile = CompileCommand(self._base_args)
-        self.__config = ConfigCommand(self._base_args)
-        self.__core = CoreCommand(self._base_args)
-        self.__daemon = DaemonCommand(self._base_args)
-        self.__debug = DebugCommand(self._base_args)
-        self.__lib = LibCommand(self._base_args)
-        self.__sketch = SketchCommand(self._base_args)
-        self.__upload = UploadCommand(self._base_args)
-        self.__version = VersionCommand(self._base_args)
-        self.__burn_bootloader = BurnBootloaderCommand(self._base_args)
-        self.__completion = CompletionCommand(self._base_args)
-        self.__outdated = OutdatedCommand(self._base_args)
-        self.__update = UpdateCommand(self._base_args)
-        self.__upgrade = UpgradeCommand(self._base_args)
-        self.__monitor = MonitorCommand(self._base_args)
-        
-        # if its None, use the config file in the ../../arduino-cli directory (same place as CLI tool) if
-        # it exists, otherwise create a one
-        if config_file is None:
-            if not os.path.isfile(config_file):
-                self.config.init(dest_file=config_file)
-            
-            
-        self.config.set('directories.data', [paths.CLI_DATA_PATH.as_posix()])
-        self.config.set('directories.user', [paths.CLI_USER_PATH.as_posix()])
+        options["config_file"] = config_file
+        state = ArduinoCliCommand.__build(base_args, options)
+
+        # the config file is read in-process, arduino-cli only runs to create it or to fix its directories
+        if not replay:
+            with ArduinoCliCommand.__span(state.tracer, "bootstrap", config_file=config_file):
+                ensure_directories(ConfigCommand(base_args, state.context), config_file, dict(
+                    data=paths.CLI_DATA_PATH.as_posix(),
+                    user=paths.CLI_USER_PATH.as_posix()
+                ))
+        return state
+
+    @classmethod
+    def _restore(cls, base_args, options, pid=None):
+        """
+        Rebuilds a wrapper from the command line prefix and the options of another one, without running any command.
+        In the process of the other wrapper, the new one shares its state instead, e.g. its caches and trace file. In
+        another process, it records to a cassette of its own.
+
+        :param base_args: The command line prefix, starting with the :code:`arduino-cli` executable
+        :type base_args: list
+        :param options: The options of the wrapper
+        :type options: dict
+        :param pid: The id of the process of the other wrapper, the current one if None
+        :type pid: int or NoneType
+        :return: The new wrapper
+        :rtype: ArduinoCliCommand
+        """
+        arduino = cls.__new__(cls)
+        base_args = list(base_args)
+        options = dict(options)
+        if pid is not None and pid != os.getpid() and options.get("record_to") is not None:
+            # the trace file is already named after the process by the tracer
+            options["record_to"] = process_path(options["record_to"])
+        pid = os.getpid()
+        with ArduinoCliCommand.__lock:
+            # the states inherited from a parent process are keyed by its pid, they are never reused
+            state = next((state for key, state in ArduinoCliCommand.__states.items()
+                          if key[0] == pid and state.base_args == base_args and state.options == options), None)
+            if state is None:
+                state = ArduinoCliCommand.__build(base_args, options)
+                state.key = (pid, ArduinoHandle, tuple(base_args), tuple(sorted(options.items())))
+                ArduinoCliCommand.__states[state.key] = state
+            state.users += 1
+        arduino.__attach(state)
+        return arduino
+
+    @staticmethod
+    def __build(base_args, options):
+        options = dict(options)
+        backend = options["backend"]
+        daemons = options["daemons"]
+        daemon_address = options["daemon_address"]
+        subprocess_executor = SubprocessExecutor(spool_threshold=options["spool_threshold"],
+                                                 stderr_limit=options["stderr_limit"])
+        if options.get("replay_from") is not None:
+            executor = ReplayExecutor(Cassette(options["replay_from"]), latency=options.get("replay_latency") or 0.0)
+        elif backend == ArduinoCliCommand.__BACKEND_SUBPROCESS:
+            executor = subprocess_executor
+        elif backend == ArduinoCliCommand.__BACKEND_DAEMON and daemons is not None and daemons > 1:
+            if daemon_address:
+                raise ValueError("daemon_address cannot be used with more than one daemon")
+            from pyduinocli.executors.pool import DaemonPoolExecutor
+            executor = DaemonPoolExecutor(DaemonCommand(base_args), size=daemons, fallback=subprocess_executor)
+        elif backend == ArduinoCliCommand.__BACKEND_DAEMON:
+            from pyduinocli.executors.daemon import DaemonExecutor
+            executor = DaemonExecutor(DaemonCommand(base_args), address=daemon_address,
+                                      fallback=subprocess_executor)
+        else:
+            raise ValueError("Unknown backend: %s" % backend)
+        if options.get("record_to") is not None:
+            executor = RecordingExecutor(executor, Cassette(options["record_to"]))
+        file_locks = options.get("file_locks") and options.get("replay_from") is None
+        if file_locks:
+            from pyduinocli.executors.locking import LockingExecutor
+            executor = LockingExecutor(executor, [paths.CLI_DATA_PATH.as_posix(),
+                                                  os.path.dirname(os.path.abspath(options["config_file"]))])
+        compile_scheduler = ArduinoCliCommand.__compile_scheduler(options)
+        if compile_scheduler is not None and options.get("replay_from") is None:
+            from pyduinocli.executors.scheduling import SchedulingExecutor
+            executor = SchedulingExecutor(executor, compile_scheduler)
+        build_dirs = None
+        if options.get("build_dirs") is not None:
+            from pyduinocli.executors.builddirs import BuildDirectories, BuildDirectoryExecutor
+            build_dirs = BuildDirectories(options["build_dirs"], max_bytes=options.get("build_dirs_size") or 4 << 30,
+                                          ram_root=options.get("build_dirs_ram"),
+                                          ram_bytes=options.get("build_dirs_ram_size") or 512 << 20)
+            executor = BuildDirectoryExecutor(executor, build_dirs)
+        executor = CoalescingExecutor(executor)
+        result_cache = None
+        if options["cache_results"]:
+            result_cache = CachingExecutor(
+                executor, max_entries=options["cache_size"], ttl=options["cache_ttl"],
+                watched_paths=ArduinoCliCommand.__watched_paths(options["config_file"])
+            )
+            executor = result_cache
+        compile_cache = None
+        if options.get("compile_cache") is not None:
+            from pyduinocli.executors.compilecache import CompileCache, CompileCacheExecutor
+            compile_cache = CompileCache(options["compile_cache"], max_bytes=options.get("compile_cache_size") or
+                                         1 << 30)
+            executor = CompileCacheExecutor(executor, compile_cache)
+        context = CommandContext(executor, keep_output=options["keep_output"], track_calls=bool(file_locks))
+        if options.get("log_timings"):
+            context.add_hook(LogTimings())
+        metrics = None
+        if options.get("metrics"):
+            metrics = MetricsRegistry()
+            context.add_hook(metrics)
+        tracer = None
+        if options.get("trace_file") is not None:
+            tracer = Tracer(options["trace_file"])
+            context.add_hook(tracer)
+        return _SharedState(base_args, options, context, result_cache, compile_cache, build_dirs, metrics, tracer)
+
+    @staticmethod
+    def __compile_scheduler(options):
+        scheduler = options.get("compile_scheduler")
+        if scheduler is True:
+            from pyduinocli.executors.scheduling import CompileScheduler
+            return CompileScheduler.shared()
+        return scheduler or None
+
+    def __attach(self, state):
+        CommandBase.__init__(self, state.base_args, state.context)
+        self.__state = state
+        self.__options = state.options
+        self.__result_cache = state.result_cache
+        self.__commands = dict()
+        self.__closed = False
+
+    @staticmethod
+    def __watched_paths(config_file):
+        data = paths.CLI_DATA_PATH.as_posix()
+        user = paths.CLI_USER_PATH.as_posix()
+        return [
+            config_file,
+            data, os.path.join(data, '*.json'), os.path.join(data, 'packages'), os.path.join(data, 'packages', '*'),
+            os.path.join(data, 'packages', '*', 'hardware', '*'), os.path.join(data, 'packages', '*', 'hardware', '*', '*'),
+            user, os.path.join(user, 'libraries'),
+        ]
+
+    def __command(self, command_class):
+        command = self.__commands.get(command_class)
+        if command is None:
+            command = command_class(self._base_args, self._context)
+            command = self.__commands.setdefault(command_class, command)
+        return command
+
+    @property
+    def handle(self):
+        """
+        A lightweight, picklable handle on this wrapper. It only holds the resolved command line prefix and the
+        options, so it can be sent to the workers of a :code:`concurrent.futures.ProcessPoolExecutor` and opened
+        there without running :code:`arduino-cli`.
+
+        :type: :class:`pyduinocli.commands.handle.ArduinoHandle`
+        """
+        return ArduinoHandle(self._base_args, self.__options)
+
+    def __reduce__(self):
+        return ArduinoHandle.open, (self.handle,)
+
+    @property
+    def result_cache(self):
+        """
+        The cache of the outputs of the read-only commands, None unless :code:`cache_results` is set. Its
+        :code:`stats` give the number of hits and misses.
+
+        :type: :class:`pyduinocli.executors.caching.CachingExecutor` or NoneType
+        """
+        return self.__result_cache
+
+    @property
+    def compile_cache(self):
+        """
+        The cache of the builds, None unless :code:`compile_cache` is set. Its :code:`stats` give the number of hits,
+        misses and bypasses.
+
+        :type: :class:`pyduinocli.executors.compilecache.CompileCache` or NoneType
+        """
+        return self.__state.compile_cache
+
+    @property
+    def build_dirs(self):
+        """
+        The pool of persistent build directories, None unless :code:`build_dirs` is set. Its :code:`stats` give the
+        number of builds reusing a directory and the space taken.
+
+        :type: :class:`pyduinocli.executors.builddirs.BuildDirectories` or NoneType
+        """
+        return self.__state.build_dirs
+
+    @property
+    def compile_scheduler(self):
+        """
+        The scheduler sharing the CPUs between the builds, None unless :code:`compile_scheduler` is set. Its
+        :code:`stats` give the queue depths and the wait times.
+
+        :type: :class:`pyduinocli.executors.scheduling.CompileScheduler` or NoneType
+        """
+        return ArduinoCliCommand.__compile_scheduler(self.__options)
+
+    @property
+    def metrics(self):
+        """
+        The metrics collected about the invocations of :code:`arduino-cli`, None unless :code:`metrics` is set
+
+        :type: :class:`pyduinocli.commands.metrics.MetricsRegistry` or NoneType
+        """
+        return self.__state.metrics
+
+    @property
+    def tracer(self):
+        """
+        The tracer writing the timeline of the invocations of :code:`arduino-cli`, None unless :code:`trace_file` is
+        set
+
+        :type: :class:`pyduinocli.commands.tracing.Tracer` or NoneType
+        """
+        return self.__state.tracer
+
+    @staticmethod
+    def __span(tracer, name, **args):
+        if tracer is None:
+            return contextlib.nullcontext()
+        return tracer.span(name, **args)
+
+    def span(self, name, **args):
+        """
+        Context manager recording the time spent inside it as a span of the timeline, under which the invocations
+        of :code:`arduino-cli` made inside it are nested. It does nothing unless :code:`trace_file` is set.
+
+        :param name: The name of the span
+        :type name: str
+        :param args: Values shown along with the span
+        :return: The context manager
+        """
+        return ArduinoCliCommand.__span(self.__state.tracer, name, **args)
+
+    def add_hook(self, hook):
+        """
+        Adds a hook notified of every invocation of :code:`arduino-cli`. The hooks are shared by the wrappers created
+        with the same arguments.
+
+        :param hook: The hook
+        :type hook: pyduinocli.commands.hooks.CommandHook
+        """
+        self._context.add_hook(hook)
+
+    def remove_hook(self, hook):
+        """
+        Removes a hook added by :meth:`add_hook`
+
+        :param hook: The hook
+        :type hook: pyduinocli.commands.hooks.CommandHook
+        """
+        self._context.remove_hook(hook)
 
     @property
     def board(self):
@@ -127,7 +473,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.board.BoardCommand`
         """
-        return self.__board
+        return self.__command(BoardCommand)
 
     @property
     def cache(self):
@@ -136,7 +482,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.cache.CacheCommand`
         """
-        return self.__cache
+        return self.__command(CacheCommand)
 
     @property
     def compile(self):
@@ -145,7 +491,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.compile.CompileCommand`
         """
-        return self.__compile
+        return self.__command(CompileCommand)
 
     @property
     def config(self):
@@ -154,7 +500,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.config.ConfigCommand`
         """
-        return self.__config
+        return self.__command(ConfigCommand)
 
     @property
     def core(self):
@@ -163,7 +509,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.core.CoreCommand`
         """
-        return self.__core
+        return self.__command(CoreCommand)
 
     @property
     def daemon(self):
@@ -172,7 +518,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.daemon.DaemonCommand`
         """
-        return self.__daemon
+        return self.__command(DaemonCommand)
 
     @property
     def debug(self):
@@ -181,7 +527,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.debug.DebugCommand`
         """
-        return self.__debug
+        return self.__command(DebugCommand)
 
     @property
     def lib(self):
@@ -190,7 +536,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.lib.LibCommand`
         """
-        return self.__lib
+        return self.__command(LibCommand)
 
     @property
     def sketch(self):
@@ -199,7 +545,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.sketch.SketchCommand`
         """
-        return self.__sketch
+        return self.__command(SketchCommand)
 
     @property
     def upload(self):
@@ -208,7 +554,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.upload.UploadCommand`
         """
-        return self.__upload
+        return self.__command(UploadCommand)
 
     @property
     def version(self):
@@ -217,7 +563,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.version.VersionCommand`
         """
-        return self.__version
+        return self.__command(VersionCommand)
 
     @property
     def burn_bootloader(self):
@@ -226,7 +572,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.burn_bootloader.BurnBootloaderCommand`
         """
-        return self.__burn_bootloader
+        return self.__command(BurnBootloaderCommand)
 
     @property
     def completion(self):
@@ -235,7 +581,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.completion.CompletionCommand`
         """
-        return self.__completion
+        return self.__command(CompletionCommand)
 
     @property
     def outdated(self):
@@ -244,7 +590,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.outdated.OutdatedCommand`
         """
-        return self.__outdated
+        return self.__command(OutdatedCommand)
 
     @property
     def update(self):
@@ -253,7 +599,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.update.UpdateCommand`
         """
-        return self.__update
+        return self.__command(UpdateCommand)
 
     @property
     def upgrade(self):
@@ -262,7 +608,7 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.upgrade.UpgradeCommand`
         """
-        return self.__upgrade
+        return self.__command(UpgradeCommand)
 
     @property
     def monitor(self):
@@ -271,11 +617,70 @@ class ArduinoCliCommand(CommandBase):
 
         :type: :class:`pyduinocli.commands.monitor.MonitorCommand`
         """
-        return self.__monitor
+        return self.__command(MonitorCommand)
+
+    def compile_matrix(self, sketch, targets, max_workers=None, build_root=None, build_cache_path=None,
+                       output_root=None, timeout=None, priority=None, **options):
+        """
+        Compiles a sketch for several targets at the same time, see :func:`pyduinocli.commands.matrix.compile_matrix`
+
+        :param sketch: The sketch to compile
+        :type sketch: str
+        :param targets: The targets, each a FQBN or a dict of arguments of :attr:`compile`
+        :type targets: list
+        :param max_workers: The max number of builds running at the same time, the number of CPUs if None
+        :type max_workers: int or NoneType
+        :param build_root: The directory holding the build directory of each target, a temporary directory if None
+        :type build_root: str or NoneType
+        :param build_cache_path: The build cache shared by the targets
+        :type build_cache_path: str or NoneType
+        :param output_root: The directory holding the binaries exported for each target
+        :type output_root: str or NoneType
+        :param timeout: The max time each build can take, in seconds
+        :type timeout: float or NoneType
+        :param priority: The priority of the builds with :code:`compile_scheduler`, see
+            :data:`pyduinocli.executors.scheduling.PRIORITIES`
+        :type priority: str or NoneType
+        :return: An iterator over the :class:`pyduinocli.commands.matrix.MatrixResult` of the targets, in completion
+            order
+        :rtype: iterator
+        """
+        from pyduinocli.commands.matrix import compile_matrix
+        return compile_matrix(self, sketch, targets, max_workers=max_workers, build_root=build_root,
+                              build_cache_path=build_cache_path, output_root=output_root, timeout=timeout,
+                              priority=priority, **options)
+
+    def close(self):
+        """
+        Releases the resources held by this wrapper, e.g. stops the :code:`arduino-cli daemon` used by the daemon
+        backend. They are shared by the wrappers created with the same arguments and only released when the last one
+        of them is closed.
+        """
+        with ArduinoCliCommand.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            state = self.__state
+            state.users -= 1
+            if state.users > 0:
+                return
+            if state.key is not None and ArduinoCliCommand.__states.get(state.key) is state:
+                del ArduinoCliCommand.__states[state.key]
+        self._executor.close()
+        if state.tracer is not None:
+            state.tracer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     # installing the arduino-cli
     def __install_arduino_cli(self, path: str) -> str:
         import subprocess
+        import requests
+        from zipfile import ZipFile
         
         # install the arduino-cli
         # if windows, download the cli exe
@@ -1,12 +1,22 @@
-import json
-from subprocess import Popen, run, PIPE
+from pyduinocli.commands.context import CommandContext
+from pyduinocli.commands.hooks import CommandCall
 from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.executors.progress import Progress
 
 
 class CommandBase:
 
-    def __init__(self, base_args):
+    __DEFAULT_CONTEXT = CommandContext()
+
+    def __init__(self, base_args, context=None):
         self._base_args = list(base_args)
+        if context is None:
+            context = CommandBase.__DEFAULT_CONTEXT
+        self._context = context
+
+    @property
+    def _executor(self):
+        return self._context.executor
 
     @staticmethod
     def _strip_arg(arg):
@@ -19,26 +29,28 @@ class CommandBase:
             out.append(CommandBase._strip_arg(arg))
         return out
 
-    @staticmethod
-    def __parse_output(data):
-        try:
-            return json.loads(data)
-        except ValueError:
-            return data
-
-    def _exec(self, args):
+    def _exec(self, args, on_progress=None):
         command = list(self._base_args)
         command.extend(args)
-        # p = Popen(command, stdout=PIPE, stderr=PIPE)
-        # stdout, stderr = p.communicate()
-        # stdout = stdout.decode("utf-8").strip()
-        # stderr = stderr.decode("utf-8").strip()
-        p = run(command, text=True, capture_output=True)
-        result = dict(
-            __stdout=p.stdout,
-            __stderr=p.stderr,
-            result=self.__parse_output(p.stdout)
-        )
-        if p.returncode != 0:
+        return self._run(command, on_progress)
+
+    def _iter(self, args, key=None):
+        return self._exec(args).iter_items(key)
+
+    def _run(self, command, on_progress=None):
+        call = CommandCall.begin(self._context, command)
+        if call is None:
+            with Progress(on_progress):
+                returncode, stdout, stderr = self._executor.execute(command)
+            return self._result(returncode, stdout, stderr)
+        with call:
+            with Progress(on_progress):
+                returncode, stdout, stderr = self._executor.execute(call.command)
+            call.done(returncode, stdout, stderr)
+            return self._result(returncode, stdout, stderr, call)
+
+    def _result(self, returncode, stdout, stderr, call=None):
+        result = self._context.result(returncode, stdout, stderr, call)
+        if returncode != 0:
             raise ArduinoError(result)
         return result
@@ -8,8 +8,8 @@ class BoardCommand(CommandBase):
     This class wraps the call to the :code:`board` command of :code:`arduino-cli`
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.BOARD)
 
     def attach(self, port=None, fqbn=None, sketch_path=None, discovery_timeout=None, protocol=None, board_options=None):
@@ -119,12 +119,30 @@ class BoardCommand(CommandBase):
         :return: The output of the related command
         :rtype: dict
         """
+        return self._exec(BoardCommand.__listall_args(boardname, show_hidden))
+
+    def iter_listall(self, boardname=None, show_hidden=None):
+        """
+        Calls the :code:`board listall` command and iterates over the boards found, parsing them one by one. With a
+        spooled output, the memory used does not depend on the number of installed boards.
+
+        :param boardname: The name of the board, all board will be returned if left unset (or None)
+        :type boardname: str or NoneType
+        :param show_hidden: Show also boards marked as 'hidden' in the platform
+        :type show_hidden: bool or NoneTYpe
+        :return: An iterator over the boards found
+        :rtype: iterator
+        """
+        return self._iter(BoardCommand.__listall_args(boardname, show_hidden), "boards")
+
+    @staticmethod
+    def __listall_args(boardname, show_hidden):
         args = [commands.LISTALL]
         if boardname:
             args.append(CommandBase._strip_arg(boardname))
         if show_hidden is True:
             args.append(flags.SHOW_HIDDEN)
-        return self._exec(args)
+        return args
 
     def search(self, boardname=None, show_hidden=None):
         """
@@ -0,0 +1,95 @@
+import os
+import threading
+
+_stamps = dict()
+_lock = threading.Lock()
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].encode("latin-1", "backslashreplace").decode("unicode_escape")
+    if " #" in value:
+        value = value[:value.index(" #")].rstrip()
+    return value
+
+
+def read_directories(config_file):
+    """
+    Reads the :code:`directories` section of an :code:`arduino-cli` configuration file, without running
+    :code:`arduino-cli`. Only its scalar settings are read, e.g. :code:`data`, :code:`downloads` and :code:`user`.
+
+    :param config_file: The path to the configuration file
+    :type config_file: str
+    :return: The directories by setting name, empty if the file or the section does not exist
+    :rtype: dict
+    """
+    directories = dict()
+    try:
+        with open(config_file, "r", encoding="utf-8") as config:
+            lines = config.read().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return directories
+    indent = None
+    section = False
+    for line in lines:
+        content = line.lstrip(" ")
+        if not content or content.startswith("#"):
+            continue
+        depth = len(line) - len(content)
+        if depth == 0:
+            section = content.split("#", 1)[0].rstrip() == "directories:"
+            indent = None
+            continue
+        if not section:
+            continue
+        if indent is None:
+            indent = depth
+        if depth != indent or ":" not in content:
+            continue
+        name, value = content.split(":", 1)
+        value = _unquote(value)
+        if value:
+            directories[name.strip()] = value
+    return directories
+
+
+def _stamp(config_file):
+    try:
+        stat = os.stat(config_file)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def ensure_directories(config, config_file, directories):
+    """
+    Makes sure that the :code:`directories` settings of a configuration file have the given values. The file is
+    read in-process and :code:`arduino-cli` is only run for the settings that differ, after creating the file if it
+    does not exist. The file is not read again in this process until it is modified.
+
+    :param config: The config command wrapper used to write the file
+    :type config: pyduinocli.commands.config.ConfigCommand
+    :param config_file: The path to the configuration file
+    :type config_file: str
+    :param directories: The expected directories by setting name, e.g. :code:`{"data": "/path/to/data"}`
+    :type directories: dict
+    :return: Whether the file was written
+    :rtype: bool
+    """
+    key = (os.path.abspath(config_file), tuple(sorted(directories.items())))
+    with _lock:
+        stamp = _stamp(config_file)
+        if stamp is not None and _stamps.get(key) == stamp:
+            return False
+        current = read_directories(config_file) if stamp is not None else dict()
+        changed = [(name, value) for name, value in sorted(directories.items())
+                   if os.path.normpath(current.get(name, "")) != os.path.normpath(value)]
+        if stamp is None:
+            config.init(dest_file=config_file)
+        for name, value in changed:
+            config.set("directories." + name, [value])
+        _stamps[key] = _stamp(config_file)
+        return stamp is None or bool(changed)
@@ -8,8 +8,8 @@ class CompileCommand(CommandBase):
     This class wraps the call to the :code:`compile` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.COMPILE)
 
     def __call__(self,
@@ -18,7 +18,7 @@ class CompileCommand(CommandBase):
                  warnings=None, libraries=None, library=None, optimize_for_debug=None, export_binaries=None,
                  programmer=None, clean=None, only_compilation_database=None, discovery_timeout=None, protocol=None,
                  board_options=None, encrypt_key=None, keys_keychain=None, sign_key=None, dump_profile=None,
-                 profile=None, verbose=None):
+                 profile=None, verbose=None, on_progress=None, jobs=None):
         """
         Calls the :code:`compile` command
 
@@ -78,6 +78,10 @@ class CompileCommand(CommandBase):
         :type profile: str or NoneType
         :param verbose: Optional, turns on verbose mode
         :type verbose: bool or NoneType
+        :param on_progress: A function receiving the :class:`pyduinocli.executors.progress.ProgressEvent` of the command while it runs
+        :type on_progress: callable or NoneType
+        :param jobs: Max number of parallel compiles. If set to 0 the number of available CPUs cores will be used.
+        :type jobs: int or NoneType
         :return: The output of the related command
         :rtype: dict
         """
@@ -143,5 +147,7 @@ class CompileCommand(CommandBase):
             args.extend([flags.PROFILE, CommandBase._strip_arg(profile)])
         if verbose is True:
             args.append(flags.VERBOSE)
+        if jobs is not None:
+            args.extend([flags.JOBS, str(jobs)])
         args.append(CommandBase._strip_arg(sketch))
-        return self._exec(args)
+        return self._exec(args, on_progress)
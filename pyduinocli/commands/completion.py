@@ -8,8 +8,8 @@ class CompletionCommand(CommandBase):
     This class wraps the call to the :code:`completion` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.COMPLETION)
 
     def __call__(self, shell, no_description=None):
@@ -0,0 +1,100 @@
+import threading
+from pyduinocli.commands.result import CommandResult
+from pyduinocli.executors.base import SubprocessExecutor
+
+
+class CommandContext:
+    """
+    The settings shared by all the command wrappers of an :code:`arduino-cli` wrapper: how the commands are run and
+    how their results are built.
+    """
+
+    def __init__(self, executor=None, keep_output=True, track_calls=False):
+        """
+        :param executor: The executor running the commands, a new :class:`pyduinocli.executors.base.SubprocessExecutor` if None
+        :type executor: pyduinocli.executors.base.ExecutorBase or NoneType
+        :param keep_output: Keep the standard output and error of the successful commands in their results
+        :type keep_output: bool
+        :param track_calls: Track every invocation with a :class:`pyduinocli.commands.hooks.CommandCall`, even without hooks, so that their results hold what the executors record about them, e.g. their lock wait time
+        :type track_calls: bool
+        """
+        if executor is None:
+            executor = SubprocessExecutor()
+        self.__executor = executor
+        self.__keep_output = keep_output
+        self.__track_calls = track_calls
+        self.__hooks = ()
+        self.__lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """
+        The executor running the commands
+
+        :type: :class:`pyduinocli.executors.base.ExecutorBase`
+        """
+        return self.__executor
+
+    @property
+    def keep_output(self):
+        """
+        Whether the standard output and error of the successful commands are kept in their results
+
+        :type: bool
+        """
+        return self.__keep_output
+
+    @property
+    def track_calls(self):
+        """
+        Whether every invocation is tracked, even without hooks
+
+        :type: bool
+        """
+        return self.__track_calls
+
+    @property
+    def hooks(self):
+        """
+        The hooks notified of the invocations
+
+        :type: tuple
+        """
+        return self.__hooks
+
+    def add_hook(self, hook):
+        """
+        Adds a hook notified of the invocations
+
+        :param hook: The hook
+        :type hook: pyduinocli.commands.hooks.CommandHook
+        """
+        with self.__lock:
+            self.__hooks = self.__hooks + (hook,)
+
+    def remove_hook(self, hook):
+        """
+        Removes a hook
+
+        :param hook: The hook
+        :type hook: pyduinocli.commands.hooks.CommandHook
+        """
+        with self.__lock:
+            self.__hooks = tuple(h for h in self.__hooks if h is not hook)
+
+    def result(self, returncode, stdout, stderr, call=None):
+        """
+        Builds the result of a command
+
+        :param returncode: The return code of the command
+        :type returncode: int
+        :param stdout: The raw standard output of the command
+        :type stdout: bytes or str
+        :param stderr: The raw standard error of the command
+        :type stderr: bytes or str
+        :param call: The invocation notified when the output is parsed
+        :type call: pyduinocli.commands.hooks.CommandCall or NoneType
+        :return: The result of the command
+        :rtype: pyduinocli.commands.result.CommandResult
+        """
+        return CommandResult(returncode, stdout, stderr, keep_output=self.__keep_output, call=call)
@@ -8,8 +8,8 @@ class CoreCommand(CommandBase):
     This class wraps the call to the :code:`core` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.CORE)
         
     def download(self, downloads):
@@ -26,9 +26,9 @@ class CoreCommand(CommandBase):
         return self._exec(args)
 
     def install(self, installs, run_post_install=None, skip_post_install=None, no_overwrite=None,
-                run_pre_uninstall=None, skip_pre_uninstall=None):
+                run_pre_uninstall=None, skip_pre_uninstall=None, on_progress=None):
         """
-        Calls the :code:`core download` command
+        Calls the :code:`core install` command
 
         :param installs: A list of cores to install
         :type installs: list
@@ -42,6 +42,8 @@ class CoreCommand(CommandBase):
         :type run_pre_uninstall: bool or NoneType
         :param skip_pre_uninstall: Force skip of pre-uninstall scripts (if the CLI is running interactively).
         :type skip_pre_uninstall: bool or NoneType
+        :param on_progress: A function receiving the :class:`pyduinocli.executors.progress.ProgressEvent` of the command while it runs
+        :type on_progress: callable or NoneType
         :return: The output of the related command
         :rtype: dict
         """
@@ -57,7 +59,7 @@ class CoreCommand(CommandBase):
             args.append(flags.RUN_PRE_UNINSTALL)
         if skip_pre_uninstall is True:
             args.append(flags.SKIP_PRE_UNINSTALL)
-        return self._exec(args)
+        return self._exec(args, on_progress)
 
     def list(self, updatable=None, all=None):
         """
@@ -88,6 +90,24 @@ class CoreCommand(CommandBase):
         :return: The output of the related command
         :rtype: dict
         """
+        return self._exec(CoreCommand.__search_args(keywords, all))
+
+    def iter_search(self, keywords=None, all=None):
+        """
+        Calls the :code:`core search` command and iterates over the cores found, parsing them one by one. With a
+        spooled output, the memory used does not depend on the size of the package indexes.
+
+        :param keywords: A list of keywords to use to search, if None, all cores will show up
+        :type keywords: list or NoneType
+        :param all: Shows all available core versions
+        :type all: bool or NoneType
+        :return: An iterator over the cores found
+        :rtype: iterator
+        """
+        return self._iter(CoreCommand.__search_args(keywords, all))
+
+    @staticmethod
+    def __search_args(keywords, all):
         args = [commands.SEARCH]
         if keywords is None:
             keywords = []
@@ -95,7 +115,7 @@ class CoreCommand(CommandBase):
             args.extend(CommandBase._strip_args(keywords))
         if all is True:
             args.append(flags.ALL)
-        return self._exec(args)
+        return args
 
     def uninstall(self, uninstalls, run_post_install=None, run_pre_uninstall=None, skip_post_install=None,
                   skip_pre_uninstall=None):
@@ -1,6 +1,7 @@
 from pyduinocli.commands.base import CommandBase
 from pyduinocli.constants import commands
 from pyduinocli.constants import flags
+from subprocess import Popen, PIPE, STDOUT
 
 
 class DaemonCommand(CommandBase):
@@ -8,10 +9,25 @@ class DaemonCommand(CommandBase):
     This class wraps the call to the :code:`daemon` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.DAEMON)
 
+    @staticmethod
+    def __build_args(daemonize, port, debug, debug_filter, debug_file):
+        args = []
+        if daemonize is True:
+            args.append(flags.DAEMONIZE)
+        if port:
+            args.extend([flags.PORT, CommandBase._strip_arg(str(port))])
+        if debug is True:
+            args.append(flags.DEBUG)
+        if debug_filter:
+            args.extend([flags.DEBUG_FILTER, CommandBase._strip_arg(debug_filter)])
+        if debug_file:
+            args.extend([flags.DEBUG_FILE, CommandBase._strip_arg(debug_file)])
+        return args
+
     def __call__(self, daemonize=None, port=None, debug=None, debug_filter=None, debug_file=None):
         """
         Calls the :code:`daemon` command
@@ -29,15 +45,27 @@ class DaemonCommand(CommandBase):
         :return: The output of the related command
         :rtype: dict
         """
-        args = []
-        if daemonize is True:
-            args.append(flags.DAEMONIZE)
-        if port:
-            args.extend([flags.PORT, CommandBase._strip_arg(str(port))])
-        if debug is True:
-            args.append(flags.DEBUG)
-        if debug_filter:
-            args.extend([flags.DEBUG_FILTER, CommandBase._strip_arg(debug_filter)])
-        if debug_file:
-            args.extend([flags.DEBUG_FILE, CommandBase._strip_arg(debug_file)])
-        return self._exec(args)
+        return self._exec(DaemonCommand.__build_args(daemonize, port, debug, debug_filter, debug_file))
+
+    def start(self, daemonize=None, port=None, debug=None, debug_filter=None, debug_file=None):
+        """
+        Starts the :code:`daemon` command in the background, without waiting for it to exit.
+        The standard input of the daemon is kept open so that it stops when this process dies, and its merged
+        standard output and error must be consumed by the caller.
+
+        :param daemonize: Do not terminate daemon process if the parent process dies
+        :type daemonize: bool or NoneType
+        :param port: The TCP port the daemon will listen to
+        :type port: str, integer or NoneType
+        :param debug: Enable debug logging of gRPC calls
+        :type debug: bool or NoneType
+        :param debug_filter: Display only the provided gRPC calls
+        :type debug_filter: str or NoneType
+        :param debug_file: Append debug logging to the specified file
+        :type debug_file: str or NoneType
+        :return: The running daemon process
+        :rtype: subprocess.Popen
+        """
+        command = list(self._base_args)
+        command.extend(DaemonCommand.__build_args(daemonize, port, debug, debug_filter, debug_file))
+        return Popen(command, stdin=PIPE, stdout=PIPE, stderr=STDOUT, text=True)
@@ -9,8 +9,8 @@ class DebugCommand(CommandBase):
     Warning, While this has been added in pyduinocli, it has not been tested, and won't probably work since it will start an interactive gdb session and won't return
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.DEBUG)
 
     def _exec(self, args, board_options=None, discovery_timeout=None, fqbn=None, info=None, input_dir=None,
@@ -0,0 +1,82 @@
+import os
+import threading
+
+
+class ArduinoHandle:
+    """
+    A picklable reference to a :class:`pyduinocli.commands.arduino.ArduinoCliCommand`, holding only its resolved
+    command line prefix and options.
+
+    Opening a handle builds a wrapper without probing the file system, downloading :code:`arduino-cli` or running any
+    command. Each process opens a given handle once and reuses the wrapper, so handles can be sent along with every
+    job submitted to a :code:`concurrent.futures.ProcessPoolExecutor`. The wrappers themselves are pickled as handles.
+    In another process than the one of the handle, the wrapper records to a cassette and writes a trace of its own,
+    both named after the process (see :func:`pyduinocli.commands.tracing.process_path`). It shares the build
+    directories, which are locked between processes.
+
+    .. code-block:: python
+
+        def build(arduino, sketch):
+            return arduino.compile(sketch, fqbn="arduino:avr:uno")["result"]
+
+        with ProcessPoolExecutor() as pool:
+            results = list(pool.map(build, itertools.repeat(arduino), sketches))
+    """
+
+    __opened = dict()
+    __lock = threading.Lock()
+
+    def __init__(self, base_args, options):
+        """
+        :param base_args: The command line prefix, starting with the :code:`arduino-cli` executable
+        :type base_args: list
+        :param options: The options of the wrapper
+        :type options: dict
+        """
+        self.__base_args = tuple(base_args)
+        self.__options = tuple(sorted(options.items()))
+        self.__pid = os.getpid()
+
+    @property
+    def base_args(self):
+        """
+        The command line prefix, starting with the :code:`arduino-cli` executable
+
+        :type: list
+        """
+        return list(self.__base_args)
+
+    @property
+    def options(self):
+        """
+        The options of the wrapper
+
+        :type: dict
+        """
+        return dict(self.__options)
+
+    def open(self):
+        """
+        Gets the wrapper of this handle in the current process, building it on first use
+
+        :return: The wrapper
+        :rtype: pyduinocli.commands.arduino.ArduinoCliCommand
+        """
+        from pyduinocli.commands.arduino import ArduinoCliCommand
+        key = (os.getpid(), self)
+        with ArduinoHandle.__lock:
+            arduino = ArduinoHandle.__opened.get(key)
+            if arduino is None:
+                arduino = ArduinoCliCommand._restore(self.__base_args, self.options, self.__pid)
+                ArduinoHandle.__opened[key] = arduino
+            return arduino
+
+    def __eq__(self, other):
+        return isinstance(other, ArduinoHandle) and \
+            (self.__base_args, self.__options) == (other.__base_args, other.__options)
+
+    def __hash__(self):
+        return hash((self.__base_args, self.__options))
+
+    def __repr__(self):
+        return "ArduinoHandle(%r, %r)" % (list(self.__base_args), dict(self.__options))
@@ -0,0 +1,182 @@
+import contextvars
+import time
+from pyduinocli.executors.arguments import command_path
+
+
+class CommandHook:
+    """
+    Base class of the objects notified of every :code:`arduino-cli` invocation made by the command wrappers, e.g. to
+    collect metrics or traces. Hooks are added with :meth:`pyduinocli.commands.arduino.ArduinoCliCommand.add_hook`
+    and called from the thread or task making the call, in the order they were added. The exceptions they raise
+    propagate to the caller.
+
+    Each method receives the :class:`CommandCall` describing the invocation. Exactly one of :meth:`after` and
+    :meth:`error` is called for each call to :meth:`before`. :meth:`before` may change the :code:`command` of the
+    call, which is then the one run.
+    """
+
+    def before(self, call):
+        """
+        Called before the command runs
+
+        :param call: The invocation
+        :type call: CommandCall
+        """
+        pass
+
+    def after(self, call):
+        """
+        Called once the command succeeded
+
+        :param call: The invocation, with its timings, output sizes and return code
+        :type call: CommandCall
+        """
+        pass
+
+    def error(self, call, error):
+        """
+        Called when the command failed, timed out or was cancelled, or could not be run
+
+        :param call: The invocation, with what is known of its timings, output sizes and return code
+        :type call: CommandCall
+        :param error: The error raised to the caller
+        :type error: BaseException
+        """
+        pass
+
+    def parsed(self, call):
+        """
+        Called when the output of a successful command is parsed. Results are parsed lazily, so this happens when
+        their :code:`result` is first read, after :meth:`after`, or never.
+
+        :param call: The invocation, with its :code:`parse_time`
+        :type call: CommandCall
+        """
+        pass
+
+
+class CommandCall:
+    """
+    An :code:`arduino-cli` invocation, as seen by the :class:`CommandHook`.
+
+    Times are in seconds. :code:`spawn_latency` is the time it took to start the :code:`arduino-cli` process, it
+    stays None when no process was started, e.g. when the output was cached, coalesced or sent to a daemon.
+    :code:`lock_wait` is the time spent waiting for the file locks of
+    :class:`pyduinocli.executors.locking.LockingExecutor`. :code:`phases` and :code:`log` are set by
+    :class:`pyduinocli.commands.logs.LogTimings`.
+    """
+
+    __slots__ = ("hooks", "command", "path", "start", "wall_time", "spawn_latency", "stdout_bytes", "stderr_bytes",
+                 "parse_time", "returncode", "lock_wait", "phases", "log", "__reset")
+
+    __current = contextvars.ContextVar("pyduinocli_call", default=None)
+
+    def __init__(self, hooks, command):
+        """
+        :param hooks: The hooks notified of this invocation
+        :type hooks: tuple
+        :param command: The full command line
+        :type command: list
+        """
+        self.hooks = hooks
+        self.command = command
+        self.path = " ".join(command_path(command))
+        self.start = None
+        self.wall_time = None
+        self.spawn_latency = None
+        self.stdout_bytes = None
+        self.stderr_bytes = None
+        self.parse_time = None
+        self.returncode = None
+        self.lock_wait = None
+        self.phases = None
+        self.log = None
+        self.__reset = None
+
+    @staticmethod
+    def begin(context, command):
+        """
+        Starts an invocation and calls :meth:`CommandHook.before`, unless the context has no hook and does not
+        track the invocations
+
+        :param context: The context of the command wrapper making the call
+        :type context: pyduinocli.commands.context.CommandContext
+        :param command: The full command line
+        :type command: list
+        :return: The invocation, to be used as a context manager around the execution, or None
+        :rtype: CommandCall or NoneType
+        """
+        hooks = context.hooks
+        if not hooks and not context.track_calls:
+            return None
+        call = CommandCall(hooks, command)
+        for hook in hooks:
+            hook.before(call)
+        call.start = time.monotonic()
+        return call
+
+    @staticmethod
+    def spawned():
+        """
+        Records that the :code:`arduino-cli` process of the current invocation has started, called by the executors
+        """
+        call = CommandCall.__current.get()
+        if call is not None and call.spawn_latency is None:
+            call.spawn_latency = time.monotonic() - call.start
+
+    @staticmethod
+    def locked(wait):
+        """
+        Records the time the current invocation waited for its locks, called by the executors
+
+        :param wait: The time waited, in seconds
+        :type wait: float
+        """
+        call = CommandCall.__current.get()
+        if call is not None:
+            call.lock_wait = wait if call.lock_wait is None else call.lock_wait + wait
+
+    def done(self, returncode, stdout, stderr):
+        """
+        Records the output of the invocation
+
+        :param returncode: The return code of the command
+        :type returncode: int
+        :param stdout: The raw standard output of the command
+        :type stdout: bytes, str or pyduinocli.executors.spool.SpooledOutput
+        :param stderr: The raw standard error of the command
+        :type stderr: bytes or str
+        """
+        self.wall_time = time.monotonic() - self.start
+        self.returncode = returncode
+        self.stdout_bytes = len(stdout) if stdout is not None else 0
+        self.stderr_bytes = len(stderr) if stderr is not None else 0
+
+    def parsed(self, parse_time):
+        """
+        Records the time taken to parse the output and calls :meth:`CommandHook.parsed`
+
+        :param parse_time: The time taken to parse the output
+        :type parse_time: float
+        """
+        self.parse_time = parse_time
+        for hook in self.hooks:
+            hook.parsed(self)
+
+    def __enter__(self):
+        self.__reset = CommandCall.__current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        CommandCall.__current.reset(self.__reset)
+        if self.wall_time is None:
+            self.wall_time = time.monotonic() - self.start
+        if exc_value is None:
+            for hook in self.hooks:
+                hook.after(self)
+        else:
+            if self.returncode is None:
+                result = getattr(exc_value, "result", None)
+                self.returncode = getattr(result, "returncode", None)
+            for hook in self.hooks:
+                hook.error(self, exc_value)
@@ -8,8 +8,8 @@ class LibCommand(CommandBase):
     This class wraps the call to the :code:`lib` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.LIB)
 
     def deps(self, library):
@@ -36,7 +36,8 @@ class LibCommand(CommandBase):
         args.extend(CommandBase._strip_args(downloads))
         return self._exec(args)
 
-    def install(self, libraries=None, git_urls=None, zip_paths=None, no_overwrite=None, install_in_builtin_dir=None):
+    def install(self, libraries=None, git_urls=None, zip_paths=None, no_overwrite=None, install_in_builtin_dir=None,
+                on_progress=None):
         """
         Calls the :code:`lib install` command
 
@@ -50,6 +51,8 @@ class LibCommand(CommandBase):
         :type no_overwrite: bool or NoneType
         :param install_in_builtin_dir: Install libraries in the IDE-Builtin directory
         :type install_in_builtin_dir: bool or NoneType
+        :param on_progress: A function receiving the :class:`pyduinocli.executors.progress.ProgressEvent` of the command while it runs
+        :type on_progress: callable or NoneType
         :return: The output of the related command
         :rtype: dict
         """
@@ -66,7 +69,7 @@ class LibCommand(CommandBase):
             args.append(flags.NO_OVERWRITE)
         if install_in_builtin_dir is True:
             args.append(flags.INSTALL_IN_BUILTIN_DIR)
-        return self._exec(args)
+        return self._exec(args, on_progress)
 
     def list(self, all=None, updatable=None, fqbn=None, board_options=None):
         """
@@ -109,6 +112,26 @@ class LibCommand(CommandBase):
         :return: The output of the related command
         :rtype: dict
         """
+        return self._exec(LibCommand.__search_args(keywords, names, omit_releases_details))
+
+    def iter_search(self, keywords=None, names=None, omit_releases_details=None):
+        """
+        Calls the :code:`lib search` command and iterates over the libraries found, parsing them one by one. With
+        a spooled output, the memory used does not depend on the size of the library index.
+
+        :param keywords: A list of keywords to use to search, if None, all libraries will show up
+        :type keywords: list or NoneType
+        :param omit_releases_details: Omit library details far all versions except the latest (produce a more compact JSON output).
+        :type omit_releases_details: bool or NoneType
+        :param names: Only shows libraries names
+        :type names: bool or NoneType
+        :return: An iterator over the libraries found
+        :rtype: iterator
+        """
+        return self._iter(LibCommand.__search_args(keywords, names, omit_releases_details), "libraries")
+
+    @staticmethod
+    def __search_args(keywords, names, omit_releases_details):
         args = [commands.SEARCH]
         if names is True:
             args.append(flags.NAMES)
@@ -118,7 +141,7 @@ class LibCommand(CommandBase):
             keywords = []
         if keywords:
             args.extend(CommandBase._strip_args(keywords))
-        return self._exec(args)
+        return args
 
     def uninstall(self, uninstalls):
         """
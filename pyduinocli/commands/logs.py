@@ -0,0 +1,178 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pyduinocli.commands.hooks import CommandHook
+from pyduinocli.constants import flags
+
+#: The phase of the messages about the command line itself and of those matching none of the patterns
+CLI = "cli"
+#: The phase before the first message, mostly the start of the process
+STARTUP = "startup"
+#: The phases of a command, with the patterns of the log messages starting them, tried in order. The messages about
+#: the toolchain are matched on their first words, since they name cores, boards and ports too.
+PHASES = (
+    (CLI, re.compile(r"^(?:executing `arduino-cli|using config file)", re.IGNORECASE)),
+    ("download", re.compile(r"download", re.IGNORECASE)),
+    ("toolchain", re.compile(r"^(?:compil|link|archiv|running|recipe|exec\w* (?:command|recipe|tool)|upload|"
+                             r"avrdude|calling|sizer)", re.IGNORECASE)),
+    ("discovery", re.compile(r"discover|serial|port\b|ports\b", re.IGNORECASE)),
+    ("index", re.compile(r"index", re.IGNORECASE)),
+    ("libraries", re.compile(r"librar", re.IGNORECASE)),
+    ("platforms", re.compile(r"hardware|platform|package|core\b|board|tool", re.IGNORECASE)),
+)
+
+
+def phase_of(message):
+    """
+    Gets the phase started by a log message
+
+    :param message: The message
+    :type message: str
+    :return: The phase
+    :rtype: str
+    """
+    for phase, pattern in PHASES:
+        if pattern.search(message):
+            return phase
+    return CLI
+
+
+def breakdown(entries, end):
+    """
+    Splits the time taken by a command between its phases. Each log entry starts a phase, which lasts until the next
+    entry. The time before the first entry is counted as :data:`STARTUP`.
+
+    :param entries: The log entries, each with the :code:`elapsed` time since the command started
+    :type entries: list
+    :param end: The time taken by the command
+    :type end: float
+    :return: The time spent in each phase, in the order they first appeared
+    :rtype: dict
+    """
+    phases = dict()
+    phase, since = STARTUP, 0.0
+    for entry in entries:
+        elapsed = min(entry["elapsed"], end)
+        phases[phase] = phases.get(phase, 0.0) + max(0.0, elapsed - since)
+        phase, since = phase_of(str(entry.get("msg", ""))), elapsed
+    phases[phase] = phases.get(phase, 0.0) + max(0.0, end - since)
+    return phases
+
+
+class _LogTail(threading.Thread):
+
+    def __init__(self, path, interval):
+        threading.Thread.__init__(self, name="pyduinocli-log-tail", daemon=True)
+        self.__path = path
+        self.__interval = interval
+        self.__stop = threading.Event()
+        self.__file = None
+        self.__partial = b""
+        self.entries = list()
+
+    def __read(self, final=False):
+        if self.__file is None:
+            try:
+                self.__file = open(self.__path, "rb")
+            except OSError:
+                return
+        data = self.__partial + self.__file.read()
+        lines = data.split(b"\n")
+        self.__partial = b"" if final else lines.pop()
+        now = time.monotonic()
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = dict(msg=line.decode("utf-8", "replace"))
+            if not isinstance(entry, dict):
+                entry = dict(msg=str(entry))
+            entry["elapsed"] = now
+            self.entries.append(entry)
+
+    def run(self):
+        while not self.__stop.wait(self.__interval):
+            self.__read()
+
+    def finish(self):
+        self.__stop.set()
+        self.join()
+        self.__read(final=True)
+        if self.__file is not None:
+            self.__file.close()
+
+
+class LogTimings(CommandHook):
+    """
+    Gives each invocation of :code:`arduino-cli` its own JSON log file, tails it while the command runs, and splits
+    the time taken by the command between its phases: :data:`STARTUP`, :code:`index` loading, :code:`platforms`
+    and :code:`libraries` loading or discovery, tool :code:`download`, port :code:`discovery`, :code:`toolchain`
+    runs (compiler, linker, uploader) and the rest of the :data:`CLI` work. The breakdown is attached to the result
+    as :attr:`pyduinocli.commands.result.CommandResult.phases`, along with the log entries.
+
+    The entries are timed when they are read, since :code:`arduino-cli` only logs times to the second, so the
+    breakdown has the resolution of the polling interval. The per call log file replaces the :code:`log_file` given
+    to the wrapper, and makes every command line unique, so the outputs are neither coalesced nor cached. Only the
+    subprocess backend runs each command in its own process, with its own log file.
+    """
+
+    def __init__(self, level="debug", interval=0.01, directory=None):
+        """
+        :param level: The log level asked to :code:`arduino-cli`, the lower the finer the breakdown
+        :type level: str
+        :param interval: The time between two reads of the log file, in seconds
+        :type interval: float
+        :param directory: The directory of the log files, the temporary directory if None
+        :type directory: str or NoneType
+        """
+        self.__level = level
+        self.__interval = interval
+        self.__directory = directory
+        self.__tails = dict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def __without_log_flags(command):
+        stripped = list()
+        tokens = iter(command)
+        for token in tokens:
+            if token in (flags.LOG_FILE, flags.LOG_FORMAT, flags.LOG_LEVEL):
+                next(tokens, None)
+            elif not token.startswith((flags.LOG_FILE + "=", flags.LOG_FORMAT + "=", flags.LOG_LEVEL + "=")):
+                stripped.append(token)
+        return stripped
+
+    def before(self, call):
+        descriptor, path = tempfile.mkstemp(prefix="arduino-cli-", suffix=".log", dir=self.__directory)
+        os.close(descriptor)
+        command = LogTimings.__without_log_flags(call.command)
+        command[1:1] = [flags.LOG_FILE, path, flags.LOG_FORMAT, "json", flags.LOG_LEVEL, self.__level]
+        call.command = command
+        tail = _LogTail(path, self.__interval)
+        with self.__lock:
+            self.__tails[id(call)] = (tail, path)
+        tail.start()
+
+    def __finish(self, call):
+        with self.__lock:
+            tail, path = self.__tails.pop(id(call))
+        tail.finish()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        for entry in tail.entries:
+            entry["elapsed"] = max(0.0, entry["elapsed"] - call.start)
+        call.log = tail.entries
+        call.phases = breakdown(tail.entries, call.wall_time)
+
+    def after(self, call):
+        self.__finish(call)
+
+    def error(self, call, error):
+        self.__finish(call)
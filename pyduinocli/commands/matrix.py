@@ -0,0 +1,194 @@
+import concurrent.futures
+import contextlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors.scheduling import compile_priority, current_priority
+
+
+class MatrixResult:
+    """
+    The outcome of one target of :func:`compile_matrix`. Times are in seconds.
+
+    :code:`sizes` maps each section of the executable (e.g. :code:`text`, :code:`data`) to its size in bytes, as
+    reported by :code:`arduino-cli`. :code:`error` is the exception raised by the build, None if it succeeded.
+    """
+
+    __slots__ = ("name", "target", "result", "error", "duration", "sizes", "output_dir", "build_path")
+
+    def __init__(self, name, target, output_dir, build_path):
+        """
+        :param name: The name of the target
+        :type name: str
+        :param target: The arguments of the build, as given to :meth:`pyduinocli.commands.compile.CompileCommand.__call__`
+        :type target: dict
+        :param output_dir: The directory the binaries are exported to, None if they are not exported
+        :type output_dir: str or NoneType
+        :param build_path: The build directory of the target
+        :type build_path: str
+        """
+        self.name = name
+        self.target = target
+        self.result = None
+        self.error = None
+        self.duration = None
+        self.sizes = None
+        self.output_dir = output_dir
+        self.build_path = build_path
+
+    @property
+    def ok(self):
+        """
+        Whether the build succeeded
+
+        :type: bool
+        """
+        return self.error is None and self.result is not None
+
+    def to_dict(self):
+        """
+        Converts this result to a plain dict
+
+        :return: The :code:`name`, :code:`target`, :code:`ok`, :code:`duration`, :code:`sizes`, :code:`output_dir`
+            and :code:`error` of the build
+        :rtype: dict
+        """
+        error = None
+        if self.error is not None:
+            message = self.result.stderr if isinstance(self.error, ArduinoError) else str(self.error)
+            error = "%s: %s" % (type(self.error).__name__, (message or "").strip())
+        return dict(name=self.name, target=self.target, ok=self.ok, duration=self.duration, sizes=self.sizes,
+                    output_dir=self.output_dir, error=error)
+
+
+def target_name(target):
+    """
+    Gets a name for a build target, usable as a directory name, e.g. :code:`arduino_avr_mega_cpu_atmega2560` for the
+    FQBN :code:`arduino:avr:mega:cpu=atmega2560`
+
+    :param target: The target, its :code:`name` is used if it has one
+    :type target: dict
+    :return: The name
+    :rtype: str
+    """
+    if target.get("name"):
+        return str(target["name"])
+    parts = [target.get("fqbn") or "default"]
+    parts.extend("%s=%s" % option for option in sorted((target.get("board_options") or {}).items()))
+    parts.extend(target.get("build_properties") or ())
+    return re.sub(r"[^A-Za-z0-9.-]+", "_", "_".join(parts)).strip("_")
+
+
+def _sizes(result):
+    try:
+        sections = result.result["builder_result"]["executable_sections_size"]
+    except (KeyError, TypeError):
+        return None
+    return {section.get("name"): section.get("size") for section in sections or ()}
+
+
+def compile_matrix(arduino, sketch, targets, max_workers=None, build_root=None, build_cache_path=None,
+                   output_root=None, timeout=None, priority=None, **options):
+    """
+    Compiles a sketch for several targets at the same time and yields their results as they complete. Each target
+    gets its own build directory so that the builds do not step on each other, while they share a build cache so that
+    the cores are only built once per board.
+
+    .. code-block:: python
+
+        targets = [dict(fqbn="arduino:avr:uno"), dict(fqbn="arduino:avr:mega", board_options=dict(cpu="atmega2560"))]
+        for result in compile_matrix(arduino, "Blink", targets, output_root="binaries"):
+            print(result.name, result.ok, result.duration, result.sizes)
+
+    The builds start right away, in the order of the targets, even if the results are not read.
+
+    :param arduino: The wrapper running the builds
+    :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+    :param sketch: The sketch to compile
+    :type sketch: str
+    :param targets: The targets, each a FQBN or a dict of arguments of
+        :meth:`pyduinocli.commands.compile.CompileCommand.__call__` (e.g. :code:`fqbn`, :code:`board_options`,
+        :code:`build_properties`) with an optional :code:`name`, see :func:`target_name`
+    :type targets: list
+    :param max_workers: The max number of builds running at the same time, the number of CPUs if None. Unless the
+        wrapper has a compile scheduler or :code:`jobs` is given, the CPUs are shared evenly between them.
+    :type max_workers: int or NoneType
+    :param build_root: The directory holding the build directory of each target, they are kept. A temporary directory
+        removed once the builds are done if None
+    :type build_root: str or NoneType
+    :param build_cache_path: The build cache shared by the targets, a :code:`cache` directory in the build root if None
+    :type build_cache_path: str or NoneType
+    :param output_root: The directory holding the binaries exported for each target, in a directory named after it.
+        They are not exported if None
+    :type output_root: str or NoneType
+    :param timeout: The max time each build can take, in seconds
+    :type timeout: float or NoneType
+    :param priority: The priority of the builds when the wrapper has a compile scheduler, see
+        :data:`pyduinocli.executors.scheduling.PRIORITIES`. The priority given to the caller by
+        :func:`pyduinocli.executors.scheduling.compile_priority` if None
+    :type priority: str or NoneType
+    :param options: Other arguments of :meth:`pyduinocli.commands.compile.CompileCommand.__call__` given to all the
+        builds, e.g. :code:`warnings`
+    :return: An iterator over the :class:`MatrixResult` of the targets, in completion order
+    :rtype: iterator
+    """
+    targets = [dict(fqbn=target) if isinstance(target, str) else dict(target) for target in targets]
+    names = [target_name(target) for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError("Several targets have the same name, give them distinct names")
+    temporary = build_root is None
+    if temporary:
+        build_root = tempfile.mkdtemp(prefix="pyduinocli-matrix-")
+    if build_cache_path is None:
+        build_cache_path = os.path.join(build_root, "cache")
+    priority = priority or current_priority()
+    cpus = os.cpu_count() or 1
+    workers = max_workers or cpus
+    if arduino.compile_scheduler is None and "jobs" not in options:
+        # without a scheduler each build would run as many jobs as there are CPUs, share them between the builds
+        options = dict(options, jobs=max(1, cpus // max(1, min(workers, len(targets)))))
+    remaining = [len(targets)]
+    lock = threading.Lock()
+
+    def build(name, target):
+        arguments = dict(options)
+        arguments.update((key, value) for key, value in target.items() if key != "name")
+        result = MatrixResult(name, target, None if output_root is None else os.path.join(output_root, name),
+                              os.path.join(build_root, name))
+        arguments.update(build_path=result.build_path, build_cache_path=build_cache_path)
+        if result.output_dir is not None:
+            arguments["output_dir"] = result.output_dir
+        start = time.monotonic()
+        try:
+            with arduino.span("compile " + name):
+                with Deadline(timeout=timeout), \
+                        compile_priority(priority) if priority else contextlib.nullcontext():
+                    result.result = arduino.compile(sketch, **arguments)
+            result.sizes = _sizes(result.result)
+        except ArduinoError as e:
+            result.error = e
+            result.result = e.result
+        except Exception as e:
+            result.error = e
+        result.duration = time.monotonic() - start
+        if temporary:
+            shutil.rmtree(result.build_path, ignore_errors=True)
+            with lock:
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                shutil.rmtree(build_root, ignore_errors=True)
+        return result
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers,
+                                                 thread_name_prefix="pyduinocli-matrix")
+    futures = [pool.submit(build, name, target) for name, target in zip(names, targets)]
+    pool.shutdown(wait=False)
+    if not futures and temporary:
+        shutil.rmtree(build_root, ignore_errors=True)
+    return (future.result() for future in concurrent.futures.as_completed(futures))
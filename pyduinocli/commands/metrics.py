@@ -0,0 +1,226 @@
+import bisect
+import threading
+from pyduinocli.commands.hooks import CommandHook
+
+#: The default upper bounds of the latency histograms, in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+                   600.0)
+
+
+class Histogram:
+    """
+    A latency histogram with cumulative buckets, as exported to Prometheus
+    """
+
+    __slots__ = ("__bounds", "__counts", "__sum", "__count")
+
+    def __init__(self, bounds=DEFAULT_BUCKETS):
+        """
+        :param bounds: The upper bounds of the buckets, in increasing order
+        :type bounds: tuple
+        """
+        self.__bounds = bounds
+        self.__counts = [0] * (len(bounds) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+
+    def observe(self, value):
+        """
+        Adds a value to the histogram
+
+        :param value: The value
+        :type value: float
+        """
+        self.__counts[bisect.bisect_left(self.__bounds, value)] += 1
+        self.__sum += value
+        self.__count += 1
+
+    @property
+    def count(self):
+        """
+        The number of values observed
+
+        :type: int
+        """
+        return self.__count
+
+    @property
+    def sum(self):
+        """
+        The sum of the values observed
+
+        :type: float
+        """
+        return self.__sum
+
+    def buckets(self):
+        """
+        Gets the cumulative counts of the buckets
+
+        :return: A list of tuples :code:`(upper bound, count)`, the last bound being :code:`float("inf")`
+        :rtype: list
+        """
+        buckets = list()
+        total = 0
+        for bound, count in zip(self.__bounds + (float("inf"),), self.__counts):
+            total += count
+            buckets.append((bound, total))
+        return buckets
+
+
+class MetricsRegistry(CommandHook):
+    """
+    Collects metrics about every :code:`arduino-cli` invocation, per command path (e.g. :code:`lib install`): the
+    number of calls per return code, the errors per type, the bytes of output, and histograms of the wall time, the
+    process spawn latency, the lock wait time and the JSON parse time. They can be exported in the Prometheus text
+    format.
+
+    .. code-block:: python
+
+        arduino = pyduinocli.Arduino("./arduino-cli", metrics=True)
+        ...
+        print(arduino.metrics.to_prometheus())
+    """
+
+    __PREFIX = "pyduinocli_"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        """
+        :param buckets: The upper bounds of the histogram buckets, in seconds
+        :type buckets: tuple
+        """
+        self.__buckets = tuple(buckets)
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears all the metrics
+        """
+        with self.__lock:
+            self.__calls = dict()
+            self.__errors = dict()
+            self.__stdout_bytes = dict()
+            self.__stderr_bytes = dict()
+            self.__durations = dict()
+            self.__spawn_latencies = dict()
+            self.__lock_waits = dict()
+            self.__parse_times = dict()
+
+    def __observe(self, histograms, path, value):
+        histogram = histograms.get(path)
+        if histogram is None:
+            histogram = histograms[path] = Histogram(self.__buckets)
+        histogram.observe(value)
+
+    @staticmethod
+    def __increment(counters, key, value=1):
+        counters[key] = counters.get(key, 0) + value
+
+    def __record(self, call):
+        MetricsRegistry.__increment(self.__calls, (call.path, call.returncode))
+        if call.stdout_bytes is not None:
+            MetricsRegistry.__increment(self.__stdout_bytes, call.path, call.stdout_bytes)
+            MetricsRegistry.__increment(self.__stderr_bytes, call.path, call.stderr_bytes)
+        self.__observe(self.__durations, call.path, call.wall_time)
+        if call.spawn_latency is not None:
+            self.__observe(self.__spawn_latencies, call.path, call.spawn_latency)
+        if call.lock_wait is not None:
+            self.__observe(self.__lock_waits, call.path, call.lock_wait)
+
+    def after(self, call):
+        with self.__lock:
+            self.__record(call)
+
+    def error(self, call, error):
+        with self.__lock:
+            self.__record(call)
+            MetricsRegistry.__increment(self.__errors, (call.path, type(error).__name__))
+
+    def parsed(self, call):
+        with self.__lock:
+            self.__observe(self.__parse_times, call.path, call.parse_time)
+
+    def snapshot(self):
+        """
+        Gets the current metrics per command path
+
+        :return: For each command path, a dict with its :code:`calls` per return code, :code:`errors` per type,
+            :code:`stdout_bytes`, :code:`stderr_bytes`, and the :code:`count` and :code:`sum` of its
+            :code:`duration`, :code:`spawn_latency`, :code:`lock_wait` and :code:`parse_time`
+        :rtype: dict
+        """
+        with self.__lock:
+            paths = {path for path, _ in self.__calls}
+            snapshot = dict()
+            for path in sorted(paths):
+                metrics = dict(
+                    calls={returncode: count for (p, returncode), count in self.__calls.items() if p == path},
+                    errors={error: count for (p, error), count in self.__errors.items() if p == path},
+                    stdout_bytes=self.__stdout_bytes.get(path, 0),
+                    stderr_bytes=self.__stderr_bytes.get(path, 0),
+                )
+                for name, histograms in (("duration", self.__durations), ("spawn_latency", self.__spawn_latencies),
+                                         ("lock_wait", self.__lock_waits), ("parse_time", self.__parse_times)):
+                    histogram = histograms.get(path)
+                    metrics[name] = dict(count=histogram.count if histogram else 0,
+                                         sum=histogram.sum if histogram else 0.0)
+                snapshot[path] = metrics
+            return snapshot
+
+    @staticmethod
+    def __labels(**labels):
+        return "{" + ",".join('%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+                              for name, value in labels.items()) + "}"
+
+    @staticmethod
+    def __number(value):
+        if value == float("inf"):
+            return "+Inf"
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+    def to_prometheus(self):
+        """
+        Exports the metrics in the Prometheus text exposition format
+
+        :return: The metrics
+        :rtype: str
+        """
+        prefix = MetricsRegistry.__PREFIX
+        labels = MetricsRegistry.__labels
+        number = MetricsRegistry.__number
+        lines = list()
+        with self.__lock:
+            counters = (
+                ("commands_total", "Number of arduino-cli invocations", (
+                    (labels(command=path, returncode="none" if code is None else code), count)
+                    for (path, code), count in sorted(self.__calls.items(), key=lambda item: str(item[0])))),
+                ("command_errors_total", "Number of failed arduino-cli invocations", (
+                    (labels(command=path, error=error), count)
+                    for (path, error), count in sorted(self.__errors.items()))),
+                ("stdout_bytes_total", "Bytes written to the standard output by arduino-cli", (
+                    (labels(command=path), count) for path, count in sorted(self.__stdout_bytes.items()))),
+                ("stderr_bytes_total", "Bytes written to the standard error by arduino-cli", (
+                    (labels(command=path), count) for path, count in sorted(self.__stderr_bytes.items()))),
+            )
+            for name, description, samples in counters:
+                lines.append("# HELP %s%s %s" % (prefix, name, description))
+                lines.append("# TYPE %s%s counter" % (prefix, name))
+                for sample_labels, value in samples:
+                    lines.append("%s%s%s %s" % (prefix, name, sample_labels, number(value)))
+            histograms = (
+                ("command_duration_seconds", "Wall time of the arduino-cli invocations", self.__durations),
+                ("command_spawn_seconds", "Time taken to start the arduino-cli processes", self.__spawn_latencies),
+                ("lock_wait_seconds", "Time spent waiting for the data and configuration locks", self.__lock_waits),
+                ("result_parse_seconds", "Time taken to parse the outputs of arduino-cli", self.__parse_times),
+            )
+            for name, description, per_path in histograms:
+                lines.append("# HELP %s%s %s" % (prefix, name, description))
+                lines.append("# TYPE %s%s histogram" % (prefix, name))
+                for path, histogram in sorted(per_path.items()):
+                    for bound, count in histogram.buckets():
+                        lines.append("%s%s_bucket%s %d" % (prefix, name, labels(command=path, le=number(bound)),
+                                                           count))
+                    lines.append("%s%s_sum%s %s" % (prefix, name, labels(command=path), number(histogram.sum)))
+                    lines.append("%s%s_count%s %d" % (prefix, name, labels(command=path), histogram.count))
+        return "\n".join(lines) + "\n"
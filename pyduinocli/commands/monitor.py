@@ -8,8 +8,8 @@ class MonitorCommand(CommandBase):
     This class wraps the call to the :code:`monitor` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.MONITOR)
 
     def __call__(self, config=None, describe=None, discovery_timeout=None, fqbn=None, port=None, protocol=None,
@@ -7,8 +7,8 @@ class OutdatedCommand(CommandBase):
     This class wraps the call to the :code:`outdated` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.OUTDATED)
 
     def __call__(self):
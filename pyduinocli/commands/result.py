@@ -0,0 +1,345 @@
+import codecs
+import json
+import time
+from collections.abc import Mapping
+from pyduinocli.executors.spool import SpooledOutput
+
+_fast_json = None
+
+
+def loads(data):
+    """
+    Parses a JSON document, with :code:`orjson` when it is installed
+
+    :param data: The JSON document
+    :type data: bytes, str or pyduinocli.executors.spool.SpooledOutput
+    :return: The parsed document
+    """
+    global _fast_json
+    if isinstance(data, SpooledOutput):
+        data = data.getvalue()
+    if _fast_json is None:
+        try:
+            import orjson as _fast_json
+        except ImportError:
+            _fast_json = json
+    return _fast_json.loads(data)
+
+
+def decode(data):
+    """
+    Decodes the output of :code:`arduino-cli`
+
+    :param data: The raw output
+    :type data: bytes, str, pyduinocli.executors.spool.SpooledOutput or NoneType
+    :return: The decoded output, with universal newlines
+    :rtype: str or NoneType
+    """
+    if isinstance(data, SpooledOutput):
+        data = data.getvalue()
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data).decode("utf-8", "replace")
+    if data is not None and "\r" in data:
+        data = data.replace("\r\n", "\n")
+    return data
+
+
+def chunks(data, size=65536):
+    """
+    Splits the output of :code:`arduino-cli` into chunks
+
+    :param data: The raw output
+    :type data: bytes, str or pyduinocli.executors.spool.SpooledOutput
+    :param size: The size of the chunks
+    :type size: int
+    :return: An iterator over the chunks
+    :rtype: iterator
+    """
+    if isinstance(data, SpooledOutput):
+        return data.chunks(size)
+    if isinstance(data, str):
+        return iter((data,))
+    view = memoryview(data)
+    return (bytes(view[i:i + size]) for i in range(0, len(view), size))
+
+
+class _JsonReader:
+
+    __WHITESPACE = " \t\n\r"
+    __DECODER = json.JSONDecoder()
+
+    def __init__(self, chunks):
+        self.__chunks = iter(chunks)
+        self.__decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.__buffer = ""
+        self.__pos = 0
+        self.__eof = False
+
+    def __more(self):
+        if self.__eof:
+            return False
+        chunk = next(self.__chunks, None)
+        if chunk is None:
+            text = self.__decoder.decode(b"", final=True)
+            self.__eof = True
+        elif isinstance(chunk, str):
+            text = chunk
+        else:
+            text = self.__decoder.decode(chunk)
+        self.__buffer = self.__buffer[self.__pos:] + text
+        self.__pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.__pos < len(self.__buffer) and self.__buffer[self.__pos] in _JsonReader.__WHITESPACE:
+                self.__pos += 1
+            if self.__pos < len(self.__buffer):
+                return self.__buffer[self.__pos]
+            if not self.__more():
+                return ""
+
+    def take(self):
+        char = self.peek()
+        self.__pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _JsonReader.__DECODER.raw_decode(self.__buffer, self.__pos)
+            except json.JSONDecodeError:
+                if not self.__more():
+                    raise
+                continue
+            if end == len(self.__buffer) and self.__more():
+                continue
+            self.__pos = end
+            return value
+
+
+def iter_json_items(chunks, key=None):
+    """
+    Parses the items of the main array of a JSON document one by one, without loading the whole document. The main
+    array is either the document itself, the member :code:`key` of the document, or its first member that is an
+    array when :code:`key` is None.
+
+    :param chunks: The chunks of the JSON document
+    :type chunks: iterable
+    :param key: The name of the member holding the array
+    :type key: str or NoneType
+    :return: An iterator over the items of the array
+    :rtype: iterator
+    """
+    reader = _JsonReader(chunks)
+    char = reader.take()
+    if char == "":
+        return
+    if char == "{":
+        while True:
+            if reader.peek() == "}":
+                return
+            name = reader.value()
+            if reader.take() != ":":
+                raise ValueError("Invalid JSON object")
+            if reader.peek() == "[" and (key is None or name == key):
+                reader.take()
+                break
+            reader.value()
+            char = reader.peek()
+            if char == ",":
+                reader.take()
+            elif char != "}":
+                raise ValueError("Invalid JSON object")
+    elif char != "[":
+        raise ValueError("The JSON document holds no array")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        char = reader.take()
+        if char == "]":
+            return
+        if char != ",":
+            raise ValueError("Invalid JSON array")
+
+
+class CommandResult(Mapping):
+    """
+    The output of a command. It behaves like the read-only dict :code:`{"__stdout": ..., "__stderr": ...,
+    "result": ...}` returned by the previous versions of pyduinocli.
+
+    The raw output is kept as returned by :code:`arduino-cli` and is only decoded and parsed when it is first
+    accessed. When :code:`keep_output` is disabled, the standard error of successful commands is dropped right away
+    and the standard output is dropped once parsed, then only :code:`result` is available.
+    """
+
+    __slots__ = ("_returncode", "_stdout", "_stderr", "_result", "_parsed", "_keep_output", "_call")
+
+    __STDOUT = "__stdout"
+    __STDERR = "__stderr"
+    __RESULT = "result"
+
+    def __init__(self, returncode, stdout, stderr, keep_output=True, call=None):
+        """
+        :param returncode: The return code of the command
+        :type returncode: int or NoneType
+        :param stdout: The raw standard output of the command
+        :type stdout: bytes or str
+        :param stderr: The raw standard error of the command
+        :type stderr: bytes or str
+        :param keep_output: Keep the standard output and error once the result is parsed
+        :type keep_output: bool
+        :param call: The invocation notified when the output is parsed
+        :type call: pyduinocli.commands.hooks.CommandCall or NoneType
+        """
+        keep_output = keep_output or returncode != 0
+        self._returncode = returncode
+        self._stdout = stdout
+        self._stderr = stderr if keep_output else None
+        self._result = None
+        self._parsed = False
+        self._keep_output = keep_output
+        self._call = call
+
+    @property
+    def returncode(self):
+        """
+        The return code of the command, None if it was interrupted
+
+        :type: int or NoneType
+        """
+        return self._returncode
+
+    @property
+    def stdout(self):
+        """
+        The standard output of the command, None if it was not kept
+
+        :type: str or NoneType
+        """
+        return decode(self._stdout)
+
+    @property
+    def stderr(self):
+        """
+        The standard error of the command, None if it was not kept
+
+        :type: str or NoneType
+        """
+        return decode(self._stderr)
+
+    @property
+    def raw_stdout(self):
+        """
+        The standard output of the command as returned by :code:`arduino-cli`, None if it was not kept
+
+        :type: bytes, str or NoneType
+        """
+        return self._stdout
+
+    @property
+    def result(self):
+        """
+        The parsed JSON output of the command, or its standard output if it is not valid JSON. None if the command
+        was interrupted, since its output is incomplete.
+
+        :type: dict, list, str or NoneType
+        """
+        if not self._parsed and self._returncode is not None:
+            start = time.monotonic()
+            try:
+                self._result = loads(self._stdout)
+            except ValueError:
+                self._result = decode(self._stdout)
+            self._parsed = True
+            if self._call is not None:
+                self._call.parsed(time.monotonic() - start)
+            if not self._keep_output:
+                self._stdout = None
+        return self._result
+
+    @property
+    def lock_wait(self):
+        """
+        The time spent waiting for the locks on the data and configuration directories before running the command,
+        in seconds. None unless the wrapper was created with :code:`file_locks` and the command needed a lock.
+
+        :type: float or NoneType
+        """
+        return None if self._call is None else self._call.lock_wait
+
+    @property
+    def phases(self):
+        """
+        The time spent by :code:`arduino-cli` in each phase of the command (e.g. :code:`index`, :code:`libraries`,
+        :code:`discovery`, :code:`toolchain`), in seconds, as read from its logs. None unless the wrapper was created
+        with :code:`log_timings`, see :class:`pyduinocli.commands.logs.LogTimings`.
+
+        :type: dict or NoneType
+        """
+        return None if self._call is None else self._call.phases
+
+    @property
+    def log(self):
+        """
+        The entries logged by :code:`arduino-cli` while running the command, each with the :code:`elapsed` time since
+        the command started. None unless the wrapper was created with :code:`log_timings`.
+
+        :type: list or NoneType
+        """
+        return None if self._call is None else self._call.log
+
+    def iter_items(self, key=None):
+        """
+        Iterates over the items of the main array of the output, e.g. the libraries found by :code:`lib search`.
+        Unless the output was already parsed, it is parsed item by item, so only one item is in memory at a time
+        when the output was spooled to a file.
+
+        :param key: The name of the member holding the array, the first member that is an array if None
+        :type key: str or NoneType
+        :return: An iterator over the items of the array
+        :rtype: iterator
+        """
+        if self._parsed or self._stdout is None:
+            result = self.result
+            if isinstance(result, dict):
+                if key is None:
+                    result = next((value for value in result.values() if isinstance(value, list)), [])
+                else:
+                    result = result.get(key) or []
+            return iter(result if isinstance(result, list) else [])
+        return iter_json_items(chunks(self._stdout), key)
+
+    def __keys(self):
+        if self._keep_output:
+            return CommandResult.__STDOUT, CommandResult.__STDERR, CommandResult.__RESULT
+        return CommandResult.__RESULT,
+
+    def __getitem__(self, key):
+        if key == CommandResult.__RESULT:
+            return self.result
+        if self._keep_output and key == CommandResult.__STDOUT:
+            return self.stdout
+        if self._keep_output and key == CommandResult.__STDERR:
+            return self.stderr
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.__keys())
+
+    def __len__(self):
+        return len(self.__keys())
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def to_dict(self):
+        """
+        Converts this result to a plain dict
+
+        :return: The result as a dict
+        :rtype: dict
+        """
+        return dict(self)
@@ -8,8 +8,8 @@ class SketchCommand(CommandBase):
     This class wraps the call to the :code:`sketch` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.SKETCH)
 
     def new(self, name, overwrite=None):
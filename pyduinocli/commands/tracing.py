@@ -0,0 +1,158 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+from pyduinocli.commands.hooks import CommandHook
+
+
+def process_path(path, pid=None):
+    """
+    Gets the path of a file written by a single process: :code:`{pid}` is replaced by the id of the process, which is
+    added before the extension if the path does not hold it, e.g. :code:`trace-1234.json` for :code:`trace.json`
+
+    :param path: The path
+    :type path: str
+    :param pid: The id of the process, the current one if None
+    :type pid: int or NoneType
+    :return: The path of the process
+    :rtype: str
+    """
+    if "{pid}" not in path:
+        root, extension = os.path.splitext(path)
+        path = root + "-{pid}" + extension
+    return path.replace("{pid}", str(os.getpid() if pid is None else pid))
+
+
+class Tracer(CommandHook):
+    """
+    Writes a timeline of the :code:`arduino-cli` invocations as Chrome trace events, which can be opened in
+    :code:`chrome://tracing` or https://ui.perfetto.dev. Each invocation is a span on the track of the thread or
+    asyncio task that made it, with its arguments, return code and output sizes. Higher-level work can be wrapped in
+    :meth:`span` so that the invocations it makes are nested under it.
+
+    The events are written to the file as they happen, so long runs do not accumulate them in memory. The file is a
+    valid JSON array once the tracer is closed, and viewers also open the files of runs that did not close it.
+    Each process writes its own file, named after its id (see :func:`process_path`), and an existing file is never
+    overwritten, a number is added to the name instead. Timestamps come from :code:`time.monotonic()`, so the files
+    written by several processes on one machine can be merged.
+
+    .. code-block:: python
+
+        arduino = pyduinocli.Arduino("./arduino-cli", trace_file="trace.json")
+        with arduino.span("flash", port=port):
+            arduino.compile(sketch, fqbn=fqbn)
+            arduino.upload(sketch, fqbn=fqbn, port=port)
+        arduino.close()
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path to the trace file, :code:`{pid}` is replaced by the id of the process. Without it, the
+            id is added before the extension, e.g. :code:`trace-1234.json` for :code:`trace.json`
+        :type path: str
+        """
+        self.__pid = os.getpid()
+        self.__path, self.__file = Tracer.__create(process_path(path, self.__pid))
+        self.__lock = threading.Lock()
+        self.__file.write("[\n")
+        self.__file.write(json.dumps(dict(name="process_name", ph="M", pid=self.__pid,
+                                          args=dict(name="pyduinocli %d" % self.__pid))))
+        self.__tracks = dict()
+        self.__closed = False
+
+    @staticmethod
+    def __create(path):
+        root, extension = os.path.splitext(path)
+        number = 0
+        while True:
+            try:
+                return path, open(path, "x", encoding="utf-8")
+            except FileExistsError:
+                number += 1
+                path = "%s.%d%s" % (root, number, extension)
+
+    @property
+    def path(self):
+        """
+        The path to the trace file
+
+        :type: str
+        """
+        return self.__path
+
+    def __track(self):
+        task = None
+        asyncio = sys.modules.get("asyncio")
+        if asyncio is not None:
+            try:
+                task = asyncio.current_task()
+            except RuntimeError:
+                task = None
+        if task is not None:
+            return id(task), getattr(task, "get_name", lambda: "task")()
+        thread = threading.current_thread()
+        return thread.ident, thread.name
+
+    def __write(self, event):
+        line = json.dumps(event, default=str)
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__file.write(",\n" + line)
+
+    def __complete(self, name, category, start, duration, args):
+        tid, thread_name = self.__track()
+        if tid not in self.__tracks:
+            self.__tracks[tid] = thread_name
+            self.__write(dict(name="thread_name", ph="M", pid=self.__pid, tid=tid, args=dict(name=thread_name)))
+        self.__write(dict(name=name, cat=category, ph="X", ts=start * 1e6, dur=duration * 1e6, pid=self.__pid,
+                          tid=tid, args=args))
+
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """
+        Context manager recording the time spent inside it as a span, on the track of the current thread or task
+
+        :param name: The name of the span
+        :type name: str
+        :param args: Values shown along with the span
+        """
+        start = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.__complete(name, "span", start, time.monotonic() - start, args)
+
+    @staticmethod
+    def __call_args(call):
+        return dict(argv=call.command, returncode=call.returncode, stdout_bytes=call.stdout_bytes,
+                    stderr_bytes=call.stderr_bytes, spawn_latency=call.spawn_latency, lock_wait=call.lock_wait)
+
+    def after(self, call):
+        self.__complete(call.path or "arduino-cli", "command", call.start, call.wall_time, Tracer.__call_args(call))
+
+    def error(self, call, error):
+        args = Tracer.__call_args(call)
+        args["error"] = type(error).__name__
+        self.__complete(call.path or "arduino-cli", "command", call.start, call.wall_time, args)
+
+    def flush(self):
+        """
+        Writes the buffered events to the file
+        """
+        with self.__lock:
+            if self.__file is not None:
+                self.__file.flush()
+
+    def close(self):
+        """
+        Terminates the JSON array and closes the file, the next events are ignored
+        """
+        with self.__lock:
+            self.__closed = True
+            if self.__file is not None:
+                self.__file.write("\n]\n")
+                self.__file.close()
+                self.__file = None
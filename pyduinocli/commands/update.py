@@ -8,8 +8,8 @@ class UpdateCommand(CommandBase):
     This class wraps the call to the :code:`update` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.UPDATE)
 
     def __call__(self, show_outdated=None):
@@ -8,8 +8,8 @@ class UpgradeCommand(CommandBase):
     This class wraps the call to the :code:`upgrade` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.UPGRADE)
 
     def __call__(self, run_post_install=None, skip_post_install=None, run_pre_uninstall=None, skip_pre_uninstall=None):
@@ -8,13 +8,13 @@ class UploadCommand(CommandBase):
     This class wraps the call to the :code:`upload` command of :code:`arduino-cli`.
     """
 
-    def __init__(self, base_args):
-        CommandBase.__init__(self, base_args)
+    def __init__(self, base_args, context=None):
+        CommandBase.__init__(self, base_args, context)
         self._base_args.append(commands.UPLOAD)
 
     def __call__(self, sketch=None, fqbn=None, input_dir=None, input_file=None, port=None, verify=None, programmer=None,
                  discovery_timeout=None, protocol=None, board_options=None, profile=None, upload_fields=None,
-                 verbose=None):
+                 verbose=None, on_progress=None):
         """
         Calls the :code:`upload` command
 
@@ -44,6 +44,8 @@ class UploadCommand(CommandBase):
         :type verbose: bool or NoneType
         :param upload_fields: Sets values for fields required to upload
         :type upload_fields: dict or NoneType
+        :param on_progress: A function receiving the :class:`pyduinocli.executors.progress.ProgressEvent` of the command while it runs
+        :type on_progress: callable or NoneType
         :return: The output of the related command
         :rtype: dict
         """
@@ -78,4 +80,4 @@ class UploadCommand(CommandBase):
             for key, value in upload_fields.items():
                 field = "%s=%s" % (CommandBase._strip_arg(key), CommandBase._strip_arg(value))
                 args.extend([flags.UPLOAD_FIELD, field])
-        return self._exec(args)
+        return self._exec(args, on_progress)
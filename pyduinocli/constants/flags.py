@@ -70,3 +70,4 @@ SKIP_PRE_UNINSTALL = '--skip-pre-uninstall'
 RAW = '--raw'
 TIMESTAMP = '--timestamp'
 UPLOAD_FIELD = '--upload-field'
+JOBS = '--jobs'
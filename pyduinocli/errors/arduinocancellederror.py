@@ -0,0 +1,9 @@
+from pyduinocli.errors.arduinoerror import ArduinoError
+
+
+class ArduinoCancelledError(ArduinoError):
+    """
+    Raised when a command was cancelled through its cancellation token and was killed. The result holds the output
+    produced until then.
+    """
+    pass
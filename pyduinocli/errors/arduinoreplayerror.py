@@ -0,0 +1,15 @@
+class ArduinoReplayError(LookupError):
+    """
+    Raised by :class:`pyduinocli.executors.cassette.ReplayExecutor` when a command was not recorded in its cassette
+    """
+
+    def __init__(self, command, cassette):
+        """
+        :param command: The full command line that was not recorded
+        :type command: list
+        :param cassette: The path to the cassette
+        :type cassette: str
+        """
+        LookupError.__init__(self, "Command not recorded in %s: %s" % (cassette, " ".join(command[1:])))
+        self.command = command
+        self.cassette = cassette
@@ -0,0 +1,9 @@
+from pyduinocli.errors.arduinoerror import ArduinoError
+
+
+class ArduinoTimeoutError(ArduinoError):
+    """
+    Raised when a command did not finish before its deadline and was killed. The result holds the output produced
+    until then.
+    """
+    pass
@@ -0,0 +1,93 @@
+from collections import namedtuple
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+
+
+#: The sub-commands of each :code:`arduino-cli` command group
+SUBCOMMANDS = {
+    commands.BOARD: {commands.ATTACH, commands.DETAILS, commands.LIST, commands.LISTALL, commands.SEARCH},
+    commands.CACHE: {commands.CLEAN},
+    commands.CONFIG: {commands.ADD, commands.DELETE, commands.DUMP, commands.INIT, commands.REMOVE, commands.SET},
+    commands.CORE: {commands.DOWNLOAD, commands.INSTALL, commands.LIST, commands.SEARCH, commands.UNINSTALL,
+                    commands.UPDATE_INDEX, commands.UPGRADE},
+    commands.DEBUG: {commands.CHECK},
+    commands.LIB: {commands.DEPS, commands.DOWNLOAD, commands.EXAMPLES, commands.INSTALL, commands.LIST,
+                   commands.SEARCH, commands.UNINSTALL, commands.UPDATE_INDEX, commands.UPGRADE},
+    commands.SKETCH: {commands.ARCHIVE, commands.NEW},
+}
+
+#: The flags that are followed by a value
+VALUE_FLAGS = {
+    flags.ADDITIONAL_URLS, flags.BOARD_OPTIONS, flags.BUILD_CACHE_PATH, flags.BUILD_PATH, flags.BUILD_PROPERTY,
+    flags.CONFIG, flags.CONFIG_FILE, flags.DEBUG_FILE, flags.DEBUG_FILTER, flags.DEST_DIR, flags.DEST_FILE,
+    flags.DISCOVERY_TIMEOUT, flags.ENCRYPT_KEY, flags.FORMAT, flags.FQBN, flags.INPUT_DIR, flags.INPUT_FILE,
+    flags.INTERPRETER, flags.JOBS, flags.KEYS_KEYCHAIN, flags.LIBRARIES, flags.LIBRARY, flags.LOG_FILE,
+    flags.LOG_FORMAT, flags.LOG_LEVEL, flags.OUTPUT_DIR, flags.PORT, flags.PROFILE, flags.PROGRAMMER, flags.PROTOCOL,
+    flags.SIGN_KEY, flags.UPLOAD_FIELD, flags.WARNINGS,
+}
+
+#: The commands that neither change the configuration nor the installed platforms, libraries and indexes
+READ_ONLY = {
+    (commands.BOARD, commands.DETAILS), (commands.BOARD, commands.LIST), (commands.BOARD, commands.LISTALL),
+    (commands.BOARD, commands.SEARCH), (commands.CONFIG, commands.DUMP), (commands.CORE, commands.LIST),
+    (commands.CORE, commands.SEARCH), (commands.LIB, commands.DEPS), (commands.LIB, commands.EXAMPLES),
+    (commands.LIB, commands.LIST), (commands.LIB, commands.SEARCH), (commands.OUTDATED,), (commands.VERSION,),
+}
+
+#: The commands that change the configuration or the installed platforms, libraries and indexes
+MUTATING = {
+    (commands.CONFIG, commands.ADD), (commands.CONFIG, commands.DELETE), (commands.CONFIG, commands.INIT),
+    (commands.CONFIG, commands.REMOVE), (commands.CONFIG, commands.SET), (commands.CORE, commands.INSTALL),
+    (commands.CORE, commands.UNINSTALL), (commands.CORE, commands.UPDATE_INDEX), (commands.CORE, commands.UPGRADE),
+    (commands.LIB, commands.INSTALL), (commands.LIB, commands.UNINSTALL), (commands.LIB, commands.UPDATE_INDEX),
+    (commands.LIB, commands.UPGRADE), (commands.UPDATE,), (commands.UPGRADE,),
+}
+
+ParsedCommand = namedtuple("ParsedCommand", ["path", "options", "positionals"])
+"""
+An :code:`arduino-cli` command line split into its parts.
+
+:code:`path` is the tuple of command names (e.g. :code:`("lib", "install")`), :code:`options` maps each flag to the
+list of values it was given (:code:`True` for flags without value) and :code:`positionals` holds the remaining
+arguments.
+"""
+
+
+def parse_command(command):
+    """
+    Splits a command line built by the command wrappers into its command path, options and positional arguments.
+
+    :param command: The full command line, starting with the :code:`arduino-cli` executable
+    :type command: list
+    :return: The parsed command
+    :rtype: ParsedCommand
+    """
+    options = dict()
+    words = list()
+    tokens = iter(command[1:])
+    for token in tokens:
+        if token.startswith("--"):
+            name, equal, value = token.partition("=")
+            if not equal:
+                value = next(tokens, "") if name in VALUE_FLAGS else True
+            options.setdefault(name, []).append(value)
+        else:
+            words.append(token)
+    path = list()
+    if words:
+        path.append(words.pop(0))
+        if words and words[0] in SUBCOMMANDS.get(path[0], ()):
+            path.append(words.pop(0))
+    return ParsedCommand(tuple(path), options, words)
+
+
+def command_path(command):
+    """
+    Gets the command path of a command line, e.g. :code:`("board", "list")`
+
+    :param command: The full command line, starting with the :code:`arduino-cli` executable
+    :type command: list
+    :return: The command path
+    :rtype: tuple
+    """
+    return parse_command(command).path
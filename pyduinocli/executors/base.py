@@ -0,0 +1,264 @@
+import contextvars
+import functools
+import os
+import signal
+import subprocess
+import threading
+from subprocess import Popen, PIPE, TimeoutExpired
+from pyduinocli.commands.hooks import CommandCall
+from pyduinocli.commands.result import CommandResult
+from pyduinocli.errors.arduinocancellederror import ArduinoCancelledError
+from pyduinocli.errors.arduinotimeouterror import ArduinoTimeoutError
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors.progress import Progress, ProgressParser
+from pyduinocli.executors.spool import RingBuffer, SpooledOutput
+from pyduinocli.executors.textmode import json_output, text_command
+
+
+class ExecutorBase:
+    """
+    Base class of the objects actually running the :code:`arduino-cli` invocations built by the command wrappers.
+
+    An executor receives the full command line (executable, global flags, command path and arguments) and returns a
+    tuple :code:`(returncode, stdout, stderr)`, exactly as if :code:`arduino-cli` had been run in a subprocess. The
+    outputs are either the raw bytes written by :code:`arduino-cli`, strings or
+    :class:`pyduinocli.executors.spool.SpooledOutput`, they are decoded by the results.
+    Executors honor the current :class:`pyduinocli.executors.deadline.Deadline`.
+    """
+
+    def execute(self, command):
+        """
+        Runs a command
+
+        :param command: The full command line to run
+        :type command: list
+        :return: The return code, standard output and standard error of the command
+        :rtype: tuple
+        """
+        raise NotImplementedError()
+
+    async def execute_async(self, command):
+        """
+        Runs a command without blocking the event loop. By default, :meth:`execute` is run in the default executor
+        of the loop, with the deadline and progress of the calling task.
+
+        :param command: The full command line to run
+        :type command: list
+        :return: The return code, standard output and standard error of the command
+        :rtype: tuple
+        """
+        import asyncio
+        run = functools.partial(contextvars.copy_context().run, self.execute, command)
+        return await asyncio.get_running_loop().run_in_executor(None, run)
+
+    def close(self):
+        """
+        Releases the resources held by this executor
+        """
+        pass
+
+    @staticmethod
+    def _interrupted(deadline, stdout, stderr):
+        """
+        Builds the error raised when a command is stopped by its deadline
+
+        :param deadline: The deadline that stopped the command
+        :type deadline: pyduinocli.executors.deadline.Deadline
+        :param stdout: The standard output produced before the command was stopped
+        :type stdout: bytes or str
+        :param stderr: The standard error produced before the command was stopped
+        :type stderr: bytes or str
+        :return: The error to raise
+        :rtype: pyduinocli.errors.arduinoerror.ArduinoError
+        """
+        result = CommandResult(None, stdout, stderr)
+        if deadline.cancelled:
+            return ArduinoCancelledError(result)
+        return ArduinoTimeoutError(result)
+
+
+class SubprocessExecutor(ExecutorBase):
+    """
+    Runs every command in a new :code:`arduino-cli` process. This is the default executor.
+
+    Each process is started in its own process group, so that when its deadline is reached or it is cancelled, the
+    tools it started (e.g. avrdude) are killed along with it.
+
+    By default the outputs are fully buffered in memory. With a spool threshold, the standard output is moved to a
+    temporary file once it grows past it, and a :class:`pyduinocli.executors.spool.SpooledOutput` is returned in
+    place of the bytes. With a standard error limit, only the end of the standard error is kept.
+
+    When their progress is followed, the commands that only print it with the text output format (see
+    :data:`pyduinocli.executors.textmode.PROGRESS_COMMANDS`) are run with it, and their JSON output is built from
+    what they printed.
+    """
+
+    __POLL_INTERVAL = 0.1
+    __CHUNK_SIZE = 65536
+
+    def __init__(self, spool_threshold=None, stderr_limit=None):
+        """
+        :param spool_threshold: The size from which the standard output is moved to a temporary file, in bytes, it is kept in memory if None
+        :type spool_threshold: int or NoneType
+        :param stderr_limit: The max number of bytes of standard error kept, all of it if None
+        :type stderr_limit: int or NoneType
+        """
+        self.__spool_threshold = spool_threshold
+        self.__stderr_limit = stderr_limit
+
+    @staticmethod
+    def _group_options():
+        if os.name == 'nt':
+            return dict(creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+        return dict(start_new_session=True)
+
+    @staticmethod
+    def _kill(process):
+        if process.returncode is not None:
+            return
+        try:
+            if os.name == 'nt':
+                subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], capture_output=True)
+            else:
+                os.killpg(process.pid, signal.SIGKILL)
+        except (OSError, subprocess.SubprocessError):
+            process.kill()
+
+    @staticmethod
+    def __timeout(deadline):
+        timeout = None if deadline is None else deadline.remaining()
+        if deadline is not None and deadline.cancellable:
+            timeout = SubprocessExecutor.__POLL_INTERVAL if timeout is None else \
+                min(timeout, SubprocessExecutor.__POLL_INTERVAL)
+        return timeout
+
+    def __sinks(self):
+        stdout = bytearray() if self.__spool_threshold is None else SpooledOutput(self.__spool_threshold)
+        stderr = bytearray() if self.__stderr_limit is None else RingBuffer(self.__stderr_limit)
+        return stdout, stderr
+
+    @staticmethod
+    def __output(sink):
+        if isinstance(sink, SpooledOutput):
+            return sink
+        if isinstance(sink, RingBuffer):
+            return sink.getvalue()
+        return bytes(sink)
+
+    def execute(self, command):
+        deadline = Deadline.current()
+        progress = Progress.current()
+        text = None if progress is None else text_command(command)
+        if text is not None:
+            return json_output(command, *self.__execute_streamed(text, deadline, progress, json_stdout=False))
+        if self.__spool_threshold is not None or self.__stderr_limit is not None or progress is not None:
+            return self.__execute_streamed(command, deadline, progress)
+        with Popen(command, stdout=PIPE, stderr=PIPE, **SubprocessExecutor._group_options()) as p:
+            CommandCall.spawned()
+            while True:
+                try:
+                    stdout, stderr = p.communicate(timeout=SubprocessExecutor.__timeout(deadline))
+                    return p.returncode, stdout, stderr
+                except TimeoutExpired:
+                    if deadline.expired() or deadline.cancelled:
+                        SubprocessExecutor._kill(p)
+                        stdout, stderr = p.communicate()
+                        raise ExecutorBase._interrupted(deadline, stdout, stderr)
+                except BaseException:
+                    SubprocessExecutor._kill(p)
+                    raise
+
+    def __execute_streamed(self, command, deadline, progress, json_stdout=True):
+        stdout, stderr = self.__sinks()
+        parser = None if progress is None else ProgressParser(progress, json_stdout)
+        with Popen(command, stdout=PIPE, stderr=PIPE, **SubprocessExecutor._group_options()) as p:
+            CommandCall.spawned()
+            readers = [threading.Thread(target=SubprocessExecutor.__pump, args=(p.stdout, stdout, parser, "stdout"),
+                                        daemon=True),
+                       threading.Thread(target=SubprocessExecutor.__pump, args=(p.stderr, stderr, parser, "stderr"),
+                                        daemon=True)]
+            for reader in readers:
+                reader.start()
+            try:
+                while True:
+                    try:
+                        p.wait(timeout=SubprocessExecutor.__timeout(deadline))
+                        break
+                    except TimeoutExpired:
+                        if deadline.expired() or deadline.cancelled:
+                            SubprocessExecutor._kill(p)
+                            for reader in readers:
+                                reader.join()
+                            raise ExecutorBase._interrupted(deadline, SubprocessExecutor.__output(stdout),
+                                                            SubprocessExecutor.__output(stderr))
+                for reader in readers:
+                    reader.join()
+            except BaseException:
+                SubprocessExecutor._kill(p)
+                raise
+            if parser is not None:
+                parser.flush()
+                if json_stdout:
+                    parser.output(SubprocessExecutor.__output(stdout))
+            return p.returncode, SubprocessExecutor.__output(stdout), SubprocessExecutor.__output(stderr)
+
+    @staticmethod
+    def __pump(stream, sink, parser, name):
+        while True:
+            chunk = stream.read1(SubprocessExecutor.__CHUNK_SIZE)
+            if not chunk:
+                return
+            sink.extend(chunk)
+            if parser is not None:
+                parser.feed(chunk, name)
+
+    async def execute_async(self, command):
+        progress = Progress.current()
+        text = None if progress is None else text_command(command)
+        if text is not None:
+            return json_output(command, *await self.__execute_async(text, progress, json_stdout=False))
+        return await self.__execute_async(command, progress)
+
+    async def __execute_async(self, command, progress, json_stdout=True):
+        import asyncio
+        deadline = Deadline.current()
+        process = await asyncio.create_subprocess_exec(*command, stdout=PIPE, stderr=PIPE,
+                                                       **SubprocessExecutor._group_options())
+        CommandCall.spawned()
+        stdout, stderr = self.__sinks()
+        parser = None if progress is None else ProgressParser(progress, json_stdout)
+        readers = asyncio.gather(SubprocessExecutor.__read(process.stdout, stdout, parser, "stdout"),
+                                 SubprocessExecutor.__read(process.stderr, stderr, parser, "stderr"))
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(asyncio.shield(process.wait()), SubprocessExecutor.__timeout(deadline))
+                    break
+                except asyncio.TimeoutError:
+                    if deadline.expired() or deadline.cancelled:
+                        SubprocessExecutor._kill(process)
+                        await process.wait()
+                        await readers
+                        raise ExecutorBase._interrupted(deadline, SubprocessExecutor.__output(stdout),
+                                                        SubprocessExecutor.__output(stderr))
+            await readers
+        except BaseException:
+            SubprocessExecutor._kill(process)
+            await process.wait()
+            await asyncio.gather(readers, return_exceptions=True)
+            raise
+        if parser is not None:
+            parser.flush()
+            if json_stdout:
+                parser.output(SubprocessExecutor.__output(stdout))
+        return process.returncode, SubprocessExecutor.__output(stdout), SubprocessExecutor.__output(stderr)
+
+    @staticmethod
+    async def __read(stream, buffer, parser, name):
+        while True:
+            chunk = await stream.read(SubprocessExecutor.__CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer.extend(chunk)
+            if parser is not None:
+                parser.feed(chunk, name)
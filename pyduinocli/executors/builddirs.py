@@ -0,0 +1,406 @@
+import collections
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import parse_command
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors.locking import FileLock
+
+
+def build_key(sketch, fqbn=None, board_options=None, build_properties=None, profile=None):
+    """
+    Gets the name of the build directory of a build, the same for all the builds that can reuse each other's objects
+
+    :param sketch: The path to the sketch
+    :type sketch: str
+    :param fqbn: The FQBN of the board
+    :type fqbn: str or NoneType
+    :param board_options: The board options, as :code:`name=value` strings
+    :type board_options: list or NoneType
+    :param build_properties: The build properties, as :code:`name=value` strings
+    :type build_properties: list or NoneType
+    :param profile: The sketch profile
+    :type profile: str or NoneType
+    :return: The name, starting with the sketch and board names so that it can be found by hand
+    :rtype: str
+    """
+    sketch = os.path.normcase(os.path.abspath(sketch))
+    key = json.dumps([sketch, fqbn, sorted(board_options or ()), list(build_properties or ()), profile])
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    name = "%s-%s" % (os.path.basename(sketch.rstrip(os.sep)) or "sketch", fqbn or profile or "default")
+    return "%s-%s" % (re.sub(r"[^A-Za-z0-9.-]+", "_", name), digest)
+
+
+def _size(path):
+    total = 0
+    try:
+        entries = list(os.scandir(path))
+    except OSError:
+        return 0
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                total += _size(entry.path)
+            else:
+                total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
+
+
+class _Entry:
+
+    __slots__ = ("path", "size", "ram", "busy", "removed", "lock")
+
+    def __init__(self, path, size, ram):
+        self.path = path
+        self.size = size
+        self.ram = ram
+        self.busy = False
+        self.removed = False
+        self.lock = None
+
+
+class BuildDirectories:
+    """
+    A pool of persistent build directories, one per sketch, board, board options and build properties (see
+    :func:`build_key`), so that :code:`arduino-cli compile` only rebuilds what changed since the last build of the same
+    target. When the directories take more than their budget, the least recently used ones are removed.
+
+    The new directories can be placed on a RAM-backed file system, e.g. :code:`/dev/shm`, with a budget of their own.
+    When it is exceeded, the least recently used of them are moved to the disk, where their objects may be rebuilt
+    once since their path changed.
+
+    A directory is only used by one build at a time, the other builds of the same target wait for it. Several
+    processes can share the roots: each directory is locked with a file lock in :code:`root` while it is used, the
+    directories used by another process are neither moved nor removed, and the processes take turns to do so. Each
+    process keeps its own account of the sizes, so the budgets are only enforced per process.
+    """
+
+    __LOCKS = ".locks"
+    __POOL_LOCK = ".pool.lock"
+
+    def __init__(self, root, max_bytes=4 << 30, ram_root=None, ram_bytes=512 << 20):
+        """
+        :param root: The directory holding the build directories on disk, it is created if it does not exist
+        :type root: str
+        :param max_bytes: The max size of the directories on disk, in bytes
+        :type max_bytes: int
+        :param ram_root: The directory holding the build directories on a RAM-backed file system, e.g.
+            :code:`/dev/shm/pyduinocli`, they are all on disk if None
+        :type ram_root: str or NoneType
+        :param ram_bytes: The max size of the directories in :code:`ram_root`, in bytes
+        :type ram_bytes: int
+        """
+        self.__root = os.path.abspath(root)
+        self.__max_bytes = max_bytes
+        self.__ram_root = None if ram_root is None else os.path.abspath(ram_root)
+        self.__ram_bytes = ram_bytes
+        self.__condition = threading.Condition()
+        self.__entries = collections.OrderedDict()
+        self.__pool_lock = FileLock(os.path.join(self.__root, BuildDirectories.__LOCKS, BuildDirectories.__POOL_LOCK))
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__spills = 0
+        found = dict()
+        pool = self.__pool_lock.acquire(True)
+        try:
+            for directory, ram in ((self.__root, False), (self.__ram_root, True)):
+                if directory is None:
+                    continue
+                os.makedirs(directory, exist_ok=True)
+                for entry in os.scandir(directory):
+                    if entry.name == BuildDirectories.__LOCKS or not entry.is_dir(follow_symlinks=False):
+                        continue
+                    mtime = entry.stat().st_mtime
+                    if entry.name in found:
+                        # a spill interrupted between the copy and the removal, only the most recent copy is kept
+                        stale = entry.path if mtime <= found[entry.name][0] else found[entry.name][1].path
+                        self.__remove_copy(entry.name, stale)
+                        if stale == entry.path:
+                            continue
+                    found[entry.name] = (mtime, _Entry(entry.path, _size(entry.path), ram))
+        finally:
+            FileLock.release(pool)
+        # the least recently used first
+        for name, (_, entry) in sorted(found.items(), key=lambda item: item[1][0]):
+            self.__entries[name] = entry
+        with self.__condition:
+            moves = self.__evict()
+        self.__move(moves)
+
+    def __lock(self, name):
+        return FileLock(os.path.join(self.__root, BuildDirectories.__LOCKS, name + ".lock"))
+
+    def __remove_copy(self, name, path):
+        descriptor = self.__lock(name).try_acquire(True)
+        if descriptor is None:
+            return
+        try:
+            shutil.rmtree(path, ignore_errors=True)
+        finally:
+            FileLock.release(descriptor)
+
+    @property
+    def root(self):
+        """
+        The directory holding the build directories on disk
+
+        :type: str
+        """
+        return self.__root
+
+    @property
+    def stats(self):
+        """
+        The number of :code:`hits` (builds reusing a directory), :code:`misses` (builds given a new directory),
+        :code:`evictions` and :code:`spills` (directories moved from the RAM to the disk), the number of
+        :code:`entries`, and the :code:`bytes` and :code:`ram_bytes` they take on disk and in RAM
+
+        :type: dict
+        """
+        with self.__condition:
+            return dict(hits=self.__hits, misses=self.__misses, evictions=self.__evictions, spills=self.__spills,
+                        entries=len(self.__entries), bytes=self.__used(False), ram_bytes=self.__used(True))
+
+    def __used(self, ram):
+        return sum(entry.size for entry in self.__entries.values() if entry.ram == ram and not entry.removed)
+
+    def acquire(self, name, deadline=None):
+        """
+        Gets the build directory of a target, waiting for the build of the same target using it, in this process or
+        another one, honoring a deadline
+
+        :param name: The name of the directory, see :func:`build_key`
+        :type name: str
+        :param deadline: The deadline after which waiting is given up
+        :type deadline: pyduinocli.executors.deadline.Deadline or NoneType
+        :return: The path to the directory, to be given back to :meth:`release` once the build is done
+        :rtype: str
+        """
+        with self.__condition:
+            while name in self.__entries and self.__entries[name].busy:
+                if deadline is not None and (deadline.expired() or deadline.cancelled):
+                    raise ExecutorBase._interrupted(deadline, b"", b"")
+                timeout = None if deadline is None else deadline.remaining()
+                if deadline is not None and deadline.cancellable:
+                    timeout = 0.05 if timeout is None else min(timeout, 0.05)
+                self.__condition.wait(timeout)
+            entry = self.__entries.get(name)
+            new = entry is None
+            if new:
+                ram = self.__ram_root is not None and self.__used(True) < self.__ram_bytes
+                entry = _Entry(os.path.join(self.__ram_root if ram else self.__root, name), 0, ram)
+                self.__entries[name] = entry
+            entry.busy = True
+            self.__entries.move_to_end(name)
+        try:
+            entry.lock = self.__lock(name).acquire(True, deadline)
+        except BaseException:
+            with self.__condition:
+                entry.busy = False
+                if new:
+                    del self.__entries[name]
+                self.__condition.notify_all()
+            raise
+        # another process may have moved or removed the directory meanwhile
+        hit = os.path.isdir(entry.path)
+        if not hit:
+            for directory, ram in ((self.__root, False), (self.__ram_root, True)):
+                if directory is not None and os.path.isdir(os.path.join(directory, name)):
+                    entry.path, entry.ram, hit = os.path.join(directory, name), ram, True
+                    break
+        with self.__condition:
+            if hit:
+                self.__hits += 1
+            else:
+                self.__misses += 1
+        os.makedirs(entry.path, exist_ok=True)
+        return entry.path
+
+    def release(self, name):
+        """
+        Gives back a directory given by :meth:`acquire`, then removes the least recently used directories if they take
+        more than their budget
+
+        :param name: The name of the directory
+        :type name: str
+        """
+        with self.__condition:
+            entry = self.__entries[name]
+        size = _size(entry.path)
+        try:
+            os.utime(entry.path)
+        except OSError:
+            pass
+        with self.__condition:
+            entry.size = size
+            entry.busy = False
+            descriptor, entry.lock = entry.lock, None
+            moves = self.__evict()
+            self.__condition.notify_all()
+        FileLock.release(descriptor)
+        self.__move(moves)
+
+    def __evict(self):
+        # the directories are only chosen here, they are moved or removed by __move, out of the lock. Until then they
+        # are busy, so that no build uses them, and counted in the budget they are moved to.
+        moves = list()
+        if self.__ram_root is not None:
+            used = self.__used(True)
+            for name, entry in list(self.__entries.items()):
+                if used <= self.__ram_bytes:
+                    break
+                if entry.ram and not entry.busy:
+                    used -= entry.size
+                    entry.busy = True
+                    entry.ram = False
+                    moves.append((name, entry, os.path.join(self.__root, name)))
+        used = self.__used(False)
+        for name, entry in list(self.__entries.items()):
+            if used <= self.__max_bytes:
+                break
+            if not entry.ram and not entry.busy:
+                used -= entry.size
+                entry.busy = True
+                entry.removed = True
+                moves.append((name, entry, None))
+        return moves
+
+    def __move(self, moves, count=True):
+        if not moves:
+            return
+        pool = self.__pool_lock.acquire(True)
+        try:
+            for name, entry, path in moves:
+                descriptor = self.__lock(name).try_acquire(True)
+                if descriptor is None:
+                    # another process builds in it, it is left where it is
+                    with self.__condition:
+                        entry.ram = entry.ram or path is not None
+                        entry.removed = False
+                        entry.busy = False
+                        self.__condition.notify_all()
+                    continue
+                try:
+                    moved = self.__move_one(entry, path)
+                finally:
+                    FileLock.release(descriptor)
+                with self.__condition:
+                    if moved:
+                        entry.path = path
+                        self.__spills += 1
+                    else:
+                        if self.__entries.get(name) is entry:
+                            del self.__entries[name]
+                        self.__evictions += count
+                    entry.busy = False
+                    self.__condition.notify_all()
+        finally:
+            FileLock.release(pool)
+
+    @staticmethod
+    def __move_one(entry, path):
+        if path is not None:
+            shutil.rmtree(path, ignore_errors=True)
+            try:
+                shutil.move(entry.path, path)
+                return True
+            except OSError:
+                shutil.rmtree(path, ignore_errors=True)
+        shutil.rmtree(entry.path, ignore_errors=True)
+        return False
+
+    def clear(self):
+        """
+        Removes the directories that are not in use
+        """
+        with self.__condition:
+            moves = list()
+            for name, entry in list(self.__entries.items()):
+                if not entry.busy:
+                    entry.busy = True
+                    entry.removed = True
+                    moves.append((name, entry, None))
+        self.__move(moves, count=False)
+
+
+class BuildDirectoryExecutor(ExecutorBase):
+    """
+    Gives the :code:`compile` commands without a :code:`--build-path` the build directory of their target from a
+    :class:`BuildDirectories`, so that building the same target again is incremental. The other commands run as is.
+    """
+
+    def __init__(self, executor, directories):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param directories: The pool of build directories
+        :type directories: BuildDirectories
+        """
+        self.__executor = executor
+        self.__directories = directories
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    @staticmethod
+    def __name(command):
+        parsed = parse_command(command)
+        if parsed.path != (commands.COMPILE,) or flags.BUILD_PATH in parsed.options or \
+                len(parsed.positionals) != 1:
+            return None
+        options = parsed.options
+        return build_key(parsed.positionals[0], (options.get(flags.FQBN) or [None])[-1],
+                         options.get(flags.BOARD_OPTIONS), options.get(flags.BUILD_PROPERTY),
+                         (options.get(flags.PROFILE) or [None])[-1])
+
+    def __acquire(self, name):
+        return self.__directories.acquire(name, Deadline.current())
+
+    def execute(self, command):
+        name = BuildDirectoryExecutor.__name(command)
+        if name is None:
+            return self.__executor.execute(command)
+        path = self.__acquire(name)
+        try:
+            return self.__executor.execute(command + [flags.BUILD_PATH, path])
+        finally:
+            self.__directories.release(name)
+
+    async def execute_async(self, command):
+        name = BuildDirectoryExecutor.__name(command)
+        if name is None:
+            return await self.__executor.execute_async(command)
+        import asyncio
+        acquire = functools.partial(contextvars.copy_context().run, self.__acquire, name)
+        future = asyncio.get_running_loop().run_in_executor(None, acquire)
+        try:
+            path = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the thread keeps waiting for the directory, it is given back as soon as it gets it
+            future.add_done_callback(lambda done: done.cancelled() or done.exception() is not None or
+                                     self.__directories.release(name))
+            raise
+        try:
+            return await self.__executor.execute_async(command + [flags.BUILD_PATH, path])
+        finally:
+            self.__directories.release(name)
+
+    def close(self):
+        self.__executor.close()
@@ -0,0 +1,167 @@
+import collections
+import glob
+import os
+import threading
+import time
+from pyduinocli.constants import commands
+from pyduinocli.executors.arguments import MUTATING, READ_ONLY, command_path
+from pyduinocli.executors.base import ExecutorBase
+
+#: The commands whose output is cached by default
+CACHEABLE = READ_ONLY - {(commands.BOARD, commands.LIST)}
+
+
+class CachingExecutor(ExecutorBase):
+    """
+    Caches the output of read-only commands until something changes the configuration or the installed platforms,
+    libraries and indexes.
+
+    The cache is cleared when a mutating command (e.g. :code:`core install`, :code:`lib upgrade`,
+    :code:`config set`) runs through it, and when the modification times of the watched paths change, which catches
+    the changes made outside of this wrapper. Entries also expire after a time to live, and the least recently used
+    ones are evicted when the cache is full. Only successful commands are cached.
+    """
+
+    def __init__(self, executor, max_entries=128, ttl=None, watched_paths=None, check_interval=1.0, paths=None):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param max_entries: The max number of outputs kept in the cache
+        :type max_entries: int
+        :param ttl: The time after which an entry expires, in seconds, entries do not expire if None
+        :type ttl: float or NoneType
+        :param watched_paths: Files and directories whose changes clear the cache, e.g. the data directory. Glob patterns are allowed
+        :type watched_paths: list or NoneType
+        :param check_interval: Min time between two checks of the watched paths, in seconds
+        :type check_interval: float
+        :param paths: The command paths that are cached, the read-only commands except :code:`board list` by default
+        :type paths: set or NoneType
+        """
+        self.__executor = executor
+        self.__max_entries = max_entries
+        self.__ttl = ttl
+        self.__watched_paths = list(watched_paths or [])
+        self.__check_interval = check_interval
+        self.__paths = CACHEABLE if paths is None else paths
+        self.__lock = threading.Lock()
+        self.__entries = collections.OrderedDict()
+        self.__generation = 0
+        self.__fingerprint = self.__take_fingerprint()
+        self.__checked = time.monotonic()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__invalidations = 0
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    @property
+    def stats(self):
+        """
+        The statistics of this cache: :code:`hits`, :code:`misses`, :code:`evictions`, :code:`invalidations` and
+        the current number of :code:`entries`
+
+        :type: dict
+        """
+        with self.__lock:
+            return dict(hits=self.__hits, misses=self.__misses, evictions=self.__evictions,
+                        invalidations=self.__invalidations, entries=len(self.__entries))
+
+    def clear(self):
+        """
+        Removes all the entries of the cache
+        """
+        with self.__lock:
+            self.__clear()
+
+    def __clear(self):
+        self.__entries.clear()
+        self.__generation += 1
+        self.__invalidations += 1
+
+    def __take_fingerprint(self):
+        fingerprint = list()
+        for pattern in self.__watched_paths:
+            for path in sorted(glob.glob(pattern)):
+                try:
+                    fingerprint.append((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    pass
+        return fingerprint
+
+    def __check_watched_paths(self):
+        now = time.monotonic()
+        if not self.__watched_paths or now - self.__checked < self.__check_interval:
+            return
+        self.__checked = now
+        fingerprint = self.__take_fingerprint()
+        if fingerprint != self.__fingerprint:
+            self.__fingerprint = fingerprint
+            self.__clear()
+
+    def __lookup(self, key):
+        with self.__lock:
+            self.__check_watched_paths()
+            entry = self.__entries.get(key)
+            if entry is not None and self.__ttl is not None and time.monotonic() - entry[0] > self.__ttl:
+                del self.__entries[key]
+                entry = None
+            if entry is None:
+                self.__misses += 1
+                return None, self.__generation
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return entry[1], self.__generation
+
+    def __store(self, key, generation, output):
+        with self.__lock:
+            if generation != self.__generation or output[0] != 0:
+                return
+            self.__entries[key] = (time.monotonic(), output)
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+                self.__evictions += 1
+
+    def __after(self, path):
+        if path in MUTATING:
+            with self.__lock:
+                self.__clear()
+
+    def execute(self, command):
+        path = command_path(command)
+        if path not in self.__paths:
+            try:
+                return self.__executor.execute(command)
+            finally:
+                self.__after(path)
+        key = tuple(command)
+        output, generation = self.__lookup(key)
+        if output is None:
+            output = self.__executor.execute(command)
+            self.__store(key, generation, output)
+        return output
+
+    async def execute_async(self, command):
+        path = command_path(command)
+        if path not in self.__paths:
+            try:
+                return await self.__executor.execute_async(command)
+            finally:
+                self.__after(path)
+        key = tuple(command)
+        output, generation = self.__lookup(key)
+        if output is None:
+            output = await self.__executor.execute_async(command)
+            self.__store(key, generation, output)
+        return output
+
+    def close(self):
+        self.__executor.close()
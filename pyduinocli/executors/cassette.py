@@ -0,0 +1,303 @@
+import base64
+import json
+import os
+import threading
+import time
+from pyduinocli.constants import flags
+from pyduinocli.errors.arduinoreplayerror import ArduinoReplayError
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors.progress import Progress, ProgressParser
+from pyduinocli.executors.spool import SpooledOutput
+
+
+class Cassette:
+    """
+    A file of recorded :code:`arduino-cli` invocations, mapping their command lines to their return code, standard
+    output, standard error and duration.
+
+    Each line of the file holds one invocation: its key, a tab, then the invocation as a JSON object. Opening a
+    cassette only indexes the keys and the offsets of the lines, the invocations are read and decoded when they are
+    first replayed. The key is the command line without the executable and the paths of the configuration and log
+    files, so that a cassette recorded on one machine can be replayed on another one where they are elsewhere.
+    """
+
+    def __init__(self, path):
+        """
+        :param path: The path to the cassette file, it is created when the first invocation is recorded
+        :type path: str
+        """
+        self.__path = path
+        self.__lock = threading.Lock()
+        self.__index = dict()
+        self.__responses = dict()
+        self.__reader = None
+        self.__writer = None
+        if os.path.isfile(path):
+            self.__load()
+
+    @staticmethod
+    def key(command):
+        """
+        Gets the key under which a command is recorded
+
+        :param command: The full command line
+        :type command: list
+        :return: The key of the command
+        :rtype: str
+        """
+        command = list(command[1:])
+        for flag in (flags.CONFIG_FILE, flags.LOG_FILE):
+            if flag in command[:-1]:
+                del command[command.index(flag) + 1]
+        return json.dumps(command, ensure_ascii=False)
+
+    @property
+    def path(self):
+        """
+        The path to the cassette file
+
+        :type: str
+        """
+        return self.__path
+
+    def __load(self):
+        self.__reader = open(self.__path, "rb")
+        offset = 0
+        for line in self.__reader:
+            key, _, _ = line.partition(b"\t")
+            self.__index.setdefault(key.decode("utf-8"), []).append(offset)
+            offset += len(line)
+
+    def __len__(self):
+        with self.__lock:
+            return sum(len(offsets) for offsets in self.__index.values())
+
+    def __contains__(self, command):
+        return Cassette.key(command) in self.__index
+
+    def commands(self):
+        """
+        Lists the distinct commands recorded, without their executable, configuration and log files
+
+        :return: The recorded command lines, as used in the keys
+        :rtype: list
+        """
+        with self.__lock:
+            return [json.loads(key) for key in self.__index]
+
+    def responses(self, command):
+        """
+        Gets the recorded invocations of a command, in the order they were recorded
+
+        :param command: The full command line
+        :type command: list
+        :return: A list of tuples :code:`(returncode, stdout, stderr, duration)`, empty if the command was not recorded
+        :rtype: list
+        """
+        key = Cassette.key(command)
+        with self.__lock:
+            responses = self.__responses.get(key)
+            if responses is None:
+                responses = [self.__read(offset) for offset in self.__index.get(key, [])]
+                self.__responses[key] = responses
+            return responses
+
+    def __read(self, offset):
+        self.__reader.seek(offset)
+        _, _, line = self.__reader.readline().partition(b"\t")
+        record = json.loads(line)
+        return record["returncode"], Cassette.__decode(record, "stdout"), Cassette.__decode(record, "stderr"), \
+            record["duration"]
+
+    @staticmethod
+    def __decode(record, name):
+        if name + "_b64" in record:
+            return base64.b64decode(record[name + "_b64"])
+        return record[name].encode("utf-8")
+
+    @staticmethod
+    def __encode(record, name, data):
+        if isinstance(data, SpooledOutput):
+            data = data.getvalue()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        data = bytes(data or b"")
+        try:
+            record[name] = data.decode("utf-8")
+        except UnicodeDecodeError:
+            record[name + "_b64"] = base64.b64encode(data).decode("ascii")
+
+    def record(self, command, returncode, stdout, stderr, duration):
+        """
+        Appends an invocation to the cassette
+
+        :param command: The full command line
+        :type command: list
+        :param returncode: The return code of the command
+        :type returncode: int
+        :param stdout: The standard output of the command
+        :type stdout: bytes, str or pyduinocli.executors.spool.SpooledOutput
+        :param stderr: The standard error of the command
+        :type stderr: bytes or str
+        :param duration: The time the command took, in seconds
+        :type duration: float
+        """
+        record = dict(command=list(command), returncode=returncode, duration=duration)
+        Cassette.__encode(record, "stdout", stdout)
+        Cassette.__encode(record, "stderr", stderr)
+        key = Cassette.key(command)
+        line = (key + "\t" + json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self.__lock:
+            if self.__writer is None:
+                self.__writer = open(self.__path, "ab")
+            offset = self.__writer.tell()
+            self.__writer.write(line)
+            self.__writer.flush()
+            if self.__reader is None:
+                self.__reader = open(self.__path, "rb")
+            self.__index.setdefault(key, []).append(offset)
+            self.__responses.pop(key, None)
+
+    def close(self):
+        """
+        Closes the cassette file
+        """
+        with self.__lock:
+            for file in (self.__reader, self.__writer):
+                if file is not None:
+                    file.close()
+            self.__reader = None
+            self.__writer = None
+
+
+class RecordingExecutor(ExecutorBase):
+    """
+    Records the invocations run by another executor in a :class:`Cassette`, along with their duration. Only the
+    invocations that completed are recorded, not the ones stopped by their deadline.
+    """
+
+    def __init__(self, executor, cassette):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param cassette: The cassette the invocations are recorded in
+        :type cassette: Cassette
+        """
+        self.__executor = executor
+        self.__cassette = cassette
+
+    @property
+    def cassette(self):
+        """
+        The cassette the invocations are recorded in
+
+        :type: Cassette
+        """
+        return self.__cassette
+
+    def execute(self, command):
+        start = time.monotonic()
+        returncode, stdout, stderr = self.__executor.execute(command)
+        self.__cassette.record(command, returncode, stdout, stderr, time.monotonic() - start)
+        return returncode, stdout, stderr
+
+    async def execute_async(self, command):
+        start = time.monotonic()
+        returncode, stdout, stderr = await self.__executor.execute_async(command)
+        self.__cassette.record(command, returncode, stdout, stderr, time.monotonic() - start)
+        return returncode, stdout, stderr
+
+    def close(self):
+        self.__executor.close()
+        self.__cassette.close()
+
+
+class ReplayExecutor(ExecutorBase):
+    """
+    Answers the commands with the invocations recorded in a :class:`Cassette`, without running :code:`arduino-cli`.
+
+    A command recorded several times gets the recorded answers in order, then the last one again. A command that was
+    not recorded raises a :class:`pyduinocli.errors.arduinoreplayerror.ArduinoReplayError`. By default the answers
+    are immediate, the recorded durations can be waited to replay realistic latencies, and the deadlines are honored
+    while waiting. The progress reported by the recorded outputs is replayed too.
+    """
+
+    __POLL_INTERVAL = 0.05
+
+    def __init__(self, cassette, latency=0.0):
+        """
+        :param cassette: The cassette holding the recorded invocations
+        :type cassette: Cassette
+        :param latency: The fraction of the recorded durations waited before answering, e.g. 1.0 for the original latencies
+        :type latency: float
+        """
+        self.__cassette = cassette
+        self.__latency = latency
+        self.__lock = threading.Lock()
+        self.__replayed = dict()
+
+    @property
+    def cassette(self):
+        """
+        The cassette holding the recorded invocations
+
+        :type: Cassette
+        """
+        return self.__cassette
+
+    def __response(self, command):
+        responses = self.__cassette.responses(command)
+        if not responses:
+            raise ArduinoReplayError(command, self.__cassette.path)
+        key = Cassette.key(command)
+        with self.__lock:
+            index = self.__replayed.get(key, 0)
+            self.__replayed[key] = index + 1
+        return responses[min(index, len(responses) - 1)]
+
+    @staticmethod
+    def __replay_progress(stdout, stderr):
+        progress = Progress.current()
+        if progress is not None:
+            parser = ProgressParser(progress)
+            parser.feed(stdout, "stdout", report_output=False)
+            parser.feed(stderr, "stderr")
+            parser.flush()
+
+    def __delay(self, duration):
+        return max(0.0, duration * self.__latency)
+
+    @staticmethod
+    def __step(deadline, end):
+        if deadline is not None and (deadline.expired() or deadline.cancelled):
+            raise ExecutorBase._interrupted(deadline, b"", b"")
+        return min(end - time.monotonic(), ReplayExecutor.__POLL_INTERVAL)
+
+    def execute(self, command):
+        returncode, stdout, stderr, duration = self.__response(command)
+        deadline = Deadline.current()
+        end = time.monotonic() + self.__delay(duration)
+        while True:
+            step = ReplayExecutor.__step(deadline, end)
+            if step <= 0:
+                break
+            time.sleep(step)
+        ReplayExecutor.__replay_progress(stdout, stderr)
+        return returncode, stdout, stderr
+
+    async def execute_async(self, command):
+        import asyncio
+        returncode, stdout, stderr, duration = self.__response(command)
+        deadline = Deadline.current()
+        end = time.monotonic() + self.__delay(duration)
+        while True:
+            step = ReplayExecutor.__step(deadline, end)
+            if step <= 0:
+                break
+            await asyncio.sleep(step)
+        ReplayExecutor.__replay_progress(stdout, stderr)
+        return returncode, stdout, stderr
+
+    def close(self):
+        self.__cassette.close()
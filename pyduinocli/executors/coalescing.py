@@ -0,0 +1,141 @@
+import threading
+from pyduinocli.constants import flags
+from pyduinocli.errors.arduinocancellederror import ArduinoCancelledError
+from pyduinocli.errors.arduinotimeouterror import ArduinoTimeoutError
+from pyduinocli.executors.arguments import READ_ONLY, command_path
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.deadline import Deadline
+
+
+class CoalescingExecutor(ExecutorBase):
+    """
+    Runs identical read-only commands that are in flight at the same time only once.
+
+    The first caller runs the command through the wrapped executor, the others wait for it and get the same output.
+    Each caller parses that output on its own, so the results they get are independent copies. If the first caller
+    is interrupted (e.g. by its own deadline), the others run the command again.
+    """
+
+    __POLL_INTERVAL = 0.1
+
+    def __init__(self, executor, paths=None):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param paths: The command paths that can be coalesced, the read-only commands by default
+        :type paths: set or NoneType
+        """
+        self.__executor = executor
+        self.__paths = READ_ONLY if paths is None else paths
+        self.__lock = threading.Lock()
+        self.__in_flight = dict()
+        self.__coalesced = 0
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    @property
+    def coalesced(self):
+        """
+        The number of calls that were served by a call already in flight
+
+        :type: int
+        """
+        return self.__coalesced
+
+    def __coalescable(self, command):
+        return flags.WATCH not in command and command_path(command) in self.__paths
+
+    def __join(self, key, factory):
+        with self.__lock:
+            future = self.__in_flight.get(key)
+            if future is not None:
+                self.__coalesced += 1
+                return future, False
+            future = self.__in_flight[key] = factory()
+            return future, True
+
+    def __leave(self, key):
+        with self.__lock:
+            del self.__in_flight[key]
+
+    @staticmethod
+    def __fail(future, error):
+        if isinstance(error, (ArduinoTimeoutError, ArduinoCancelledError)) or not isinstance(error, Exception):
+            future.cancel()
+        else:
+            future.set_exception(error)
+            if hasattr(future, "get_loop"):
+                future.exception()
+
+    def execute(self, command):
+        if not self.__coalescable(command):
+            return self.__executor.execute(command)
+        from concurrent.futures import CancelledError, Future
+        key = tuple(command)
+        future, leader = self.__join(key, Future)
+        if not leader:
+            try:
+                return CoalescingExecutor.__wait(future)
+            except CancelledError:
+                return self.execute(command)
+        try:
+            output = self.__executor.execute(command)
+        except BaseException as e:
+            self.__leave(key)
+            CoalescingExecutor.__fail(future, e)
+            raise
+        self.__leave(key)
+        future.set_result(output)
+        return output
+
+    @staticmethod
+    def __wait(future):
+        from concurrent.futures import TimeoutError
+        deadline = Deadline.current()
+        while True:
+            timeout = None if deadline is None else deadline.remaining()
+            if deadline is not None and deadline.cancellable:
+                timeout = CoalescingExecutor.__POLL_INTERVAL if timeout is None else \
+                    min(timeout, CoalescingExecutor.__POLL_INTERVAL)
+            try:
+                return future.result(timeout)
+            except TimeoutError:
+                if deadline.expired() or deadline.cancelled:
+                    raise ExecutorBase._interrupted(deadline, "", "")
+
+    async def execute_async(self, command):
+        if not self.__coalescable(command):
+            return await self.__executor.execute_async(command)
+        import asyncio
+        loop = asyncio.get_running_loop()
+        key = (id(loop),) + tuple(command)
+        future, leader = self.__join(key, loop.create_future)
+        if not leader:
+            deadline = Deadline.current()
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), None if deadline is None else deadline.remaining())
+            except asyncio.TimeoutError:
+                raise ExecutorBase._interrupted(deadline, "", "")
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.execute_async(command)
+        try:
+            output = await self.__executor.execute_async(command)
+        except BaseException as e:
+            self.__leave(key)
+            CoalescingExecutor.__fail(future, e)
+            raise
+        self.__leave(key)
+        future.set_result(output)
+        return output
+
+    def close(self):
+        self.__executor.close()
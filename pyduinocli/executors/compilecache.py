@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import VALUE_FLAGS, parse_command
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.spool import SpooledOutput
+
+#: The compile flags whose value does not change the binaries, they are left out of the key
+UNKEYED_FLAGS = {flags.OUTPUT_DIR, flags.BUILD_PATH, flags.BUILD_CACHE_PATH, flags.CONFIG_FILE, flags.LOG_FILE,
+                 flags.LOG_FORMAT, flags.LOG_LEVEL, flags.VERBOSE, flags.JOBS}
+
+#: The compile flags making a command bypass the cache, since it does more than building binaries
+BYPASS_FLAGS = {flags.UPLOAD, flags.PREPROCESS, flags.SHOW_PROPERTIES, flags.ONLY_COMPILATION_DATABASE,
+                flags.DUMP_PROFILE, flags.CLEAN}
+
+_digests = dict()
+_digests_lock = threading.Lock()
+
+
+def _file_digest(path, stat):
+    # files are only read again when they change, a single digest is kept per path
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _digests_lock:
+        known = _digests.get(path)
+    if known is not None and known[0] == version:
+        return known[1]
+    hash = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            hash.update(chunk)
+    digest = hash.digest()
+    with _digests_lock:
+        _digests[path] = (version, digest)
+    return digest
+
+
+def tree_digest(root, exclude=()):
+    """
+    Hashes the names and contents of the files of a directory, or of a single file
+
+    :param root: The directory or file
+    :type root: str
+    :param exclude: Absolute paths of directories left out, e.g. the output directory of a build inside a sketch
+    :type exclude: tuple
+    :return: The hex digest
+    :rtype: str
+    """
+    hash = hashlib.sha256()
+    root = os.path.abspath(root)
+    if os.path.isfile(root):
+        hash.update(_file_digest(root, os.stat(root)))
+        return hash.hexdigest()
+    excluded = {os.path.normcase(os.path.abspath(path)) for path in exclude}
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(name for name in directories if not name.startswith(".") and
+                                os.path.normcase(os.path.join(directory, name)) not in excluded)
+        for name in sorted(files):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+                digest = _file_digest(path, stat)
+            except OSError:
+                continue
+            hash.update(os.path.relpath(path, root).replace(os.sep, "/").encode("utf-8") + b"\0" + digest)
+    return hash.hexdigest()
+
+
+class CompileCache:
+    """
+    A directory of compile outputs, each stored with the binaries it exported, bounded in size by evicting the least
+    recently used entries. Several processes can share the directory: entries are written to a temporary directory
+    and renamed into place.
+    """
+
+    __OUTPUT = "output.json"
+    __FILES = "files"
+
+    def __init__(self, directory, max_bytes=1 << 30):
+        """
+        :param directory: The directory of the cache, created if it does not exist
+        :type directory: str
+        :param max_bytes: The max size of the cache, in bytes
+        :type max_bytes: int
+        """
+        self.__directory = os.path.abspath(directory)
+        self.__max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        self.__entries = dict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__bypasses = 0
+        self.__stores = 0
+        self.__evictions = 0
+        os.makedirs(self.__directory, exist_ok=True)
+        for key in os.listdir(self.__directory):
+            path = os.path.join(self.__directory, key)
+            if not key.startswith(".") and os.path.isdir(path):
+                self.__entries[key] = (CompileCache.__size(path), os.stat(path).st_mtime)
+
+    @property
+    def directory(self):
+        """
+        The directory of the cache
+
+        :type: str
+        """
+        return self.__directory
+
+    @property
+    def stats(self):
+        """
+        The statistics of this cache: :code:`hits`, :code:`misses`, :code:`bypasses` (the compilations that could not
+        be cached), :code:`stores`, :code:`evictions`, the current number of :code:`entries` and their :code:`bytes`
+
+        :type: dict
+        """
+        with self.__lock:
+            return dict(hits=self.__hits, misses=self.__misses, bypasses=self.__bypasses, stores=self.__stores,
+                        evictions=self.__evictions, entries=len(self.__entries),
+                        bytes=sum(size for size, _ in self.__entries.values()))
+
+    @staticmethod
+    def __size(path):
+        return sum(os.path.getsize(os.path.join(directory, name))
+                   for directory, _, files in os.walk(path) for name in files)
+
+    def bypassed(self):
+        """
+        Counts a compilation that could not be cached
+        """
+        with self.__lock:
+            self.__bypasses += 1
+
+    def restore(self, key, output_dir):
+        """
+        Copies the binaries of an entry to a directory
+
+        :param key: The key of the entry
+        :type key: str
+        :param output_dir: The directory where the binaries are copied
+        :type output_dir: str
+        :return: The output of the compilation, :code:`(returncode, stdout, stderr)`, None if there is no entry
+        :rtype: tuple or NoneType
+        """
+        path = os.path.join(self.__directory, key)
+        try:
+            with open(os.path.join(path, CompileCache.__OUTPUT), "rb") as file:
+                output = json.loads(file.read())
+            files = os.path.join(path, CompileCache.__FILES)
+            os.makedirs(output_dir, exist_ok=True)
+            for name in os.listdir(files):
+                shutil.copyfile(os.path.join(files, name), os.path.join(output_dir, name))
+            now = time.time()
+            os.utime(path, (now, now))
+            with self.__lock:
+                known = key in self.__entries
+            size = None if known else CompileCache.__size(path)
+        except (OSError, ValueError):
+            with self.__lock:
+                self.__misses += 1
+                self.__entries.pop(key, None)
+            return None
+        with self.__lock:
+            self.__hits += 1
+            # the entry may have been stored by another process
+            known = self.__entries.get(key)
+            self.__entries[key] = (known[0] if known else size or 0, now)
+        return output["returncode"], output["stdout"].encode("utf-8"), output["stderr"].encode("utf-8")
+
+    def store(self, key, output, files):
+        """
+        Adds an entry, then evicts the least recently used entries if the cache is too large
+
+        :param key: The key of the entry
+        :type key: str
+        :param output: The output of the compilation, :code:`(returncode, stdout, stderr)`
+        :type output: tuple
+        :param files: The paths to the binaries exported by the compilation
+        :type files: list
+        """
+        returncode, stdout, stderr = output
+        staging = tempfile.mkdtemp(prefix=".", dir=self.__directory)
+        try:
+            os.makedirs(os.path.join(staging, CompileCache.__FILES))
+            for path in files:
+                shutil.copy2(path, os.path.join(staging, CompileCache.__FILES, os.path.basename(path)))
+            with open(os.path.join(staging, CompileCache.__OUTPUT), "w") as file:
+                json.dump(dict(returncode=returncode, stdout=CompileCache.__text(stdout),
+                               stderr=CompileCache.__text(stderr)), file)
+            size = CompileCache.__size(staging)
+            os.rename(staging, os.path.join(self.__directory, key))
+        except OSError:
+            # another process stored the same entry first
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+        with self.__lock:
+            self.__entries[key] = (size, time.time())
+            self.__stores += 1
+            evicted = self.__evict()
+        for path in evicted:
+            shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def __text(data):
+        if isinstance(data, SpooledOutput):
+            data = data.getvalue()
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = bytes(data).decode("utf-8", "replace")
+        return data or ""
+
+    def __evict(self):
+        evicted = list()
+        total = sum(size for size, _ in self.__entries.values())
+        for key, (size, _) in sorted(self.__entries.items(), key=lambda item: item[1][1]):
+            if total <= self.__max_bytes:
+                break
+            del self.__entries[key]
+            total -= size
+            self.__evictions += 1
+            evicted.append(os.path.join(self.__directory, key))
+        return evicted
+
+    def clear(self):
+        """
+        Removes all the entries
+        """
+        with self.__lock:
+            keys = list(self.__entries)
+            self.__entries.clear()
+        for key in keys:
+            shutil.rmtree(os.path.join(self.__directory, key), ignore_errors=True)
+
+
+class CompileCacheExecutor(ExecutorBase):
+    """
+    Skips the :code:`compile` commands whose inputs did not change since a previous build, and restores the binaries
+    of that build to their :code:`--output-dir` instead.
+
+    The key of a build hashes its command line (FQBN, board options, build properties, warnings...), the files of
+    the sketch and of the libraries given with :code:`--library` and :code:`--libraries`, the :code:`arduino-cli`
+    executable, and the installed platforms and libraries with their versions, as listed by :code:`core list` and
+    :code:`lib list`. Libraries edited in place without changing their version are not noticed, the cache has to be
+    cleared then.
+
+    Only the builds with an :code:`--output-dir` are cached, and not the ones that upload, preprocess, show the
+    properties, dump the profile or clean the build. The restored output is the one of the original build, so the
+    build path it gives may no longer exist.
+    """
+
+    def __init__(self, executor, cache):
+        """
+        :param executor: The executor actually running the commands, also used to list the platforms and libraries
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param cache: The store of the builds
+        :type cache: CompileCache
+        """
+        self.__executor = executor
+        self.__cache = cache
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    @property
+    def cache(self):
+        """
+        The store of the builds
+
+        :type: CompileCache
+        """
+        return self.__cache
+
+    def __plan(self, command):
+        parsed = parse_command(command)
+        if parsed.path != (commands.COMPILE,):
+            return None
+        if BYPASS_FLAGS.intersection(parsed.options) or flags.OUTPUT_DIR not in parsed.options or \
+                len(parsed.positionals) != 1:
+            self.__cache.bypassed()
+            return None
+        sketch = os.path.abspath(parsed.positionals[0])
+        if os.path.isfile(sketch):
+            sketch = os.path.dirname(sketch)
+        return parsed, sketch, command[:command.index(commands.COMPILE)]
+
+    @staticmethod
+    def __inputs(command, parsed, sketch):
+        output_dir = os.path.abspath(parsed.options[flags.OUTPUT_DIR][-1])
+        exclude = [output_dir, os.path.join(sketch, "build")]
+        exclude.extend(os.path.abspath(path) for path in parsed.options.get(flags.BUILD_PATH, ()))
+        line = list()
+        tokens = iter(command[1:])
+        for token in tokens:
+            if token.partition("=")[0] in UNKEYED_FLAGS:
+                if token in VALUE_FLAGS:
+                    next(tokens, None)
+                continue
+            line.append(token)
+        stat = os.stat(command[0]) if os.path.isfile(command[0]) else None
+        inputs = dict(command=line, sketch=tree_digest(sketch, exclude),
+                      cli=None if stat is None else [stat.st_size, stat.st_mtime_ns],
+                      libraries=[tree_digest(path) for name in (flags.LIBRARY, flags.LIBRARIES)
+                                 for path in parsed.options.get(name, ()) if os.path.exists(path)])
+        return inputs, output_dir
+
+    def __key(self, inputs, cores, libraries):
+        for name, output in (("cores", cores), ("installed_libraries", libraries)):
+            if output[0] != 0:
+                self.__cache.bypassed()
+                return None
+            inputs[name] = hashlib.sha256(CompileCacheExecutor.__bytes(output[1])).hexdigest()
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def __bytes(data):
+        if isinstance(data, SpooledOutput):
+            data = data.getvalue()
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        return bytes(data or b"")
+
+    @staticmethod
+    def __binaries(output_dir, sketch, since):
+        name = os.path.basename(sketch.rstrip(os.sep))
+        try:
+            entries = os.listdir(output_dir)
+        except OSError:
+            return []
+        return [os.path.join(output_dir, entry) for entry in entries
+                if entry.startswith(name + ".") and os.path.isfile(os.path.join(output_dir, entry)) and
+                os.stat(os.path.join(output_dir, entry)).st_mtime >= since]
+
+    def __finish(self, key, output_dir, sketch, since, output):
+        if key is not None and output[0] == 0:
+            files = CompileCacheExecutor.__binaries(output_dir, sketch, since)
+            if files:
+                self.__cache.store(key, output, files)
+        return output
+
+    def execute(self, command):
+        plan = self.__plan(command)
+        if plan is None:
+            return self.__executor.execute(command)
+        parsed, sketch, prefix = plan
+        inputs, output_dir = CompileCacheExecutor.__inputs(command, parsed, sketch)
+        key = self.__key(inputs, self.__executor.execute(prefix + [commands.CORE, commands.LIST]),
+                         self.__executor.execute(prefix + [commands.LIB, commands.LIST]))
+        if key is not None:
+            output = self.__cache.restore(key, output_dir)
+            if output is not None:
+                return output
+        since = time.time() - 1
+        return self.__finish(key, output_dir, sketch, since, self.__executor.execute(command))
+
+    async def execute_async(self, command):
+        plan = self.__plan(command)
+        if plan is None:
+            return await self.__executor.execute_async(command)
+        import asyncio
+        loop = asyncio.get_running_loop()
+        parsed, sketch, prefix = plan
+        inputs, output_dir = await loop.run_in_executor(None, CompileCacheExecutor.__inputs, command, parsed, sketch)
+        cores = await self.__executor.execute_async(prefix + [commands.CORE, commands.LIST])
+        libraries = await self.__executor.execute_async(prefix + [commands.LIB, commands.LIST])
+        key = self.__key(inputs, cores, libraries)
+        if key is not None:
+            output = await loop.run_in_executor(None, self.__cache.restore, key, output_dir)
+            if output is not None:
+                return output
+        since = time.time() - 1
+        output = await self.__executor.execute_async(command)
+        return await loop.run_in_executor(None, self.__finish, key, output_dir, sketch, since, output)
+
+    def close(self):
+        self.__executor.close()
@@ -0,0 +1,524 @@
+import base64
+import collections
+import json
+import os
+import re
+import socket
+import threading
+import time
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import parse_command
+from pyduinocli.executors.base import ExecutorBase, SubprocessExecutor
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors.progress import Progress, ProgressParser
+
+
+class GrpcTransport:
+    """
+    Sends requests to an :code:`arduino-cli` daemon over gRPC.
+
+    Requests and responses are plain dicts using the protobuf field names, they are converted from and to the
+    messages of the :code:`cc.arduino.cli.commands.v1` package. This needs :code:`grpcio`, :code:`protobuf` and the
+    Python modules generated from the :code:`rpc/` definitions of :code:`arduino-cli` (e.g. with
+    :code:`python -m grpc_tools.protoc`).
+    """
+
+    SERVICE = "cc.arduino.cli.commands.v1.ArduinoCoreService"
+
+    def __init__(self, stubs_module="cc.arduino.cli.commands.v1.commands_pb2"):
+        """
+        :param stubs_module: The generated module defining the :code:`ArduinoCoreService` messages
+        :type stubs_module: str
+        """
+        try:
+            import importlib
+            import grpc
+            from google.protobuf import descriptor_pool, json_format, message_factory
+            importlib.import_module(stubs_module)
+        except ImportError as e:
+            raise ImportError("The daemon backend needs grpcio, protobuf and the arduino-cli gRPC stubs "
+                              "(%s): %s" % (stubs_module, e))
+        self.__grpc = grpc
+        self.__json_format = json_format
+        self.__message_factory = message_factory
+        self.__pool = descriptor_pool.Default()
+        self.__package = GrpcTransport.SERVICE.rpartition(".")[0]
+        self.__channel = None
+
+    def __message_class(self, name):
+        descriptor = self.__pool.FindMessageTypeByName("%s.%s" % (self.__package, name))
+        if hasattr(self.__message_factory, "GetMessageClass"):
+            return self.__message_factory.GetMessageClass(descriptor)
+        return self.__message_factory.MessageFactory(self.__pool).GetPrototype(descriptor)
+
+    def connect(self, address, timeout=None):
+        """
+        Opens the channel to the daemon and waits for it to be ready
+
+        :param address: The address of the daemon, e.g.: 127.0.0.1:50051
+        :type address: str
+        :param timeout: Max time to wait for the daemon, in seconds
+        :type timeout: float or NoneType
+        """
+        self.close()
+        self.__channel = self.__grpc.insecure_channel(address)
+        self.__grpc.channel_ready_future(self.__channel).result(timeout=timeout)
+
+    def ping(self, timeout=None):
+        """
+        Checks that the daemon is reachable
+
+        :param timeout: Max time to wait for the daemon, in seconds
+        :type timeout: float or NoneType
+        :return: Whether the daemon answered in time
+        :rtype: bool
+        """
+        if self.__channel is None:
+            return False
+        try:
+            self.__grpc.channel_ready_future(self.__channel).result(timeout=timeout)
+            return True
+        except self.__grpc.FutureTimeoutError:
+            return False
+
+    def call(self, method, request, stream=False, deadline=None, on_response=None):
+        """
+        Calls a method of the :code:`ArduinoCoreService`
+
+        :param method: The name of the method, e.g.: BoardList
+        :type method: str
+        :param request: The request fields
+        :type request: dict
+        :param stream: Whether the method returns a stream of responses
+        :type stream: bool
+        :param deadline: The deadline after which the call is cancelled
+        :type deadline: pyduinocli.executors.deadline.Deadline or NoneType
+        :param on_response: A function called with each response of a streaming method as soon as it is received
+        :type on_response: callable or NoneType
+        :return: The response fields, or the list of responses for streaming methods
+        :rtype: dict or list
+        """
+        request_class = self.__message_class("%sRequest" % method)
+        response_class = self.__message_class("%sResponse" % method)
+        message = self.__json_format.ParseDict(request, request_class(), ignore_unknown_fields=True)
+        path = "/%s/%s" % (GrpcTransport.SERVICE, method)
+        factory = self.__channel.unary_stream if stream else self.__channel.unary_unary
+        rpc = factory(path, request_serializer=request_class.SerializeToString,
+                      response_deserializer=response_class.FromString)
+        timeout = None if deadline is None else deadline.remaining()
+        call = rpc(message, timeout=timeout) if stream else rpc.future(message, timeout=timeout)
+        if deadline is not None and deadline.cancellable:
+            threading.Thread(target=GrpcTransport.__watch, args=(call, deadline), daemon=True).start()
+        if stream:
+            responses = list()
+            for response in call:
+                responses.append(self.__to_dict(response))
+                if on_response is not None:
+                    on_response(responses[-1])
+            return responses
+        return self.__to_dict(call.result())
+
+    @staticmethod
+    def __watch(call, deadline):
+        while not call.done():
+            if deadline.cancelled:
+                call.cancel()
+                return
+            time.sleep(0.1)
+
+    def __to_dict(self, message):
+        return self.__json_format.MessageToDict(message, preserving_proto_field_name=True)
+
+    def close(self):
+        """
+        Closes the channel to the daemon
+        """
+        if self.__channel is not None:
+            self.__channel.close()
+            self.__channel = None
+
+
+class DaemonExecutor(ExecutorBase):
+    """
+    Runs commands through a single long running :code:`arduino-cli daemon`, so the configuration, the package and
+    library indexes and the installed platforms are only loaded once.
+
+    The daemon is started on the first call. The results keep the shape of the JSON output of :code:`arduino-cli`,
+    and the commands that have no gRPC counterpart (or use options the daemon does not support) are run by the
+    fallback executor. So are the commands installing, removing or downloading platforms and libraries, whose
+    streamed responses do not tell what :code:`arduino-cli` prints.
+    """
+
+    __OUTPUT_LINES = 100
+
+    def __init__(self, daemon, address=None, transport=None, fallback=None, startup_timeout=30):
+        """
+        :param daemon: The daemon command wrapper used to start the daemon
+        :type daemon: pyduinocli.commands.daemon.DaemonCommand
+        :param address: The address of an already running daemon (or of a fake server), no daemon is started if set
+        :type address: str or NoneType
+        :param transport: The transport used to talk to the daemon, a :class:`GrpcTransport` by default
+        :type transport: GrpcTransport or NoneType
+        :param fallback: The executor running the commands the daemon cannot run
+        :type fallback: pyduinocli.executors.base.ExecutorBase or NoneType
+        :param startup_timeout: Max time to wait for the daemon to start, in seconds
+        :type startup_timeout: float
+        """
+        self.__daemon = daemon
+        self.__address = address
+        self.__transport = transport if transport is not None else GrpcTransport()
+        self.__fallback = fallback if fallback is not None else SubprocessExecutor()
+        self.__startup_timeout = startup_timeout
+        self.__lock = threading.RLock()
+        self.__process = None
+        self.__output = collections.deque(maxlen=DaemonExecutor.__OUTPUT_LINES)
+        self.__instance = None
+
+    @property
+    def address(self):
+        """
+        The address of the daemon, :code:`None` until it is started
+
+        :type: str or NoneType
+        """
+        return self.__address
+
+    @property
+    def process(self):
+        """
+        The daemon process started by this executor, :code:`None` if it connects to an existing daemon
+
+        :type: subprocess.Popen or NoneType
+        """
+        return self.__process
+
+    @staticmethod
+    def _free_port():
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(("127.0.0.1", 0))
+            return s.getsockname()[1]
+
+    def __drain(self, process):
+        for line in process.stdout:
+            self.__output.append(line)
+
+    def __start(self):
+        if self.__process is None and self.__address is not None:
+            self.__transport.connect(self.__address, self.__startup_timeout)
+            return
+        port = DaemonExecutor._free_port()
+        self.__output.clear()
+        self.__process = self.__daemon.start(port=port)
+        threading.Thread(target=self.__drain, args=(self.__process,), daemon=True).start()
+        self.__address = "127.0.0.1:%d" % port
+        try:
+            self.__transport.connect(self.__address, self.__startup_timeout)
+        except Exception:
+            self.__process.kill()
+            raise RuntimeError("arduino-cli daemon failed to start: %s" % "".join(self.__output).strip())
+
+    def _instance(self):
+        """
+        Gets the gRPC instance of the daemon, starting the daemon and creating the instance if needed
+
+        :return: The instance to pass in the requests
+        :rtype: dict
+        """
+        with self.__lock:
+            if self.__process is not None and self.__process.poll() is not None:
+                self.__instance = None
+            if self.__instance is None:
+                self.__start()
+                self.__instance = self.__transport.call("Create", dict()).get("instance", dict())
+                self.__transport.call("Init", dict(instance=self.__instance), stream=True)
+            return self.__instance
+
+    def reinit(self):
+        """
+        Reloads the indexes and the installed platforms and libraries of the instance
+        """
+        with self.__lock:
+            if self.__instance is not None:
+                self.__transport.call("Init", dict(instance=self.__instance), stream=True)
+
+    def healthy(self, timeout=1):
+        """
+        Checks whether the daemon is running and answering. A daemon that has not been started yet is healthy.
+
+        :param timeout: Max time to wait for the daemon to answer, in seconds
+        :type timeout: float
+        :return: Whether the daemon is healthy
+        :rtype: bool
+        """
+        with self.__lock:
+            if self.__instance is None:
+                return True
+            if self.__process is not None and self.__process.poll() is not None:
+                return False
+        return self.__transport.ping(timeout)
+
+    def restart(self):
+        """
+        Stops the daemon started by this executor and starts a new one
+        """
+        with self.__lock:
+            self.__stop()
+            self._instance()
+
+    def execute(self, command):
+        parsed = parse_command(command)
+        rpc = _RPCS.get(parsed.path)
+        try:
+            if rpc is None or not rpc.supports(parsed):
+                return self.__fallback.execute(command)
+            return self.__call(rpc, parsed)
+        finally:
+            if parsed.path in _REINITIALIZING:
+                self.reinit()
+
+    def __call(self, rpc, parsed):
+        instance = self._instance()
+        deadline = Deadline.current()
+        progress = Progress.current()
+        parser = None if progress is None or not rpc.stream else ProgressParser(progress)
+        try:
+            response = self.__transport.call(rpc.method, rpc.request(parsed, instance), stream=rpc.stream,
+                                             deadline=deadline,
+                                             on_response=None if parser is None else parser.response)
+            if parser is not None:
+                parser.flush()
+        except Exception as e:
+            if deadline is not None and (deadline.expired() or deadline.cancelled):
+                raise ExecutorBase._interrupted(deadline, "", str(e))
+            details = e.details() if hasattr(e, "details") else str(e)
+            return 1, json.dumps(dict(error=details)), details
+        return 0, json.dumps(rpc.convert(response)), ""
+
+    def __stop(self):
+        if self.__instance is not None and (self.__process is None or self.__process.poll() is None):
+            try:
+                self.__transport.call("Destroy", dict(instance=self.__instance))
+            except Exception:
+                pass
+        self.__instance = None
+        self.__transport.close()
+        if self.__process is not None:
+            self.__process.terminate()
+            self.__process.wait()
+            self.__process = None
+            self.__address = None
+
+    def close(self):
+        with self.__lock:
+            self.__stop()
+        self.__fallback.close()
+
+
+_REINITIALIZING = {
+    (commands.CORE, commands.INSTALL), (commands.CORE, commands.UNINSTALL), (commands.CORE, commands.UPGRADE),
+    (commands.CORE, commands.UPDATE_INDEX), (commands.LIB, commands.INSTALL), (commands.LIB, commands.UNINSTALL),
+    (commands.LIB, commands.UPGRADE), (commands.LIB, commands.UPDATE_INDEX), (commands.UPDATE,), (commands.UPGRADE,),
+}
+
+
+def reinitializes(command):
+    """
+    Tells whether a command changes the indexes, platforms or libraries a daemon has loaded, so that the daemon
+    instances must be initialized again after it ran
+
+    :param command: The full command line
+    :type command: list
+    :return: Whether the command changes the loaded data
+    :rtype: bool
+    """
+    return parse_command(command).path in _REINITIALIZING
+
+
+def _option(parsed, flag):
+    values = parsed.options.get(flag)
+    return values[-1] if values else None
+
+
+def _flag(parsed, flag):
+    return _option(parsed, flag) is True
+
+
+def _fqbn(parsed):
+    fqbn = _option(parsed, flags.FQBN)
+    board_options = parsed.options.get(flags.BOARD_OPTIONS)
+    if fqbn and board_options:
+        fqbn = "%s:%s" % (fqbn, ",".join(board_options))
+    return fqbn
+
+
+def _duration(value):
+    units = dict(ms=1, s=1000, m=60000, h=3600000)
+    return int(sum(float(amount) * units[unit] for amount, unit in re.findall(r"([\d.]+)(ms|s|m|h)", value)))
+
+
+def _reference(value):
+    name, _, version = value.partition("@")
+    return name, version
+
+
+def _streams(responses):
+    out = "".join(base64.b64decode(r.get("out_stream", "")).decode("utf-8", "replace") for r in responses)
+    err = "".join(base64.b64decode(r.get("err_stream", "")).decode("utf-8", "replace") for r in responses)
+    return out, err
+
+
+def _merge(responses, *skipped):
+    merged = dict()
+    for response in responses:
+        merged.update((key, value) for key, value in response.items() if key not in skipped)
+    # the recent daemons send the result in a message of its own, between the progress and output messages
+    return merged.get("result", merged)
+
+
+class _Rpc:
+
+    def __init__(self, method, build=None, convert=None, stream=False, unsupported=()):
+        self.method = method
+        self.stream = stream
+        self.__build = build or (lambda parsed: dict())
+        self.__convert = convert or (lambda response: response)
+        self.__unsupported = unsupported
+
+    def supports(self, parsed):
+        return not any(flag in parsed.options for flag in self.__unsupported)
+
+    def request(self, parsed, instance):
+        request = _strip_none(self.__build(parsed))
+        request["instance"] = instance
+        return request
+
+    def convert(self, response):
+        return self.__convert(response)
+
+
+def _strip_none(request):
+    if isinstance(request, dict):
+        return {key: _strip_none(value) for key, value in request.items() if value is not None}
+    return request
+
+
+def _compile_request(parsed):
+    return dict(
+        sketch_path=os.path.abspath(parsed.positionals[0]) if parsed.positionals else os.getcwd(),
+        fqbn=_fqbn(parsed),
+        build_cache_path=_option(parsed, flags.BUILD_CACHE_PATH),
+        build_path=_option(parsed, flags.BUILD_PATH),
+        build_properties=parsed.options.get(flags.BUILD_PROPERTY, []),
+        export_dir=_option(parsed, flags.OUTPUT_DIR),
+        show_properties=flags.SHOW_PROPERTIES in parsed.options,
+        do_not_expand_build_properties=_option(parsed, flags.SHOW_PROPERTIES) == "unexpanded",
+        warnings=_option(parsed, flags.WARNINGS),
+        libraries=parsed.options.get(flags.LIBRARIES, []),
+        library=parsed.options.get(flags.LIBRARY, []),
+        optimize_for_debug=_flag(parsed, flags.OPTIMIZE_FOR_DEBUG),
+        export_binaries=True if _flag(parsed, flags.EXPORT_BINARIES) else None,
+        clean=_flag(parsed, flags.CLEAN),
+        create_compilation_database_only=_flag(parsed, flags.ONLY_COMPILATION_DATABASE),
+        encrypt_key=_option(parsed, flags.ENCRYPT_KEY),
+        keys_keychain=_option(parsed, flags.KEYS_KEYCHAIN),
+        sign_key=_option(parsed, flags.SIGN_KEY),
+        verbose=_flag(parsed, flags.VERBOSE),
+    )
+
+
+def _compile_result(responses):
+    out, err = _streams(responses)
+    return dict(compiler_out=out, compiler_err=err,
+                builder_result=_merge(responses, "out_stream", "err_stream", "progress"), success=True)
+
+
+def _upload_request(parsed):
+    sketch = parsed.positionals[0] if parsed.positionals else None
+    return dict(
+        sketch_path=os.path.abspath(sketch) if sketch else None,
+        fqbn=_fqbn(parsed),
+        port=dict(address=_option(parsed, flags.PORT), protocol=_option(parsed, flags.PROTOCOL)),
+        import_dir=_option(parsed, flags.INPUT_DIR),
+        import_file=_option(parsed, flags.INPUT_FILE),
+        programmer=_option(parsed, flags.PROGRAMMER),
+        verify=_flag(parsed, flags.VERIFY),
+        verbose=_flag(parsed, flags.VERBOSE),
+        user_fields=dict(field.partition("=")[::2] for field in parsed.options.get(flags.UPLOAD_FIELD, [])),
+    )
+
+
+def _upload_result(responses):
+    out, err = _streams(responses)
+    result = dict(stdout=out, stderr=err)
+    result.update(_merge(responses, "out_stream", "err_stream", "progress"))
+    return result
+
+
+def _burn_bootloader_request(parsed):
+    return dict(
+        fqbn=_fqbn(parsed),
+        port=dict(address=_option(parsed, flags.PORT), protocol=_option(parsed, flags.PROTOCOL)),
+        programmer=_option(parsed, flags.PROGRAMMER),
+        verify=_flag(parsed, flags.VERIFY),
+        verbose=_flag(parsed, flags.VERBOSE),
+    )
+
+
+_RPCS = {
+    (commands.VERSION,): _Rpc(
+        "Version",
+        convert=lambda r: dict(Application="arduino-cli", VersionString=r.get("version", ""), Commit=r.get("commit"),
+                               Status=r.get("status"), Date=r.get("date"))),
+    (commands.BOARD, commands.DETAILS): _Rpc(
+        "BoardDetails",
+        build=lambda p: dict(fqbn=_fqbn(p),
+                             do_not_expand_build_properties=_option(p, flags.SHOW_PROPERTIES) == "unexpanded"),
+        unsupported=(flags.SHOW_PROPERTIES,)),
+    (commands.BOARD, commands.LIST): _Rpc(
+        "BoardList",
+        build=lambda p: dict(timeout=_duration(_option(p, flags.DISCOVERY_TIMEOUT) or "1s"), fqbn=_fqbn(p)),
+        convert=lambda r: r.get("ports", []),
+        unsupported=(flags.WATCH,)),
+    (commands.BOARD, commands.LISTALL): _Rpc(
+        "BoardListAll",
+        build=lambda p: dict(search_args=p.positionals, include_hidden_boards=_flag(p, flags.SHOW_HIDDEN))),
+    (commands.BOARD, commands.SEARCH): _Rpc(
+        "BoardSearch",
+        build=lambda p: dict(search_args=" ".join(p.positionals), include_hidden_boards=_flag(p, flags.SHOW_HIDDEN)),
+        convert=lambda r: r.get("boards", [])),
+    (commands.CORE, commands.LIST): _Rpc(
+        "PlatformList",
+        build=lambda p: dict(updatable_only=_flag(p, flags.UPDATABLE), all=_flag(p, flags.ALL)),
+        convert=lambda r: r.get("installed_platforms", [])),
+    (commands.CORE, commands.SEARCH): _Rpc(
+        "PlatformSearch",
+        build=lambda p: dict(search_args=" ".join(p.positionals), all_versions=_flag(p, flags.ALL)),
+        convert=lambda r: r.get("search_output", [])),
+    (commands.LIB, commands.LIST): _Rpc(
+        "LibraryList",
+        build=lambda p: dict(all=_flag(p, flags.ALL), updatable=_flag(p, flags.UPDATABLE), fqbn=_fqbn(p)),
+        convert=lambda r: r.get("installed_libraries", [])),
+    (commands.LIB, commands.SEARCH): _Rpc(
+        "LibrarySearch",
+        build=lambda p: dict(search_args=" ".join(p.positionals),
+                             omit_releases_details=_flag(p, flags.OMIT_RELEASES_DETAILS)),
+        unsupported=(flags.NAMES,)),
+    (commands.LIB, commands.DEPS): _Rpc(
+        "LibraryResolveDependencies",
+        build=lambda p: dict(zip(("name", "version"), _reference(p.positionals[0])))),
+    (commands.COMPILE,): _Rpc(
+        "Compile", stream=True,
+        build=_compile_request,
+        convert=_compile_result,
+        unsupported=(flags.UPLOAD, flags.PREPROCESS, flags.DUMP_PROFILE, flags.PROFILE, flags.SHOW_PROPERTIES)),
+    (commands.UPLOAD,): _Rpc(
+        "Upload", stream=True,
+        build=_upload_request,
+        convert=_upload_result,
+        unsupported=(flags.PROFILE,)),
+    (commands.BURN_BOOTLOADER,): _Rpc(
+        "BurnBootloader", stream=True,
+        build=_burn_bootloader_request,
+        convert=_upload_result),
+}
@@ -0,0 +1,141 @@
+import contextvars
+import threading
+import time
+
+
+class CancellationToken:
+    """
+    Lets another thread cancel the commands run under a :class:`Deadline` using this token
+    """
+
+    def __init__(self):
+        self.__event = threading.Event()
+
+    def cancel(self):
+        """
+        Cancels the commands using this token, their processes are killed
+        """
+        self.__event.set()
+
+    @property
+    def cancelled(self):
+        """
+        Whether this token has been cancelled
+
+        :type: bool
+        """
+        return self.__event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Waits for this token to be cancelled
+
+        :param timeout: Max time to wait, in seconds
+        :type timeout: float or NoneType
+        :return: Whether the token has been cancelled
+        :rtype: bool
+        """
+        return self.__event.wait(timeout)
+
+
+class Deadline:
+    """
+    Context manager limiting the time the commands run inside it can take. When the deadline is reached or the
+    cancellation token is cancelled, the running :code:`arduino-cli` process and all its children are killed and a
+    :class:`pyduinocli.errors.arduinotimeouterror.ArduinoTimeoutError` or
+    :class:`pyduinocli.errors.arduinocancellederror.ArduinoCancelledError` is raised.
+
+    Deadlines apply to the current thread or asyncio task and can be nested, the earliest deadline wins.
+
+    .. code-block:: python
+
+        with pyduinocli.Deadline(timeout=60, cancel=token):
+            arduino.upload(sketch, fqbn=fqbn, port=port)
+    """
+
+    __current = contextvars.ContextVar("pyduinocli_deadline", default=None)
+
+    def __init__(self, timeout=None, deadline=None, cancel=None):
+        """
+        :param timeout: Max time the commands can take, in seconds from now
+        :type timeout: float or NoneType
+        :param deadline: Time at which the commands are stopped, as given by :code:`time.monotonic()`
+        :type deadline: float or NoneType
+        :param cancel: A token to cancel the commands from another thread
+        :type cancel: CancellationToken or NoneType
+        """
+        if timeout is not None:
+            deadline = time.monotonic() + timeout if deadline is None else min(deadline, time.monotonic() + timeout)
+        self.__deadline = deadline
+        self.__tokens = [cancel] if cancel is not None else []
+        self.__reset = None
+
+    @staticmethod
+    def current():
+        """
+        Gets the deadline applying to the current thread or task
+
+        :return: The current deadline
+        :rtype: Deadline or NoneType
+        """
+        return Deadline.__current.get()
+
+    @property
+    def deadline(self):
+        """
+        The time at which the commands are stopped, as given by :code:`time.monotonic()`
+
+        :type: float or NoneType
+        """
+        return self.__deadline
+
+    @property
+    def cancelled(self):
+        """
+        Whether a cancellation token of this deadline has been cancelled
+
+        :type: bool
+        """
+        return any(token.cancelled for token in self.__tokens)
+
+    @property
+    def cancellable(self):
+        """
+        Whether this deadline has a cancellation token
+
+        :type: bool
+        """
+        return bool(self.__tokens)
+
+    def remaining(self):
+        """
+        Gets the time left before the deadline
+
+        :return: The time left in seconds, never negative, or :code:`None` if there is no deadline
+        :rtype: float or NoneType
+        """
+        if self.__deadline is None:
+            return None
+        return max(0.0, self.__deadline - time.monotonic())
+
+    def expired(self):
+        """
+        Tells whether the deadline has been reached
+
+        :return: Whether the deadline has been reached
+        :rtype: bool
+        """
+        return self.__deadline is not None and time.monotonic() >= self.__deadline
+
+    def __enter__(self):
+        outer = Deadline.current()
+        if outer is not None:
+            if outer.__deadline is not None:
+                self.__deadline = outer.__deadline if self.__deadline is None else min(self.__deadline,
+                                                                                        outer.__deadline)
+            self.__tokens = self.__tokens + outer.__tokens
+        self.__reset = Deadline.__current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        Deadline.__current.reset(self.__reset)
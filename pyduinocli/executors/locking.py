@@ -0,0 +1,243 @@
+import contextvars
+import functools
+import os
+import time
+from pyduinocli.commands.hooks import CommandCall
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import MUTATING, command_path
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.deadline import Deadline
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+#: Lock mode of the commands that only read the data and configuration directories
+SHARED = "shared"
+#: Lock mode of the commands that change the data and configuration directories
+EXCLUSIVE = "exclusive"
+
+#: The commands that change the data directory besides :data:`pyduinocli.executors.arguments.MUTATING`, e.g. by
+#: writing to its staging directory or deleting the downloads
+WRITERS = MUTATING | {(commands.CORE, commands.DOWNLOAD), (commands.LIB, commands.DOWNLOAD),
+                      (commands.CACHE, commands.CLEAN)}
+
+#: The commands that neither read nor write the data and configuration directories, or that run until stopped
+UNLOCKED = {(commands.VERSION,), (commands.COMPLETION,), (commands.DAEMON,), (commands.MONITOR,)}
+
+
+def lock_mode(command):
+    """
+    Gets the lock a command needs on the data and configuration directories
+
+    :param command: The full command line
+    :type command: list
+    :return: :data:`EXCLUSIVE` for the commands changing them, None for the commands that do not use them or run
+        until stopped (e.g. :code:`monitor`, :code:`board list --watch`), :data:`SHARED` for the others
+    :rtype: str or NoneType
+    """
+    path = command_path(command)
+    if path in WRITERS:
+        return EXCLUSIVE
+    if not path or path in UNLOCKED or flags.WATCH in command:
+        return None
+    return SHARED
+
+
+class FileLock:
+    """
+    A reader/writer lock shared between processes through a lock file, with :code:`flock` on POSIX systems. On
+    Windows, where files only have exclusive locks, the shared locks are exclusive too.
+
+    A writer waiting for the lock holds a second, intent, lock file next to it, which the readers take before the
+    lock. The readers arriving while a writer waits queue behind it, so that a stream of readers cannot starve it.
+
+    Each acquisition opens the files again, so the lock also works between the threads of a process.
+    """
+
+    __MIN_INTERVAL = 0.001
+    __MAX_INTERVAL = 0.05
+
+    def __init__(self, path):
+        """
+        :param path: The path to the lock file, it is created if it does not exist
+        :type path: str
+        """
+        self.__path = path
+
+    @property
+    def path(self):
+        """
+        The path to the lock file
+
+        :type: str
+        """
+        return self.__path
+
+    @staticmethod
+    def __try_lock(descriptor, exclusive):
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, (fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(descriptor, msvcrt.LK_NBLCK, 1)
+            return True
+        except (BlockingIOError, PermissionError):
+            return False
+        except OSError:
+            if fcntl is None:
+                return False
+            raise
+
+    @staticmethod
+    def __lock(path, exclusive, deadline):
+        descriptor = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+        interval = FileLock.__MIN_INTERVAL
+        try:
+            while not FileLock.__try_lock(descriptor, exclusive):
+                if deadline is not None and (deadline.expired() or deadline.cancelled):
+                    raise ExecutorBase._interrupted(deadline, b"", b"")
+                remaining = None if deadline is None else deadline.remaining()
+                time.sleep(interval if remaining is None else min(interval, remaining))
+                interval = min(interval * 2, FileLock.__MAX_INTERVAL)
+        except BaseException:
+            os.close(descriptor)
+            raise
+        return descriptor
+
+    def acquire(self, exclusive, deadline=None):
+        """
+        Waits for the lock, honoring a deadline
+
+        :param exclusive: Take the lock exclusively, shared otherwise
+        :type exclusive: bool
+        :param deadline: The deadline after which waiting is given up
+        :type deadline: pyduinocli.executors.deadline.Deadline or NoneType
+        :return: The descriptor holding the lock, to be given to :meth:`release`
+        :rtype: int
+        """
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        intent = FileLock.__lock(self.__path + ".intent", exclusive, deadline)
+        try:
+            return FileLock.__lock(self.__path, exclusive, deadline)
+        finally:
+            FileLock.release(intent)
+
+    def try_acquire(self, exclusive):
+        """
+        Takes the lock if it is free, without waiting
+
+        :param exclusive: Take the lock exclusively, shared otherwise
+        :type exclusive: bool
+        :return: The descriptor holding the lock, to be given to :meth:`release`, None if the lock is held
+        :rtype: int or NoneType
+        """
+        os.makedirs(os.path.dirname(self.__path) or ".", exist_ok=True)
+        descriptor = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o666)
+        if FileLock.__try_lock(descriptor, exclusive):
+            return descriptor
+        os.close(descriptor)
+        return None
+
+    @staticmethod
+    def release(descriptor):
+        """
+        Releases a lock taken with :meth:`acquire`
+
+        :param descriptor: The descriptor holding the lock
+        :type descriptor: int
+        """
+        try:
+            if fcntl is not None:
+                fcntl.flock(descriptor, fcntl.LOCK_UN)
+            else:
+                msvcrt.locking(descriptor, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(descriptor)
+
+
+class LockingExecutor(ExecutorBase):
+    """
+    Takes a file lock on the :code:`arduino-cli` data and configuration directories around each command, so that
+    several processes can share them: the commands only reading them (e.g. :code:`compile`, :code:`board list`,
+    :code:`lib search`) run in parallel, while the ones changing them (e.g. :code:`core install`,
+    :code:`lib update-index`, :code:`config set`) run alone. See :func:`lock_mode`.
+
+    The time spent waiting for the locks is reported by :attr:`pyduinocli.commands.result.CommandResult.lock_wait`.
+    """
+
+    LOCK_FILE = ".pyduinocli.lock"
+
+    def __init__(self, executor, directories):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param directories: The directories to lock, a lock file is created in each of them
+        :type directories: list
+        """
+        self.__executor = executor
+        paths = {os.path.normcase(os.path.abspath(directory)) for directory in directories}
+        # always locked in the same order, so that two processes cannot wait for each other
+        self.__locks = [FileLock(os.path.join(directory, LockingExecutor.LOCK_FILE)) for directory in sorted(paths)]
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    def __acquire(self, mode):
+        deadline = Deadline.current()
+        start = time.monotonic()
+        descriptors = list()
+        try:
+            for lock in self.__locks:
+                descriptors.append(lock.acquire(mode == EXCLUSIVE, deadline))
+        except BaseException:
+            LockingExecutor.__release(descriptors)
+            raise
+        CommandCall.locked(time.monotonic() - start)
+        return descriptors
+
+    @staticmethod
+    def __release(descriptors):
+        for descriptor in reversed(descriptors):
+            FileLock.release(descriptor)
+
+    def execute(self, command):
+        mode = lock_mode(command)
+        if mode is None:
+            return self.__executor.execute(command)
+        descriptors = self.__acquire(mode)
+        try:
+            return self.__executor.execute(command)
+        finally:
+            LockingExecutor.__release(descriptors)
+
+    async def execute_async(self, command):
+        mode = lock_mode(command)
+        if mode is None:
+            return await self.__executor.execute_async(command)
+        import asyncio
+        acquire = functools.partial(contextvars.copy_context().run, self.__acquire, mode)
+        future = asyncio.get_running_loop().run_in_executor(None, acquire)
+        try:
+            descriptors = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the thread keeps waiting for the locks, they are released as soon as it gets them
+            future.add_done_callback(lambda done: done.cancelled() or done.exception() is not None or
+                                     LockingExecutor.__release(done.result()))
+            raise
+        try:
+            return await self.__executor.execute_async(command)
+        finally:
+            LockingExecutor.__release(descriptors)
+
+    def close(self):
+        self.__executor.close()
@@ -0,0 +1,123 @@
+import os
+import threading
+from pyduinocli.executors.base import ExecutorBase, SubprocessExecutor
+from pyduinocli.executors.daemon import DaemonExecutor, GrpcTransport, reinitializes
+
+
+class DaemonPoolExecutor(ExecutorBase):
+    """
+    Runs commands through a pool of :code:`arduino-cli daemon` processes, each listening on a free port picked
+    automatically.
+
+    Each command goes to the daemon with the least calls in progress, in turn when several are equally busy. A supervisor thread checks the health of the
+    daemons periodically and restarts the ones that crashed or stopped answering. After a command changing the
+    installed platforms, libraries or indexes, every daemon of the pool reloads them.
+    """
+
+    def __init__(self, daemon, size=None, transport_factory=GrpcTransport, fallback=None, health_interval=5,
+                 health_timeout=1, startup_timeout=30):
+        """
+        :param daemon: The daemon command wrapper used to start the daemons
+        :type daemon: pyduinocli.commands.daemon.DaemonCommand
+        :param size: The number of daemons, the number of CPUs by default
+        :type size: int or NoneType
+        :param transport_factory: Creates the transport used to talk to each daemon
+        :type transport_factory: callable
+        :param fallback: The executor running the commands the daemons cannot run
+        :type fallback: pyduinocli.executors.base.ExecutorBase or NoneType
+        :param health_interval: Time between two health checks, in seconds
+        :type health_interval: float
+        :param health_timeout: Max time to wait for a daemon to answer a health check, in seconds
+        :type health_timeout: float
+        :param startup_timeout: Max time to wait for a daemon to start, in seconds
+        :type startup_timeout: float
+        """
+        if size is None:
+            size = os.cpu_count() or 1
+        if size < 1:
+            raise ValueError("A daemon pool needs at least one daemon")
+        self.__fallback = fallback if fallback is not None else SubprocessExecutor()
+        self.__members = [DaemonExecutor(daemon, transport=transport_factory(), fallback=self.__fallback,
+                                         startup_timeout=startup_timeout) for _ in range(size)]
+        self.__outstanding = [0] * size
+        self.__turn = 0
+        self.__restarts = [0] * size
+        self.__lock = threading.Lock()
+        self.__health_interval = health_interval
+        self.__health_timeout = health_timeout
+        self.__closed = threading.Event()
+        self.__supervisor = threading.Thread(target=self.__supervise, daemon=True)
+        self.__supervisor.start()
+
+    @property
+    def members(self):
+        """
+        The executors of the daemons of this pool
+
+        :type: list
+        """
+        return list(self.__members)
+
+    @property
+    def outstanding(self):
+        """
+        The number of calls in progress on each daemon
+
+        :type: list
+        """
+        with self.__lock:
+            return list(self.__outstanding)
+
+    @property
+    def restarts(self):
+        """
+        The number of times each daemon has been restarted by the supervisor
+
+        :type: list
+        """
+        with self.__lock:
+            return list(self.__restarts)
+
+    def __supervise(self):
+        while not self.__closed.wait(self.__health_interval):
+            for index, member in enumerate(self.__members):
+                if self.__closed.is_set():
+                    return
+                if member.healthy(self.__health_timeout):
+                    continue
+                try:
+                    member.restart()
+                except Exception:
+                    continue
+                with self.__lock:
+                    self.__restarts[index] += 1
+
+    def __acquire(self):
+        with self.__lock:
+            size = len(self.__members)
+            index = min(range(size), key=lambda i: (self.__outstanding[i], (i - self.__turn) % size))
+            self.__turn = (index + 1) % size
+            self.__outstanding[index] += 1
+            return index
+
+    def __release(self, index):
+        with self.__lock:
+            self.__outstanding[index] -= 1
+
+    def execute(self, command):
+        index = self.__acquire()
+        try:
+            result = self.__members[index].execute(command)
+        finally:
+            self.__release(index)
+        if reinitializes(command):
+            for other, member in enumerate(self.__members):
+                if other != index:
+                    member.reinit()
+        return result
+
+    def close(self):
+        self.__closed.set()
+        self.__supervisor.join()
+        for member in self.__members:
+            member.close()
@@ -0,0 +1,272 @@
+import base64
+import codecs
+import contextvars
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+#: A compilation stage started, e.g. :code:`"sketch"`, :code:`"libraries"`, :code:`"core"` or :code:`"link"`
+STAGE = "stage"
+#: A file is being downloaded
+DOWNLOAD = "download"
+#: A step of an installation or a compilation progressed
+TASK = "task"
+#: The uploader is writing, reading (verifying) or erasing the board memory
+UPLOAD = "upload"
+#: A line of output that is not a progress report
+OUTPUT = "output"
+
+ProgressEvent = namedtuple("ProgressEvent", ["kind", "name", "percent", "message", "time"])
+"""
+A progress report of a running command.
+
+:code:`kind` is one of :data:`STAGE`, :data:`DOWNLOAD`, :data:`TASK`, :data:`UPLOAD` and :data:`OUTPUT`,
+:code:`name` identifies what progressed (the stage, file, task or memory operation), :code:`percent` is the progress
+between 0 and 100 when known, :code:`message` is the line or message it was read from and :code:`time` is the time
+it was received, as given by :code:`time.monotonic()`.
+"""
+
+
+class Progress:
+    """
+    Context manager sending the progress of the commands run inside it to a callback, as :class:`ProgressEvent`. The
+    callback is called from the thread running the command, while it runs.
+
+    With the subprocess backend, the events are read from what :code:`arduino-cli` prints while running. The
+    commands that only print their progress with the text output format, e.g. the installations and the
+    compilations, are run with it, see :mod:`pyduinocli.executors.textmode`. The daemon backend reports the
+    compilation and upload progress, and runs the installations with the subprocess backend.
+
+    .. code-block:: python
+
+        with pyduinocli.Progress(print):
+            arduino.core.install(["arduino:avr"])
+    """
+
+    __current = contextvars.ContextVar("pyduinocli_progress", default=None)
+
+    def __init__(self, callback):
+        """
+        :param callback: The function receiving the events, nothing is changed if None
+        :type callback: callable or NoneType
+        """
+        self.__callback = callback
+        self.__reset = None
+
+    @staticmethod
+    def current():
+        """
+        Gets the progress callback applying to the current thread or task
+
+        :return: The current progress
+        :rtype: Progress or NoneType
+        """
+        return Progress.__current.get()
+
+    def emit(self, kind, name=None, percent=None, message=None):
+        """
+        Sends an event to the callback
+
+        :param kind: The kind of event
+        :type kind: str
+        :param name: What progressed
+        :type name: str or NoneType
+        :param percent: The progress between 0 and 100
+        :type percent: float or NoneType
+        :param message: The message the event was read from
+        :type message: str or NoneType
+        """
+        self.__callback(ProgressEvent(kind, name, percent, message, time.monotonic()))
+
+    def __enter__(self):
+        if self.__callback is not None:
+            self.__reset = Progress.__current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.__reset is not None:
+            Progress.__current.reset(self.__reset)
+            self.__reset = None
+
+
+class ProgressParser:
+    """
+    Turns the output of :code:`arduino-cli` and the responses of its daemon into :class:`ProgressEvent`
+    """
+
+    __STAGES = [
+        (re.compile(r"^Detecting libraries used"), "libraries-detection"),
+        (re.compile(r"^Generating function prototypes"), "prototypes"),
+        (re.compile(r"^Compiling sketch"), "sketch"),
+        (re.compile(r"^Compiling libraries"), "libraries"),
+        (re.compile(r"^Compiling core"), "core"),
+        (re.compile(r"^Linking everything together"), "link"),
+        (re.compile(r"^avrdude: verifying"), "verify"),
+    ]
+    __UPLOAD = re.compile(r"^(Writing|Reading|Erasing) \| [#\s]*\| (\d+)%")
+    __DOWNLOAD = re.compile(r"^(\S+) +[\d.]+ [KMGT]?i?B / [\d.]+ [KMGT]?i?B +(\d+(?:\.\d+)?)%")
+    # the lines of the JSON output, e.g. '"compiler_out": "Sketch uses 444 bytes (1%)..."', are not progress reports
+    __JSON_TOKEN = re.compile(r'^(?:[{}\[\]"]|-?\d|true\b|false\b|null\b)')
+    __JSON_STREAMS = ("compiler_out", "compiler_err")
+    __DOWNLOADED = re.compile(r"^(\S+) downloaded$")
+    __INSTALLING = re.compile(r"^Installing (?:platform |tool |library )?(\S+)\.\.\.$", re.IGNORECASE)
+    __INSTALLED = re.compile(r"^(?:(?:platform |tool |library )?(\S+) installed|Installed (\S+))$", re.IGNORECASE)
+
+    def __init__(self, progress, json_stdout=True):
+        """
+        :param progress: The progress receiving the events
+        :type progress: Progress
+        :param json_stdout: Whether the standard output is the JSON output of the command, whose lines are neither
+            progress reports nor output lines
+        :type json_stdout: bool
+        """
+        self.__progress = progress
+        self.__json_stdout = json_stdout
+        self.__decoders = dict()
+        self.__lines = dict()
+        self.__report_output = dict()
+        self.__download_name = None
+        self.__lock = threading.Lock()
+
+    def feed(self, data, stream="stderr", report_output=None):
+        """
+        Parses a chunk of output, the events are emitted for each complete line
+
+        :param data: The chunk of output
+        :type data: bytes or str
+        :param stream: The name of the stream the chunk was read from
+        :type stream: str
+        :param report_output: Emit the lines that are not progress reports as :data:`OUTPUT` events, unless they are
+            the JSON standard output if None
+        :type report_output: bool or NoneType
+        """
+        if report_output is None:
+            report_output = stream != "stdout" or not self.__json_stdout
+        with self.__lock:
+            if not isinstance(data, str):
+                decoder = self.__decoders.setdefault(stream, codecs.getincrementaldecoder("utf-8")("replace"))
+                data = decoder.decode(data)
+            lines = re.split(r"[\r\n]", self.__lines.get(stream, "") + data)
+            self.__lines[stream] = lines.pop()
+            self.__report_output[stream] = report_output
+            for line in lines:
+                self.line(line.strip(), report_output, stream)
+
+    def flush(self):
+        """
+        Parses the last lines of the output, that were not terminated by a new line
+        """
+        with self.__lock:
+            for stream, line in self.__lines.items():
+                self.line(line.strip(), self.__report_output[stream], stream)
+            self.__lines.clear()
+
+    def output(self, stdout):
+        """
+        Parses the compiler output held by the JSON output of a command once it ended, since :code:`arduino-cli`
+        only prints it there with the JSON output format
+
+        :param stdout: The standard output of the command
+        :type stdout: bytes or str
+        """
+        if not isinstance(stdout, (bytes, bytearray, str)):
+            return
+        try:
+            output = json.loads(stdout)
+        except ValueError:
+            return
+        if not isinstance(output, dict):
+            return
+        for stream in ProgressParser.__JSON_STREAMS:
+            if isinstance(output.get(stream), str):
+                self.feed(output[stream] + "\n", stream)
+
+    def line(self, line, report_output=True, stream="stderr"):
+        """
+        Parses a line of output
+
+        :param line: The line
+        :type line: str
+        :param report_output: Emit the line as an :data:`OUTPUT` event if it is not a progress report
+        :type report_output: bool
+        :param stream: The name of the stream the line was read from, the lines of the JSON standard output are
+            ignored
+        :type stream: str
+        """
+        if not line or stream == "stdout" and self.__json_stdout and ProgressParser.__JSON_TOKEN.match(line):
+            return
+        for pattern, stage in ProgressParser.__STAGES:
+            if pattern.match(line):
+                self.__progress.emit(STAGE, stage, None, line)
+                return
+        match = ProgressParser.__UPLOAD.match(line)
+        if match:
+            self.__progress.emit(UPLOAD, match.group(1).lower(), float(match.group(2)), line)
+            return
+        match = ProgressParser.__INSTALLING.match(line)
+        if match:
+            self.__progress.emit(TASK, match.group(1), 0.0, line)
+            return
+        match = ProgressParser.__INSTALLED.match(line)
+        if match:
+            self.__progress.emit(TASK, match.group(1) or match.group(2), 100.0, line)
+            return
+        match = ProgressParser.__DOWNLOADED.match(line)
+        if match:
+            self.__progress.emit(DOWNLOAD, match.group(1), 100.0, line)
+            return
+        match = ProgressParser.__DOWNLOAD.match(line)
+        if match:
+            self.__progress.emit(DOWNLOAD, match.group(1), float(match.group(2)), line)
+            return
+        if report_output:
+            self.__progress.emit(OUTPUT, None, None, line)
+
+    def response(self, response):
+        """
+        Parses a response streamed by the daemon
+
+        :param response: The response fields
+        :type response: dict
+        """
+        for stream in ("out_stream", "err_stream"):
+            if response.get(stream):
+                self.feed(base64.b64decode(response[stream]), stream)
+        download = response.get("progress")
+        if isinstance(download, dict) and ("start" in download or "update" in download or "end" in download
+                                           or "total_size" in download):
+            self.__download(download)
+        elif isinstance(download, dict):
+            self.__task(download)
+        task = response.get("task_progress")
+        if isinstance(task, dict):
+            self.__task(task)
+
+    def __download(self, download):
+        if "start" in download:
+            self.__download_name = download["start"].get("label") or download["start"].get("url")
+            self.__progress.emit(DOWNLOAD, self.__download_name, 0.0, download["start"].get("url"))
+        elif "update" in download:
+            self.__progress.emit(DOWNLOAD, self.__download_name,
+                                 ProgressParser.__percent(download["update"]), None)
+        elif "end" in download:
+            self.__progress.emit(DOWNLOAD, self.__download_name,
+                                 100.0 if download["end"].get("success") else None, download["end"].get("message"))
+        else:
+            self.__progress.emit(DOWNLOAD, download.get("name") or download.get("file"),
+                                 100.0 if download.get("completed") else ProgressParser.__percent(download), None)
+
+    def __task(self, task):
+        percent = task.get("percent")
+        if percent is None and task.get("completed"):
+            percent = 100.0
+        self.__progress.emit(TASK, task.get("name"), percent, task.get("message"))
+
+    @staticmethod
+    def __percent(update):
+        total = int(update.get("total_size", 0) or 0)
+        if not total:
+            return None
+        return 100.0 * int(update.get("downloaded", 0) or 0) / total
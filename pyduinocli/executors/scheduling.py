@@ -0,0 +1,368 @@
+import contextlib
+import contextvars
+import functools
+import itertools
+import os
+import threading
+import time
+from pyduinocli.commands.metrics import DEFAULT_BUCKETS, Histogram
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import parse_command
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.deadline import Deadline
+
+#: Priority of the builds a developer waits for, they may also use the slots reserved for them
+INTERACTIVE = "interactive"
+#: Priority of the builds of continuous integration jobs, the default
+CI = "ci"
+#: Priority of the background builds, e.g. a nightly build matrix
+BATCH = "batch"
+
+#: The priorities, from the most to the least urgent
+PRIORITIES = (INTERACTIVE, CI, BATCH)
+
+_priority = contextvars.ContextVar("pyduinocli_compile_priority", default=None)
+
+
+@contextlib.contextmanager
+def compile_priority(priority):
+    """
+    Context manager giving a priority to the builds started inside it, in the current thread or task
+
+    .. code-block:: python
+
+        with compile_priority(BATCH):
+            for sketch in sketches:
+                arduino.compile(sketch, fqbn="arduino:avr:uno")
+
+    :param priority: One of :data:`PRIORITIES`
+    :type priority: str
+    :return: The context manager
+    """
+    if priority not in PRIORITIES:
+        raise ValueError("Unknown priority: %s" % priority)
+    reset = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(reset)
+
+
+def current_priority():
+    """
+    Gets the priority given by :func:`compile_priority` to the current thread or task
+
+    :return: The priority, None if there is none
+    :rtype: str or NoneType
+    """
+    return _priority.get()
+
+
+class _Waiter:
+
+    __slots__ = ("rank", "since", "order", "jobs", "granted")
+
+    def __init__(self, rank, since, order, jobs):
+        self.rank = rank
+        self.since = since
+        self.order = order
+        self.jobs = jobs
+        self.granted = 0
+
+
+class CompileScheduler:
+    """
+    Shares a budget of CPU slots between the builds of a process. Each build gets a number of slots before it starts,
+    given to :code:`arduino-cli compile` as its :code:`--jobs`, and gives them back when it ends, so that concurrent
+    builds do not start more compiler processes than there are CPUs.
+
+    The waiting builds are served by priority (see :data:`PRIORITIES`) then in arrival order. A waiting build moves
+    up one priority every :code:`aging` seconds, so that the background builds are not starved. Some slots can be
+    reserved to the builds started as :data:`INTERACTIVE`, so that a developer does not wait for a whole background
+    build to end.
+
+    .. code-block:: python
+
+        scheduler = CompileScheduler(reserved=2)
+        arduino = pyduinocli.Arduino("./arduino-cli", compile_scheduler=scheduler)
+        with compile_priority(INTERACTIVE):
+            arduino.compile("Blink", fqbn="arduino:avr:uno")
+        print(scheduler.stats())
+
+    A scheduler is pickled as the shared scheduler of the process it is sent to, see :meth:`shared`.
+    """
+
+    __shared = None
+    __shared_lock = threading.Lock()
+
+    def __init__(self, slots=None, max_jobs=None, reserved=1, aging=30.0, default_priority=CI,
+                 buckets=DEFAULT_BUCKETS):
+        """
+        :param slots: The number of CPU slots shared by the builds, the number of CPUs if None
+        :type slots: int or NoneType
+        :param max_jobs: The max number of slots given to a build that does not ask for a number of jobs, a quarter of
+            the slots if None
+        :type max_jobs: int or NoneType
+        :param reserved: The number of slots only given to the :data:`INTERACTIVE` builds, at most all the slots but one
+        :type reserved: int
+        :param aging: The time after which a waiting build moves up one priority, in seconds, they never move if None
+        :type aging: float or NoneType
+        :param default_priority: The priority of the builds started outside of :func:`compile_priority`
+        :type default_priority: str
+        :param buckets: The upper bounds of the wait time histograms, in seconds
+        :type buckets: tuple
+        """
+        if default_priority not in PRIORITIES:
+            raise ValueError("Unknown priority: %s" % default_priority)
+        self.__slots = max(1, slots or os.cpu_count() or 1)
+        self.__max_jobs = max(1, min(self.__slots, max_jobs or self.__slots // 4))
+        self.__reserved = max(0, min(reserved, self.__slots - 1))
+        self.__aging = aging
+        self.__default_priority = default_priority
+        self.__condition = threading.Condition()
+        self.__waiters = list()
+        self.__order = itertools.count()
+        self.__in_use = 0
+        self.__granted = {priority: 0 for priority in PRIORITIES}
+        self.__waits = {priority: Histogram(tuple(buckets)) for priority in PRIORITIES}
+
+    @classmethod
+    def shared(cls):
+        """
+        Gets the scheduler shared by the whole process, created with the default arguments on first use
+
+        :return: The scheduler
+        :rtype: CompileScheduler
+        """
+        with CompileScheduler.__shared_lock:
+            if CompileScheduler.__shared is None:
+                CompileScheduler.__shared = cls()
+            return CompileScheduler.__shared
+
+    def __reduce__(self):
+        return CompileScheduler.shared, ()
+
+    @property
+    def slots(self):
+        """
+        The number of CPU slots shared by the builds
+
+        :type: int
+        """
+        return self.__slots
+
+    def __rank(self, waiter, now):
+        if not self.__aging:
+            return waiter.rank
+        return waiter.rank - (now - waiter.since) / self.__aging
+
+    def __dispatch(self):
+        now = time.monotonic()
+        for waiter in sorted(self.__waiters, key=lambda waiter: (self.__rank(waiter, now), waiter.order)):
+            free = self.__slots - self.__in_use - (0 if waiter.rank == 0 else self.__reserved)
+            if free >= 1:
+                waiter.granted = min(waiter.jobs, free)
+                self.__in_use += waiter.granted
+                self.__waiters.remove(waiter)
+        self.__condition.notify_all()
+
+    def acquire(self, jobs=None, priority=None, deadline=None):
+        """
+        Waits for CPU slots, honoring a deadline. The build may get fewer slots than it asks for, but at least one.
+
+        :param jobs: The number of slots the build asks for, :code:`max_jobs` if None, at most all the slots
+        :type jobs: int or NoneType
+        :param priority: The priority of the build, the one given by :func:`compile_priority` or the default priority
+            if None
+        :type priority: str or NoneType
+        :param deadline: The deadline after which waiting is given up
+        :type deadline: pyduinocli.executors.deadline.Deadline or NoneType
+        :return: The number of slots given to the build, to be given back to :meth:`release`
+        :rtype: int
+        """
+        priority = priority or current_priority() or self.__default_priority
+        jobs = max(1, min(self.__slots, jobs or self.__max_jobs))
+        start = time.monotonic()
+        with self.__condition:
+            waiter = _Waiter(PRIORITIES.index(priority), start, next(self.__order), jobs)
+            self.__waiters.append(waiter)
+            self.__dispatch()
+            try:
+                while not waiter.granted:
+                    if deadline is not None and (deadline.expired() or deadline.cancelled):
+                        raise ExecutorBase._interrupted(deadline, b"", b"")
+                    timeout = None if deadline is None else deadline.remaining()
+                    if deadline is not None and deadline.cancellable:
+                        timeout = 0.05 if timeout is None else min(timeout, 0.05)
+                    self.__condition.wait(timeout)
+            except BaseException:
+                if waiter.granted:
+                    self.__in_use -= waiter.granted
+                else:
+                    self.__waiters.remove(waiter)
+                self.__dispatch()
+                raise
+            self.__granted[priority] += 1
+            self.__waits[priority].observe(time.monotonic() - start)
+            return waiter.granted
+
+    def release(self, slots):
+        """
+        Gives back the slots given by :meth:`acquire`
+
+        :param slots: The number of slots
+        :type slots: int
+        """
+        with self.__condition:
+            self.__in_use -= slots
+            self.__dispatch()
+
+    @contextlib.contextmanager
+    def slot(self, jobs=None, priority=None, deadline=None):
+        """
+        Context manager holding CPU slots while inside it, see :meth:`acquire`
+
+        :return: The context manager, giving the number of slots
+        """
+        slots = self.acquire(jobs, priority, deadline)
+        try:
+            yield slots
+        finally:
+            self.release(slots)
+
+    def stats(self):
+        """
+        Gets the state of the scheduler
+
+        :return: The number of :code:`slots`, the slots :code:`in_use`, and per priority the number of builds
+            :code:`queued`, the number of builds :code:`granted` slots and the :code:`wait` count and sum in seconds
+        :rtype: dict
+        """
+        with self.__condition:
+            queued = {priority: 0 for priority in PRIORITIES}
+            for waiter in self.__waiters:
+                queued[PRIORITIES[waiter.rank]] += 1
+            return dict(slots=self.__slots, in_use=self.__in_use, queued=queued, granted=dict(self.__granted),
+                        wait={priority: dict(count=histogram.count, sum=histogram.sum)
+                              for priority, histogram in self.__waits.items()})
+
+    def to_prometheus(self):
+        """
+        Exports the queue depths, the slots in use and the wait time histograms in the Prometheus text format
+
+        :return: The metrics
+        :rtype: str
+        """
+        with self.__condition:
+            queued = {priority: 0 for priority in PRIORITIES}
+            for waiter in self.__waiters:
+                queued[PRIORITIES[waiter.rank]] += 1
+            lines = ["# TYPE pyduinocli_compile_slots gauge", "pyduinocli_compile_slots %d" % self.__slots,
+                     "# TYPE pyduinocli_compile_slots_in_use gauge",
+                     "pyduinocli_compile_slots_in_use %d" % self.__in_use,
+                     "# TYPE pyduinocli_compile_queue_depth gauge"]
+            lines.extend('pyduinocli_compile_queue_depth{priority="%s"} %d' % (priority, queued[priority])
+                         for priority in PRIORITIES)
+            lines.append("# TYPE pyduinocli_compile_wait_seconds histogram")
+            for priority in PRIORITIES:
+                histogram = self.__waits[priority]
+                for bound, count in histogram.buckets():
+                    lines.append('pyduinocli_compile_wait_seconds_bucket{priority="%s",le="%s"} %d' % (
+                        priority, "+Inf" if bound == float("inf") else repr(float(bound)), count))
+                lines.append('pyduinocli_compile_wait_seconds_sum{priority="%s"} %r' % (priority, histogram.sum))
+                lines.append('pyduinocli_compile_wait_seconds_count{priority="%s"} %d' % (priority, histogram.count))
+        return "\n".join(lines) + "\n"
+
+
+def _with_jobs(command, jobs):
+    rewritten = list()
+    tokens = iter(command)
+    for token in tokens:
+        if token == flags.JOBS:
+            next(tokens, None)
+        elif not token.startswith(flags.JOBS + "="):
+            rewritten.append(token)
+    return rewritten + [flags.JOBS, str(jobs)]
+
+
+class SchedulingExecutor(ExecutorBase):
+    """
+    Runs the :code:`compile` commands once a :class:`CompileScheduler` gave them CPU slots, and sets their
+    :code:`--jobs` to the number of slots. A build asking for a number of jobs asks the scheduler for as many slots,
+    :code:`--jobs 0` asking for all of them. The other commands run right away.
+    """
+
+    def __init__(self, executor, scheduler):
+        """
+        :param executor: The executor actually running the commands
+        :type executor: pyduinocli.executors.base.ExecutorBase
+        :param scheduler: The scheduler giving the slots
+        :type scheduler: CompileScheduler
+        """
+        self.__executor = executor
+        self.__scheduler = scheduler
+
+    @property
+    def executor(self):
+        """
+        The executor actually running the commands
+
+        :type: pyduinocli.executors.base.ExecutorBase
+        """
+        return self.__executor
+
+    @property
+    def scheduler(self):
+        """
+        The scheduler giving the slots
+
+        :type: CompileScheduler
+        """
+        return self.__scheduler
+
+    def __jobs(self, options):
+        try:
+            jobs = int(options.get(flags.JOBS, ["-1"])[-1])
+        except ValueError:
+            return None
+        if jobs < 0:
+            return None
+        return jobs or self.__scheduler.slots
+
+    def __acquire(self, jobs):
+        return self.__scheduler.acquire(jobs, deadline=Deadline.current())
+
+    def execute(self, command):
+        parsed = parse_command(command)
+        if parsed.path != (commands.COMPILE,):
+            return self.__executor.execute(command)
+        jobs = self.__jobs(parsed.options)
+        slots = self.__acquire(jobs)
+        try:
+            return self.__executor.execute(_with_jobs(command, slots))
+        finally:
+            self.__scheduler.release(slots)
+
+    async def execute_async(self, command):
+        parsed = parse_command(command)
+        if parsed.path != (commands.COMPILE,):
+            return await self.__executor.execute_async(command)
+        jobs = self.__jobs(parsed.options)
+        import asyncio
+        acquire = functools.partial(contextvars.copy_context().run, self.__acquire, jobs)
+        future = asyncio.get_running_loop().run_in_executor(None, acquire)
+        try:
+            slots = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # the thread keeps waiting for the slots, they are given back as soon as it gets them
+            future.add_done_callback(lambda done: done.cancelled() or done.exception() is not None or
+                                     self.__scheduler.release(done.result()))
+            raise
+        try:
+            return await self.__executor.execute_async(_with_jobs(command, slots))
+        finally:
+            self.__scheduler.release(slots)
+
+    def close(self):
+        self.__executor.close()
@@ -0,0 +1,132 @@
+import threading
+
+
+class SpooledOutput:
+    """
+    The standard output of a command, kept in memory until it grows larger than a threshold, then moved to a
+    temporary file. It can be read many times and from many threads, e.g. when its result is shared or cached.
+    """
+
+    __CHUNK_SIZE = 65536
+
+    def __init__(self, max_size):
+        """
+        :param max_size: The size from which the output is moved to a temporary file, in bytes
+        :type max_size: int
+        """
+        import tempfile
+        self.__file = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self.__max_size = max_size
+        self.__lock = threading.Lock()
+        self.__size = 0
+
+    def extend(self, data):
+        """
+        Appends data to the output, like :meth:`bytearray.extend`
+
+        :param data: The data to append
+        :type data: bytes
+        """
+        with self.__lock:
+            self.__file.seek(0, 2)
+            self.__file.write(data)
+            self.__size += len(data)
+
+    def __len__(self):
+        return self.__size
+
+    @property
+    def spooled(self):
+        """
+        Whether the output was moved to a temporary file
+
+        :type: bool
+        """
+        # the file rolls over once a write makes it larger than the threshold, a threshold of 0 never rolls it over
+        return bool(self.__max_size) and self.__size > self.__max_size
+
+    def chunks(self, size=None):
+        """
+        Reads the output chunk by chunk, from its beginning
+
+        :param size: The size of the chunks, in bytes
+        :type size: int or NoneType
+        :return: An iterator over the chunks
+        :rtype: iterator
+        """
+        size = size or SpooledOutput.__CHUNK_SIZE
+        offset = 0
+        while True:
+            with self.__lock:
+                self.__file.seek(offset)
+                chunk = self.__file.read(size)
+            if not chunk:
+                return
+            offset += len(chunk)
+            yield chunk
+
+    def getvalue(self):
+        """
+        Reads the whole output
+
+        :return: The output
+        :rtype: bytes
+        """
+        with self.__lock:
+            self.__file.seek(0)
+            return self.__file.read()
+
+    def close(self):
+        """
+        Deletes the output
+        """
+        self.__file.close()
+
+
+class RingBuffer:
+    """
+    Keeps the last bytes written to it, e.g. the end of the standard error of a command.
+    """
+
+    def __init__(self, max_size):
+        """
+        :param max_size: The max number of bytes kept
+        :type max_size: int
+        """
+        self.__max_size = max_size
+        self.__data = bytearray()
+        self.__dropped = 0
+
+    def extend(self, data):
+        """
+        Appends data to the buffer, like :meth:`bytearray.extend`, dropping its oldest bytes when it is full
+
+        :param data: The data to append
+        :type data: bytes
+        """
+        self.__data.extend(data)
+        excess = len(self.__data) - self.__max_size
+        if excess > 0:
+            del self.__data[:excess]
+            self.__dropped += excess
+
+    def __len__(self):
+        return len(self.__data)
+
+    @property
+    def dropped(self):
+        """
+        The number of bytes dropped from the buffer
+
+        :type: int
+        """
+        return self.__dropped
+
+    def getvalue(self):
+        """
+        Reads the bytes kept in the buffer
+
+        :return: The last bytes written
+        :rtype: bytes
+        """
+        return bytes(self.__data)
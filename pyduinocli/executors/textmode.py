@@ -0,0 +1,126 @@
+import json
+import re
+from pyduinocli.commands.result import decode
+from pyduinocli.constants import commands
+from pyduinocli.constants import flags
+from pyduinocli.executors.arguments import parse_command
+
+#: The commands that only print their progress with the text output format, e.g. the download bars of
+#: :code:`core install` or the compiler output of :code:`compile`. They are run with it when their progress is followed,
+#: and their JSON output is built from what they printed, see :func:`json_output`.
+PROGRESS_COMMANDS = {
+    (commands.CORE, commands.DOWNLOAD), (commands.CORE, commands.INSTALL), (commands.CORE, commands.UPDATE_INDEX),
+    (commands.CORE, commands.UPGRADE), (commands.LIB, commands.DOWNLOAD), (commands.LIB, commands.INSTALL),
+    (commands.LIB, commands.UPDATE_INDEX), (commands.LIB, commands.UPGRADE), (commands.UPDATE,), (commands.UPGRADE,),
+    (commands.COMPILE,), (commands.UPLOAD,), (commands.BURN_BOOTLOADER,),
+}
+
+_FORMAT_TEXT = "text"
+_SIZES = [
+    (re.compile(r"^Sketch uses (\d+) bytes.*Maximum is (\d+) bytes"), "text"),
+    (re.compile(r"^Global variables use (\d+) bytes.*Maximum is (\d+) bytes"), "data"),
+]
+_TABLE = re.compile(r"^Used (library|platform)\s+Version\s+Path\s*$")
+_UPLOAD_PORT = re.compile(r"^New upload port: (.+) \((\S+)\)$")
+
+
+def text_command(command):
+    """
+    Gets the command line printing the progress of a command, with the text output format
+
+    :param command: The full command line, using the JSON output format
+    :type command: list
+    :return: The command line with the text output format, None if the command prints the same progress with both
+        formats
+    :rtype: list or NoneType
+    """
+    if parse_command(command).path not in PROGRESS_COMMANDS:
+        return None
+    command = list(command)
+    for index, arg in enumerate(command[:-1]):
+        if arg == flags.FORMAT:
+            command[index + 1] = _FORMAT_TEXT
+            return command
+    return None
+
+
+def json_output(command, returncode, stdout, stderr):
+    """
+    Builds the output a command would have given with the JSON output format from what it printed with the text
+    output format. It only holds what the text output tells, e.g. the result of :code:`compile` lists the sizes, the
+    used libraries and platforms, but not the build properties.
+
+    :param command: The full command line, using the JSON output format
+    :type command: list
+    :param returncode: The return code of the command run by :func:`text_command`
+    :type returncode: int
+    :param stdout: The standard output of the command run by :func:`text_command`
+    :type stdout: bytes, str or pyduinocli.executors.spool.SpooledOutput
+    :param stderr: The standard error of the command run by :func:`text_command`
+    :type stderr: bytes or str
+    :return: The return code, standard output and standard error of the command
+    :rtype: tuple
+    """
+    parsed = parse_command(command)
+    out, err = decode(stdout) or "", decode(stderr) or ""
+    if parsed.path == (commands.COMPILE,):
+        result = _compile_result(parsed, returncode, out, err)
+    elif parsed.path in ((commands.UPLOAD,), (commands.BURN_BOOTLOADER,)):
+        result = _upload_result(out, err)
+    else:
+        result = None
+    if returncode != 0:
+        result = result or dict()
+        result["error"] = _error(err)
+    return returncode, b"" if result is None else json.dumps(result).encode("utf-8"), stderr
+
+
+def _error(err):
+    lines = [line.strip() for line in err.splitlines() if line.strip()]
+    return lines[-1] if lines else ""
+
+
+def _compile_result(parsed, returncode, out, err):
+    lines = out.splitlines(True)
+    end = next((index for index, line in enumerate(lines) if _TABLE.match(line)), len(lines))
+    builder_result = dict(used_libraries=[], executable_sections_size=[])
+    build_path = parsed.options.get(flags.BUILD_PATH)
+    if build_path:
+        builder_result["build_path"] = build_path[-1]
+    for line in lines[:end]:
+        for pattern, name in _SIZES:
+            match = pattern.match(line)
+            if match:
+                builder_result["executable_sections_size"].append(
+                    dict(name=name, size=int(match.group(1)), max_size=int(match.group(2))))
+    platforms = list()
+    table = None
+    for line in lines[end:]:
+        match = _TABLE.match(line)
+        if match:
+            table = match.group(1)
+            continue
+        columns = line.split(None, 2)
+        if len(columns) != 3:
+            table = None
+            continue
+        name, version, path = columns
+        if table == "library":
+            builder_result["used_libraries"].append(dict(name=name, version=version, install_dir=path.strip()))
+        elif table == "platform":
+            platforms.append(dict(id=name, version=version, install_dir=path.strip()))
+    if platforms:
+        # the platform of the board first, then the one it builds with if it is another
+        builder_result["board_platform"] = platforms[0]
+        builder_result["build_platform"] = platforms[-1]
+    return dict(compiler_out="".join(lines[:end]).rstrip("\n") + "\n" if end else "", compiler_err=err,
+                builder_result=builder_result, success=returncode == 0)
+
+
+def _upload_result(out, err):
+    result = dict(stdout=out, stderr=err)
+    for line in out.splitlines():
+        match = _UPLOAD_PORT.match(line.strip())
+        if match:
+            result["updated_upload_port"] = dict(address=match.group(1), protocol=match.group(2))
+    return result
@@ -0,0 +1,400 @@
+import concurrent.futures
+import inspect
+import os
+import time
+from pyduinocli.batch import resolve
+from pyduinocli.constants import commands
+from pyduinocli.executors.deadline import CancellationToken, Deadline
+from pyduinocli.executors.locking import WRITERS
+
+#: Resource of the steps changing the data directory (e.g. :code:`core install`), they run alone
+DATA_WRITER = "data-writer"
+#: Resource of the steps reading the data directory (e.g. :code:`compile`), they run together but not with a writer
+DATA_READER = "data-reader"
+#: Resource of the CPU bound steps (e.g. :code:`compile`), as many run together as there are CPUs by default
+CPU = "cpu"
+
+#: Status of a step that has not run yet
+PENDING = "pending"
+#: Status of a step that succeeded
+DONE = "done"
+#: Status of a step that raised an exception
+FAILED = "failed"
+#: Status of a step that did not run because one of its dependencies failed or was skipped
+SKIPPED = "skipped"
+
+_CPU_BOUND = {(commands.COMPILE,)}
+_PORT_BOUND = {(commands.UPLOAD,), (commands.BURN_BOOTLOADER,), (commands.DEBUG,), (commands.MONITOR,)}
+_SERIAL = "serial:"
+
+
+def serial(port):
+    """
+    Gets the resource of the steps using a serial port, only one of them uses the port at a time
+
+    :param port: The port, e.g. :code:`/dev/ttyACM0`
+    :type port: str
+    :return: The resource tag
+    :rtype: str
+    """
+    return _SERIAL + port
+
+
+#: Resource of the steps using a serial port without saying which one, e.g. an upload to the port found by
+#: :code:`arduino-cli`. Such a step runs alone among the steps using serial ports.
+ANY_SERIAL = serial("*")
+
+
+def _port(method, args, kwargs):
+    if method is not None:
+        try:
+            return inspect.signature(method).bind_partial(*args, **kwargs).arguments.get("port")
+        except (TypeError, ValueError):
+            pass
+    return kwargs.get("port")
+
+
+def resources_of(command, kwargs=None, args=None, method=None):
+    """
+    Guesses the resources a command needs: :data:`DATA_WRITER` for the commands installing or updating something,
+    :data:`DATA_READER` for the others, :data:`CPU` for :code:`compile`, and for the commands using a serial port
+    :func:`serial` of their :code:`port`, or :data:`ANY_SERIAL` when it is not given
+
+    :param command: The command path, e.g. :code:`"core install"` or :code:`["lib", "update_index"]`
+    :type command: str or list
+    :param kwargs: The keyword arguments of the wrapper method
+    :type kwargs: dict or NoneType
+    :param args: The positional arguments of the wrapper method
+    :type args: list or NoneType
+    :param method: The wrapper method, needed to find a :code:`port` given as a positional argument, see
+        :func:`pyduinocli.batch.resolve`
+    :type method: callable or NoneType
+    :return: The resource tags
+    :rtype: set
+    """
+    names = command.split() if isinstance(command, str) else list(command)
+    path = tuple(name.replace("_", "-") for name in names)
+    resources = {DATA_WRITER if path in WRITERS else DATA_READER}
+    if path in _CPU_BOUND:
+        resources.add(CPU)
+    if path in _PORT_BOUND:
+        port = _port(method, args or (), kwargs or {})
+        resources.add(serial(port) if port else ANY_SERIAL)
+    return resources
+
+
+class StepReport:
+    """
+    What happened to a step of a :class:`Pipeline`. Times are in seconds, as given by :code:`time.monotonic()`:
+    :code:`ready` is when its dependencies were done, :code:`start` and :code:`end` when it ran. :code:`wait` is the
+    time it waited for its resources and :code:`duration` the time it ran.
+    """
+
+    __slots__ = ("name", "status", "ready", "start", "end", "result", "error")
+
+    def __init__(self, name):
+        """
+        :param name: The name of the step
+        :type name: str
+        """
+        self.name = name
+        self.status = PENDING
+        self.ready = None
+        self.start = None
+        self.end = None
+        self.result = None
+        self.error = None
+
+    @property
+    def wait(self):
+        """
+        The time the step waited for its resources once its dependencies were done, None if it did not run
+
+        :type: float or NoneType
+        """
+        return None if self.start is None else self.start - self.ready
+
+    @property
+    def duration(self):
+        """
+        The time the step ran, None if it did not run
+
+        :type: float or NoneType
+        """
+        return None if self.end is None else self.end - self.start
+
+    def to_dict(self, origin=0.0):
+        """
+        Converts this report to a plain dict
+
+        :param origin: The time the times are made relative to, e.g. the start of the pipeline
+        :type origin: float
+        :return: The :code:`name`, :code:`status`, :code:`start`, :code:`end`, :code:`wait`, :code:`duration` and
+            :code:`error` of the step
+        :rtype: dict
+        """
+        return dict(name=self.name, status=self.status,
+                    start=None if self.start is None else self.start - origin,
+                    end=None if self.end is None else self.end - origin,
+                    wait=self.wait, duration=self.duration,
+                    error=None if self.error is None else "%s: %s" % (type(self.error).__name__, self.error))
+
+
+class PipelineReport:
+    """
+    The outcome of a :class:`Pipeline` run, with a :class:`StepReport` per step
+    """
+
+    def __init__(self, steps, start, end):
+        """
+        :param steps: The reports of the steps, in the order they were added
+        :type steps: dict
+        :param start: The time the pipeline started
+        :type start: float
+        :param end: The time the pipeline ended
+        :type end: float
+        """
+        self.__steps = steps
+        self.__start = start
+        self.__end = end
+
+    @property
+    def steps(self):
+        """
+        The reports of the steps by name, in the order they were added
+
+        :type: dict
+        """
+        return self.__steps
+
+    @property
+    def ok(self):
+        """
+        Whether all the steps succeeded
+
+        :type: bool
+        """
+        return all(step.status == DONE for step in self.__steps.values())
+
+    @property
+    def failed(self):
+        """
+        The steps that failed
+
+        :type: list
+        """
+        return [step for step in self.__steps.values() if step.status == FAILED]
+
+    @property
+    def duration(self):
+        """
+        The time the pipeline took
+
+        :type: float
+        """
+        return self.__end - self.__start
+
+    def __getitem__(self, name):
+        return self.__steps[name]
+
+    def to_dict(self):
+        """
+        Converts this report to a plain dict, the times of the steps being relative to the start of the pipeline
+
+        :return: The :code:`ok` status, the :code:`duration` and the :code:`steps` of the pipeline
+        :rtype: dict
+        """
+        return dict(ok=self.ok, duration=self.duration,
+                    steps=[step.to_dict(self.__start) for step in self.__steps.values()])
+
+
+class _Step:
+
+    __slots__ = ("name", "command", "args", "kwargs", "after", "resources", "timeout")
+
+    def __init__(self, name, command, args, kwargs, after, resources, timeout):
+        self.name = name
+        self.command = command
+        self.args = args
+        self.kwargs = kwargs
+        self.after = after
+        self.resources = resources
+        self.timeout = timeout
+
+
+class Pipeline:
+    """
+    A graph of :code:`arduino-cli` commands run with as much parallelism as their dependencies and resources allow.
+    A step runs once all the steps it comes after succeeded, and when its resources are free: a
+    :data:`DATA_WRITER` runs alone on the data directory, :data:`CPU` steps are limited to the number of CPUs, and
+    each serial port is used by one step at a time. When a step fails, the steps depending on it are skipped while
+    the others go on.
+
+    .. code-block:: python
+
+        pipeline = Pipeline(arduino)
+        pipeline.add("index", "core update-index")
+        pipeline.add("avr", "core install", ["arduino:avr"], after=["index"])
+        pipeline.add("build", "compile", ["Blink"], dict(fqbn="arduino:avr:uno"), after=["avr"])
+        pipeline.add("flash", "upload", ["Blink"], dict(fqbn="arduino:avr:uno", port="/dev/ttyACM0"),
+                     after=["build"])
+        report = pipeline.run()
+        print(report.to_dict())
+    """
+
+    def __init__(self, arduino, capacities=None, workers=None):
+        """
+        :param arduino: The wrapper running the commands
+        :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+        :param capacities: The number of steps that can hold each resource at the same time. By default, the
+            number of CPUs for :data:`CPU`, no limit for :data:`DATA_READER` and 1 for the other resources
+        :type capacities: dict or NoneType
+        :param workers: The max number of steps running at the same time, unbounded if None
+        :type workers: int or NoneType
+        """
+        self.__arduino = arduino
+        self.__capacities = {CPU: os.cpu_count() or 1, DATA_READER: float("inf")}
+        self.__capacities.update(capacities or {})
+        self.__workers = workers
+        self.__steps = dict()
+
+    def add(self, name, command, args=None, kwargs=None, after=(), resources=None, timeout=None):
+        """
+        Adds a step
+
+        :param name: The unique name of the step
+        :type name: str
+        :param command: The command path of the wrapper method (e.g. :code:`"lib install"`, see
+            :func:`pyduinocli.batch.resolve`), or a callable taking the wrapper
+        :type command: str, list or callable
+        :param args: The positional arguments of the wrapper method
+        :type args: list or NoneType
+        :param kwargs: The keyword arguments of the wrapper method
+        :type kwargs: dict or NoneType
+        :param after: The names of the steps that must succeed before this one, they must already be added so that
+            the steps cannot form a cycle
+        :type after: list or tuple
+        :param resources: The resource tags held by the step, guessed from the command if None, see
+            :func:`resources_of`
+        :type resources: set, list or NoneType
+        :param timeout: The max time the step can take, in seconds
+        :type timeout: float or NoneType
+        :return: This pipeline, to chain the calls
+        :rtype: Pipeline
+        """
+        if name in self.__steps:
+            raise ValueError("Duplicate step: %s" % name)
+        for dependency in after:
+            if dependency not in self.__steps:
+                raise ValueError("Step %s comes after an unknown step: %s" % (name, dependency))
+        if callable(command):
+            resources = set() if resources is None else set(resources)
+        else:
+            method = resolve(self.__arduino, command)
+            resources = resources_of(command, kwargs, args, method) if resources is None else set(resources)
+        for resource in resources:
+            if self.__capacity(resource) < 1:
+                raise ValueError("Step %s needs a resource without capacity: %s" % (name, resource))
+        self.__steps[name] = _Step(name, command, list(args or []), dict(kwargs or {}), tuple(after), resources,
+                                   timeout)
+        return self
+
+    def __capacity(self, resource):
+        return self.__capacities.get(resource, 1)
+
+    def __fits(self, step, held):
+        for resource in step.resources:
+            if held.get(resource, 0) >= self.__capacity(resource):
+                return False
+        if any(resource.startswith(_SERIAL) for resource in step.resources):
+            ports = {resource for resource, count in held.items() if count and resource.startswith(_SERIAL)}
+            if ports and (ANY_SERIAL in step.resources or ANY_SERIAL in ports):
+                return False
+        if DATA_WRITER in step.resources and held.get(DATA_READER, 0):
+            return False
+        if DATA_READER in step.resources and held.get(DATA_WRITER, 0):
+            return False
+        return True
+
+    def __run_step(self, step, report, cancel):
+        report.start = time.monotonic()
+        try:
+            with self.__arduino.span("step " + step.name):
+                with Deadline(timeout=step.timeout, cancel=cancel):
+                    if callable(step.command):
+                        return step.command(self.__arduino, *step.args, **step.kwargs)
+                    return resolve(self.__arduino, step.command)(*step.args, **step.kwargs)
+        finally:
+            report.end = time.monotonic()
+
+    def run(self, cancel=None):
+        """
+        Runs the steps, the steps that are ready run in the order they were added
+
+        :param cancel: A token to cancel the pipeline, the running commands are stopped and the others skipped
+        :type cancel: pyduinocli.executors.deadline.CancellationToken or NoneType
+        :return: The report of the run
+        :rtype: PipelineReport
+        """
+        cancel = cancel or CancellationToken()
+        steps = list(self.__steps.values())
+        order = {step.name: index for index, step in enumerate(steps)}
+        reports = {step.name: StepReport(step.name) for step in steps}
+        dependents = {step.name: [] for step in steps}
+        missing = dict()
+        for step in steps:
+            missing[step.name] = len(step.after)
+            for dependency in step.after:
+                dependents[dependency].append(step)
+        start = time.monotonic()
+        ready = [step for step in steps if not step.after]
+        for step in ready:
+            reports[step.name].ready = start
+        held = dict()
+        running = dict()
+
+        def skip(step):
+            for dependent in dependents[step.name]:
+                if reports[dependent.name].status == PENDING:
+                    reports[dependent.name].status = SKIPPED
+                    skip(dependent)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.__workers or len(steps) or 1,
+                                                   thread_name_prefix="pyduinocli-pipeline") as pool:
+            while ready or running:
+                for step in list(ready):
+                    if self.__workers is not None and len(running) >= self.__workers:
+                        break
+                    if cancel.cancelled:
+                        ready.remove(step)
+                        reports[step.name].status = SKIPPED
+                        skip(step)
+                    elif self.__fits(step, held):
+                        ready.remove(step)
+                        for resource in step.resources:
+                            held[resource] = held.get(resource, 0) + 1
+                        running[pool.submit(self.__run_step, step, reports[step.name], cancel)] = step
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                now = time.monotonic()
+                for future in done:
+                    step = running.pop(future)
+                    for resource in step.resources:
+                        held[resource] -= 1
+                    report = reports[step.name]
+                    try:
+                        report.result = future.result()
+                        report.status = DONE
+                    except Exception as e:
+                        report.error = e
+                        report.status = FAILED
+                        skip(step)
+                        continue
+                    for dependent in dependents[step.name]:
+                        missing[dependent.name] -= 1
+                        if missing[dependent.name] == 0 and reports[dependent.name].status == PENDING:
+                            reports[dependent.name].ready = now
+                            ready.append(dependent)
+                ready.sort(key=lambda step: order[step.name])
+        return PipelineReport(reports, start, time.monotonic())
@@ -0,0 +1,395 @@
+import collections
+import http.server
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+from pyduinocli.batch import BatchJobError, resolve, run_job
+from pyduinocli.executors.deadline import CancellationToken
+
+#: The commands the service runs by default, the ones that block until stopped (e.g. :code:`monitor`,
+#: :code:`daemon`) or change the configuration are left out
+DEFAULT_COMMANDS = ("board", "burn-bootloader", "cache", "compile", "core", "lib", "outdated", "sketch", "update",
+                    "upgrade", "upload", "version")
+
+#: Status of a job waiting in the queue
+QUEUED = "queued"
+#: Status of a job being run
+RUNNING = "running"
+#: Status of a job that ran, successfully or not
+DONE = "done"
+#: Status of a job cancelled before it ran
+CANCELLED = "cancelled"
+
+
+class ServiceFullError(Exception):
+    """
+    Raised when a job is submitted while the queue of the service is full, or once the service is closed
+    """
+    pass
+
+
+class _Job:
+
+    __slots__ = ("id", "command", "args", "kwargs", "timeout", "priority", "status", "submitted", "started",
+                 "finished", "outcome", "cancel", "done")
+
+    def __init__(self, id, command, args, kwargs, timeout, priority):
+        self.id = id
+        self.command = command
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+        self.priority = priority
+        self.status = QUEUED
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.outcome = None
+        self.cancel = CancellationToken()
+        self.done = threading.Event()
+
+    def describe(self):
+        description = dict(id=self.id, command=self.command, priority=self.priority, status=self.status,
+                           submitted=self.submitted, started=self.started, finished=self.finished)
+        if self.outcome is not None:
+            description.update(ok=self.outcome["ok"], duration=self.outcome["duration"])
+            description.update((key, self.outcome[key]) for key in ("result", "error") if key in self.outcome)
+        return description
+
+
+class JobService:
+    """
+    Runs :code:`arduino-cli` jobs submitted by several clients on one shared wrapper, with a bounded priority queue
+    and a pool of worker threads, so that all the clients share the same warm caches. See :func:`serve` for the HTTP
+    interface.
+
+    .. code-block:: python
+
+        service = JobService(pyduinocli.Arduino("./arduino-cli", cache_results=True))
+        job = service.submit("compile", ["Blink"], dict(fqbn="arduino:avr:uno"), priority=10)
+        print(service.wait(job, timeout=60))
+    """
+
+    def __init__(self, arduino, workers=None, max_queue=1024, history=1024, commands=DEFAULT_COMMANDS):
+        """
+        :param arduino: The wrapper running the jobs
+        :type arduino: pyduinocli.commands.arduino.ArduinoCliCommand
+        :param workers: The number of jobs running at the same time, the number of CPUs if None
+        :type workers: int or NoneType
+        :param max_queue: The max number of jobs waiting to run
+        :type max_queue: int
+        :param history: The number of finished jobs kept for their status to be read
+        :type history: int
+        :param commands: The first names of the command paths that can be run, e.g. :code:`"lib"` for all the
+            :code:`lib` commands
+        :type commands: tuple
+        """
+        self.__arduino = arduino
+        self.__commands = frozenset(commands)
+        self.__queue = queue.PriorityQueue(max_queue)
+        self.__jobs = dict()
+        self.__finished = collections.deque()
+        self.__history = history
+        self.__ids = itertools.count(1)
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__workers = [threading.Thread(target=self.__work, name="pyduinocli-service-%d" % i, daemon=True)
+                          for i in range(workers or os.cpu_count() or 4)]
+        for worker in self.__workers:
+            worker.start()
+
+    @property
+    def arduino(self):
+        """
+        The wrapper running the jobs
+
+        :type: pyduinocli.commands.arduino.ArduinoCliCommand
+        """
+        return self.__arduino
+
+    def submit(self, command, args=None, kwargs=None, priority=0, timeout=None):
+        """
+        Queues a job
+
+        :param command: The command path, e.g. :code:`"board list"`, see :func:`pyduinocli.batch.resolve`
+        :type command: str or list
+        :param args: The positional arguments of the wrapper method
+        :type args: list or NoneType
+        :param kwargs: The keyword arguments of the wrapper method
+        :type kwargs: dict or NoneType
+        :param priority: The jobs with the highest priority run first, in submission order
+        :type priority: int
+        :param timeout: The max time the job can take once started, in seconds
+        :type timeout: float or NoneType
+        :return: The ID of the job
+        :rtype: str
+        """
+        names = command.split() if isinstance(command, str) else list(command)
+        if not names or names[0] not in self.__commands:
+            raise BatchJobError("Command not allowed: %s" % " ".join(map(str, names)))
+        resolve(self.__arduino, names)
+        if args is not None and not isinstance(args, list) or kwargs is not None and not isinstance(kwargs, dict):
+            raise BatchJobError("args must be an array and kwargs an object")
+        with self.__lock:
+            if self.__closed:
+                raise ServiceFullError("The service is closed")
+            number = next(self.__ids)
+            job = _Job(str(number), " ".join(names), args or [], kwargs or {}, timeout, priority)
+            try:
+                self.__queue.put_nowait((-priority, number, job))
+            except queue.Full:
+                raise ServiceFullError("The queue is full")
+            self.__jobs[job.id] = job
+        return job.id
+
+    def __job(self, job_id):
+        with self.__lock:
+            job = self.__jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        return job
+
+    def status(self, job_id):
+        """
+        Gets the status of a job
+
+        :param job_id: The ID of the job
+        :type job_id: str
+        :return: Its :code:`id`, :code:`command`, :code:`priority`, :code:`status` and submission, start and end
+            times, then its outcome once done, see :func:`pyduinocli.batch.run_job`
+        :rtype: dict
+        """
+        return self.__job(job_id).describe()
+
+    def wait(self, job_id, timeout=None):
+        """
+        Waits for a job to be done or cancelled
+
+        :param job_id: The ID of the job
+        :type job_id: str
+        :param timeout: The max time to wait, in seconds
+        :type timeout: float or NoneType
+        :return: The status of the job, see :meth:`status`
+        :rtype: dict
+        """
+        job = self.__job(job_id)
+        job.done.wait(timeout)
+        return job.describe()
+
+    def cancel(self, job_id):
+        """
+        Cancels a job, its process is killed if it is running
+
+        :param job_id: The ID of the job
+        :type job_id: str
+        :return: The status of the job, see :meth:`status`
+        :rtype: dict
+        """
+        job = self.__job(job_id)
+        with self.__lock:
+            if job.status == QUEUED:
+                self.__finish(job, CANCELLED)
+        job.cancel.cancel()
+        return job.describe()
+
+    def jobs(self):
+        """
+        Gets the status of the known jobs
+
+        :return: The jobs in submission order, see :meth:`status`
+        :rtype: list
+        """
+        with self.__lock:
+            jobs = list(self.__jobs.values())
+        return [job.describe() for job in jobs]
+
+    def stats(self):
+        """
+        Gets the load of the service
+
+        :return: The number of :code:`workers`, of jobs :code:`queued` and :code:`running`, and the queue size
+        :rtype: dict
+        """
+        with self.__lock:
+            statuses = collections.Counter(job.status for job in self.__jobs.values())
+        return dict(workers=len(self.__workers), queued=statuses[QUEUED], running=statuses[RUNNING],
+                    max_queue=self.__queue.maxsize)
+
+    def __finish(self, job, status):
+        job.status = status
+        job.finished = time.time()
+        job.done.set()
+        self.__finished.append(job.id)
+        while len(self.__finished) > self.__history:
+            self.__jobs.pop(self.__finished.popleft(), None)
+
+    def __work(self):
+        while True:
+            _, _, job = self.__queue.get()
+            if job is None:
+                return
+            with self.__lock:
+                if job.status != QUEUED:
+                    continue
+                job.status = RUNNING
+                job.started = time.time()
+            outcome = run_job(self.__arduino, dict(id=job.id, command=job.command, args=job.args,
+                                                   kwargs=job.kwargs, timeout=job.timeout), cancel=job.cancel)
+            with self.__lock:
+                job.outcome = outcome
+                self.__finish(job, DONE)
+
+    def close(self):
+        """
+        Stops the workers once their current job is done, the queued jobs are cancelled
+        """
+        with self.__lock:
+            if self.__closed:
+                return
+            self.__closed = True
+            queued = [job for job in self.__jobs.values() if job.status == QUEUED]
+            for job in queued:
+                self.__finish(job, CANCELLED)
+        for _ in self.__workers:
+            self.__queue.put((float("-inf"), next(self.__ids), None))
+        for worker in self.__workers:
+            worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    server_version = "pyduinocli"
+
+    MAX_WAIT = 300.0
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            http.server.BaseHTTPRequestHandler.log_message(self, format, *args)
+
+    def __reply(self, code, body, headers=()):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def __error(self, code, message, headers=()):
+        self.__reply(code, dict(error=message), headers)
+
+    def __body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return dict()
+        body = json.loads(self.rfile.read(length))
+        if not isinstance(body, dict):
+            raise ValueError("The body must be an object")
+        return body
+
+    def __route(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part) for part in url.path.split("/") if part]
+        query = urllib.parse.parse_qs(url.query)
+        wait = query.get("wait")
+        wait = min(float(wait[0]), _Handler.MAX_WAIT) if wait else None
+        return parts, wait
+
+    def __submit(self, command, body, wait):
+        service = self.server.service
+        try:
+            job_id = service.submit(command, body.get("args"), body.get("kwargs"),
+                                    priority=int(body.get("priority", 0)), timeout=body.get("timeout"))
+        except ServiceFullError as e:
+            return self.__error(503, str(e), [("Retry-After", "1")])
+        if wait is None:
+            return self.__reply(202, service.status(job_id), [("Location", "/jobs/" + job_id)])
+        return self.__reply(200, service.wait(job_id, wait))
+
+    def do_GET(self):
+        service = self.server.service
+        try:
+            parts, wait = self.__route()
+            if parts == ["health"]:
+                return self.__reply(200, service.stats())
+            if parts == ["metrics"] and service.arduino.metrics is not None:
+                data = service.arduino.metrics.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                return self.wfile.write(data)
+            if parts == ["jobs"]:
+                return self.__reply(200, service.jobs())
+            if len(parts) == 2 and parts[0] == "jobs":
+                return self.__reply(200, service.status(parts[1]) if wait is None else service.wait(parts[1], wait))
+            self.__error(404, "Not found")
+        except KeyError:
+            self.__error(404, "Unknown job")
+        except ValueError as e:
+            self.__error(400, str(e))
+
+    def do_POST(self):
+        try:
+            parts, wait = self.__route()
+            body = self.__body()
+            if parts == ["jobs"]:
+                return self.__submit(body.get("command"), body, wait)
+            if len(parts) >= 2 and parts[0] == "run":
+                return self.__submit(parts[1:], body, wait)
+            self.__error(404, "Not found")
+        except (ValueError, TypeError) as e:
+            self.__error(400, str(e))
+
+    def do_DELETE(self):
+        try:
+            parts, _ = self.__route()
+            if len(parts) == 2 and parts[0] == "jobs":
+                return self.__reply(200, self.server.service.cancel(parts[1]))
+            self.__error(404, "Not found")
+        except KeyError:
+            self.__error(404, "Unknown job")
+
+
+def serve(service, host="127.0.0.1", port=8080, verbose=False):
+    """
+    Creates an HTTP server for a :class:`JobService`, to be run with :code:`serve_forever()`. It speaks JSON:
+
+    * :code:`POST /jobs` with :code:`{"command": "compile", "args": [...], "kwargs": {...}, "priority": 0,
+      "timeout": null}` queues a job and answers :code:`202` with its status, or :code:`503` when the queue is full
+    * :code:`POST /run/<command>/<path>`, e.g. :code:`/run/board/list`, does the same with the command in the URL
+    * :code:`GET /jobs/<id>` gets the status of a job, :code:`DELETE /jobs/<id>` cancels it
+    * :code:`GET /jobs` lists the known jobs, :code:`GET /health` gives the load of the service, and
+      :code:`GET /metrics` the Prometheus metrics when the wrapper collects them
+
+    Adding :code:`?wait=<seconds>` to a submission or a status request holds the answer until the job is done or the
+    time is up (long polling).
+
+    :param service: The service running the jobs
+    :type service: JobService
+    :param host: The address to listen on, only the local machine by default
+    :type host: str
+    :param port: The port to listen on, 0 for any free port
+    :type port: int
+    :param verbose: Log the requests to the standard error
+    :type verbose: bool
+    :return: The server
+    :rtype: http.server.ThreadingHTTPServer
+    """
+    server = http.server.ThreadingHTTPServer((host, port), _Handler)
+    server.daemon_threads = True
+    server.service = service
+    server.verbose = verbose
+    return server
@@ -18,6 +18,11 @@ setuptools.setup(
     packages=setuptools.find_packages(exclude=("tests",)),
     install_requires=[
     ],
+    entry_points={
+        "console_scripts": [
+            "pyduinocli=pyduinocli.__main__:main",
+        ],
+    },
     classifiers=[
         "Programming Language :: Python :: 2",
         "Programming Language :: Python :: 3",
@@ -0,0 +1,26 @@
+from . import *
+import asyncio
+
+
+class TestAsyncArduino(TestBase):
+
+    _async_arduino = pyduinocli.AsyncArduino("./arduino-cli")
+
+    def test_version(self):
+        version = asyncio.run(self._async_arduino.version())["result"]
+        self.assertIsInstance(version, dict)
+        self.assertIn("VersionString", version)
+
+    def test_concurrent(self):
+        async def versions():
+            return await asyncio.gather(*[self._async_arduino.version() for _ in range(5)])
+        for version in asyncio.run(versions()):
+            self.assertIn("VersionString", version["result"])
+
+    def test_error(self):
+        with self.assertRaises(pyduinocli.ArduinoError):
+            asyncio.run(self._async_arduino.board.details("not:a:board"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+from . import *
+import json
+import pyduinocli.batch
+
+
+class TestBatch(TestBase):
+
+    def test_resolve(self):
+        self.assertEqual(pyduinocli.batch.resolve(self._arduino, "lib update-index"),
+                         self._arduino.lib.update_index)
+        for command in ("close", "handle", "lib _run", "", "version nope"):
+            with self.assertRaises(pyduinocli.batch.BatchJobError):
+                pyduinocli.batch.resolve(self._arduino, command)
+
+    def test_run_batch(self):
+        lines = ['{"id": "v", "command": "version"}', '', 'not json', '{"command": "close"}']
+        results = list()
+        succeeded, failed = pyduinocli.batch.run_batch(self._arduino, lines, results.append, jobs=2)
+        self.assertEqual((succeeded, failed), (1, 2))
+        results = {result["id"]: result for result in map(json.loads, results)}
+        self.assertTrue(results["v"]["ok"])
+        self.assertIn("VersionString", results["v"]["result"])
+        self.assertEqual(results[3]["error"]["type"], "BatchJobError")
+        self.assertFalse(results[4]["ok"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+from . import *
+import os
+import tempfile
+from pyduinocli.commands.bootstrap import read_directories, ensure_directories
+from pyduinocli.constants import paths
+
+
+class TestBootstrap(TestBase):
+
+    def test_shared_state(self):
+        arduino = pyduinocli.Arduino("./arduino-cli")
+        self.assertIs(arduino._context, self._arduino._context)
+        self.assertEqual(arduino._base_args, self._arduino._base_args)
+
+    def test_read_directories(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "arduino-cli.yaml")
+            with open(config_file, "w") as config:
+                config.write("directories:\n"
+                             "    builtin:\n"
+                             "        libraries: /builtin\n"
+                             "    data: /data\n"
+                             "    user: '/user'\n"
+                             "logging:\n"
+                             "    level: info\n")
+            self.assertEqual(read_directories(config_file), {"data": "/data", "user": "/user"})
+            self.assertEqual(read_directories(os.path.join(directory, "missing.yaml")), dict())
+
+    def test_ensure_directories(self):
+        with tempfile.TemporaryDirectory() as directory:
+            config_file = os.path.join(directory, "arduino-cli.yaml")
+            arduino = pyduinocli.Arduino("./arduino-cli", config_file=config_file)
+            directories = read_directories(config_file)
+            self.assertEqual(directories["data"], paths.CLI_DATA_PATH.as_posix())
+            self.assertEqual(directories["user"], paths.CLI_USER_PATH.as_posix())
+            self.assertFalse(ensure_directories(arduino.config, config_file, dict(data=directories["data"])))
+            self.assertTrue(ensure_directories(arduino.config, config_file, dict(data=directory)))
+            self.assertEqual(read_directories(config_file)["data"], directory)
+            arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+from . import *
+import os
+import shutil
+import tempfile
+import threading
+import unittest.mock
+from pyduinocli.executors import builddirs
+from pyduinocli.executors.deadline import Deadline
+
+
+def _listdir(path):
+    # without the lock files
+    return sorted(name for name in os.listdir(path) if not name.startswith("."))
+
+
+class TestBuildDirs(TestBase):
+
+    def test_build_key(self):
+        key = builddirs.build_key("Blink", "arduino:avr:uno")
+        self.assertEqual(key, builddirs.build_key(os.path.abspath("Blink"), "arduino:avr:uno"))
+        self.assertNotEqual(key, builddirs.build_key("Blink", "arduino:avr:mega"))
+        self.assertNotEqual(key, builddirs.build_key("Blink", "arduino:avr:uno", build_properties=["a=b"]))
+        self.assertTrue(key.startswith("Blink-arduino_avr_uno-"))
+
+    def test_eviction(self):
+        with tempfile.TemporaryDirectory() as root:
+            directories = builddirs.BuildDirectories(root, max_bytes=2500)
+            for name in ("a", "b", "a", "c"):
+                path = directories.acquire(name)
+                with open(os.path.join(path, "core.a"), "wb") as f:
+                    f.write(b"\0" * 1000)
+                directories.release(name)
+            self.assertEqual(_listdir(root), ["a", "c"])
+            self.assertEqual(directories.stats["hits"], 1)
+            self.assertEqual(directories.stats["evictions"], 1)
+
+    def test_ram(self):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as ram:
+            directories = builddirs.BuildDirectories(root, ram_root=ram, ram_bytes=1500)
+            for name in ("a", "b"):
+                path = directories.acquire(name)
+                self.assertEqual(os.path.dirname(path), ram)
+                with open(os.path.join(path, "core.a"), "wb") as f:
+                    f.write(b"\0" * 1000)
+                directories.release(name)
+            self.assertEqual(_listdir(ram), ["b"])
+            self.assertEqual(_listdir(root), ["a"])
+            self.assertEqual(directories.acquire("a"), os.path.join(root, "a"))
+            directories.release("a")
+
+    def test_spill_unlocked(self):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as ram:
+            directories = builddirs.BuildDirectories(root, ram_root=ram, ram_bytes=500)
+            blocked = []
+            original = shutil.move
+
+            def move(source, target):
+                # the pool stays usable by the other threads while a directory is moved
+                reader = threading.Thread(target=lambda: directories.stats)
+                reader.start()
+                reader.join(2)
+                blocked.append(reader.is_alive())
+                return original(source, target)
+
+            path = directories.acquire("a")
+            with open(os.path.join(path, "core.a"), "wb") as f:
+                f.write(b"\0" * 1000)
+            with unittest.mock.patch.object(builddirs.shutil, "move", move):
+                directories.release("a")
+            self.assertEqual(blocked, [False])
+            self.assertEqual(_listdir(root), ["a"])
+            self.assertEqual(directories.stats["spills"], 1)
+
+    def test_duplicate(self):
+        with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as ram:
+            for directory, mtime in ((root, 1000), (ram, 2000)):
+                os.makedirs(os.path.join(directory, "a"))
+                os.utime(os.path.join(directory, "a"), (mtime, mtime))
+            directories = builddirs.BuildDirectories(root, ram_root=ram)
+            self.assertEqual(_listdir(root), [])
+            self.assertEqual(directories.acquire("a"), os.path.join(ram, "a"))
+            directories.release("a")
+            self.assertEqual(directories.stats["entries"], 1)
+
+    def test_shared_root(self):
+        with tempfile.TemporaryDirectory() as root:
+            first = builddirs.BuildDirectories(root)
+            path = first.acquire("a")
+            with open(os.path.join(path, "core.a"), "wb") as f:
+                f.write(b"\0" * 1000)
+            first.release("a")
+            self.assertEqual(first.acquire("a"), path)
+            # another process sharing the root neither uses nor removes a directory in use
+            second = builddirs.BuildDirectories(root, max_bytes=500)
+            self.assertEqual(_listdir(root), ["a"])
+            with self.assertRaises(pyduinocli.ArduinoTimeoutError):
+                with Deadline(timeout=0.2):
+                    second.acquire("a", Deadline.current())
+            first.release("a")
+            second.acquire("b")
+            second.release("b")
+            self.assertEqual(_listdir(root), ["b"])
+
+    def test_build_dirs(self):
+        with tempfile.TemporaryDirectory() as root:
+            arduino = pyduinocli.Arduino("./arduino-cli", build_dirs=root)
+            arduino.version()
+            self.assertEqual(arduino.build_dirs.stats["entries"], 0)
+            arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+from . import *
+
+
+class TestResultCache(TestBase):
+
+    _cached_arduino = pyduinocli.Arduino("./arduino-cli", cache_results=True)
+
+    def test_hit(self):
+        first = self._cached_arduino.version()["result"]
+        hits = self._cached_arduino.result_cache.stats["hits"]
+        second = self._cached_arduino.version()["result"]
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(self._cached_arduino.result_cache.stats["hits"], hits + 1)
+
+    def test_invalidation(self):
+        self._cached_arduino.config.dump()
+        self._cached_arduino.lib.update_index()
+        misses = self._cached_arduino.result_cache.stats["misses"]
+        self._cached_arduino.config.dump()
+        self.assertEqual(self._cached_arduino.result_cache.stats["misses"], misses + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
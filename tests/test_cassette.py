@@ -0,0 +1,28 @@
+from . import *
+import os
+import tempfile
+
+
+class TestCassette(TestBase):
+
+    def test_record_replay(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cassette = os.path.join(directory, "arduino-cli.cassette")
+            recorder = pyduinocli.Arduino("./arduino-cli", record_to=cassette)
+            expected = recorder.version()["result"]
+            recorder.close()
+            replayer = pyduinocli.Arduino("./missing-arduino-cli", replay_from=cassette)
+            self.assertEqual(replayer.version()["result"], expected)
+            self.assertEqual(replayer.version()["result"], expected)
+            replayer.close()
+
+    def test_unknown_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            replayer = pyduinocli.Arduino("./missing-arduino-cli", replay_from=os.path.join(directory, "empty"))
+            with self.assertRaises(pyduinocli.ArduinoReplayError):
+                replayer.version()
+            replayer.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,21 @@
+from . import *
+import threading
+
+
+class TestCoalescing(TestBase):
+
+    def test_independent_results(self):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self._arduino.version()["result"]))
+                   for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 10)
+        results[0]["VersionString"] = "changed"
+        self.assertTrue(all(result["VersionString"] != "changed" for result in results[1:]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+from . import *
+import os
+import shutil
+import tempfile
+from pyduinocli.executors import compilecache
+
+
+class TestCompileCache(CoreNeedingTest):
+
+    def test_tree_digest(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, "a.ino"), "w") as file:
+                file.write("void setup() {}")
+            digest = compilecache.tree_digest(directory)
+            self.assertEqual(compilecache.tree_digest(directory), digest)
+            with open(os.path.join(directory, "a.ino"), "a") as file:
+                file.write("\n")
+            self.assertNotEqual(compilecache.tree_digest(directory), digest)
+            # a changed file replaces its digest instead of adding one
+            path = os.path.join(os.path.abspath(directory), "a.ino")
+            self.assertEqual(len([key for key in compilecache._digests if key == path]), 1)
+
+    def test_hit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            arduino = pyduinocli.Arduino("./arduino-cli", compile_cache=os.path.join(directory, "cache"))
+            sketch_path = "TestCachedSketch"
+            arduino.sketch.new(sketch_path)
+            try:
+                first = os.path.join(directory, "first")
+                second = os.path.join(directory, "second")
+                arduino.compile(sketch_path, fqbn="arduino:avr:uno", output_dir=first)
+                arduino.compile(sketch_path, fqbn="arduino:avr:uno", output_dir=second)
+                self.assertEqual(arduino.compile_cache.stats["hits"], 1)
+                self.assertEqual(sorted(os.listdir(first)), sorted(os.listdir(second)))
+            finally:
+                shutil.rmtree(sketch_path)
+                arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,17 @@
 from . import *
+import base64
+import json
+import os
 import warnings
+from pyduinocli.commands.board import BoardCommand
+from pyduinocli.commands.compile import CompileCommand
+from pyduinocli.commands.context import CommandContext
+from pyduinocli.commands.core import CoreCommand
+from pyduinocli.commands.lib import LibCommand
+from pyduinocli.commands.version import VersionCommand
+from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.executors.base import ExecutorBase
+from pyduinocli.executors.daemon import DaemonExecutor
 
 
 class TestDaemonCommand(TestBase):
@@ -7,6 +19,159 @@ class TestDaemonCommand(TestBase):
     def test_daemon(self):
         warnings.warn("This is meant to be run in a daemon thread or process, this will hang and cannot be tested")
 
+    def test_start(self):
+        process = self._arduino.daemon.start(port=50099)
+        self.assertIsNone(process.poll())
+        process.terminate()
+        process.wait()
+
+
+class TestDaemonBackend(TestBase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls._daemon_arduino = pyduinocli.Arduino("./arduino-cli", backend="daemon")
+        except ImportError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._daemon_arduino.close()
+
+    def test_version(self):
+        version = self._daemon_arduino.version()["result"]
+        self.assertIsInstance(version, dict)
+        self.assertIn("VersionString", version)
+
+    def test_same_shape(self):
+        expected = self._arduino.lib.list()["result"]
+        result = self._daemon_arduino.lib.list()["result"]
+        self.assertEqual(type(expected), type(result))
+
+
+class TestDaemonPoolBackend(TestBase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls._pool_arduino = pyduinocli.Arduino("./arduino-cli", backend="daemon", daemons=2)
+        except ImportError as e:
+            raise unittest.SkipTest(str(e))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._pool_arduino.close()
+
+    def test_spread(self):
+        for _ in range(4):
+            version = self._pool_arduino.version()["result"]
+            self.assertIn("VersionString", version)
+
+
+class _FakeRpcError(Exception):
+
+    def details(self):
+        return "Platform 'arduino:foo' not found"
+
+
+class _FakeTransport:
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = list()
+
+    def connect(self, address, timeout=None):
+        pass
+
+    def ping(self, timeout=None):
+        return True
+
+    def call(self, method, request, stream=False, deadline=None, on_response=None):
+        self.calls.append((method, request))
+        if method == "Create":
+            return dict(instance=dict(id=1))
+        response = self.responses.get(method, [] if stream else dict())
+        if isinstance(response, Exception):
+            raise response
+        for message in response if stream and on_response is not None else ():
+            on_response(message)
+        return response
+
+    def close(self):
+        pass
+
+
+class _FakeFallback(ExecutorBase):
+
+    def __init__(self):
+        self.commands = list()
+
+    def execute(self, command):
+        self.commands.append(command)
+        return 0, "", ""
+
+
+class TestDaemonTranslation(TestBase):
+
+    __BASE_ARGS = ["arduino-cli", "--format", "json"]
+
+    def __context(self, responses):
+        transport = _FakeTransport(responses)
+        fallback = _FakeFallback()
+        executor = DaemonExecutor(None, address="127.0.0.1:50051", transport=transport, fallback=fallback)
+        return CommandContext(executor), transport, fallback
+
+    def test_compile(self):
+        context, transport, _ = self.__context(dict(Compile=[
+            dict(out_stream=base64.b64encode(b"Compiling sketch...\n").decode()),
+            dict(progress=dict(percent=50)),
+            dict(result=dict(build_path="/tmp/build", executable_sections_size=[dict(name="text", size=444)])),
+        ]))
+        result = CompileCommand(self.__BASE_ARGS, context)("Blink", fqbn="arduino:avr:mega",
+                                                             board_options=dict(cpu="atmega2560"),
+                                                             build_properties=["build.extra_flags=-DX"])["result"]
+        method, request = transport.calls[-1]
+        self.assertEqual(method, "Compile")
+        self.assertEqual(request["sketch_path"], os.path.abspath("Blink"))
+        self.assertEqual(request["fqbn"], "arduino:avr:mega:cpu=atmega2560")
+        self.assertEqual(request["build_properties"], ["build.extra_flags=-DX"])
+        self.assertEqual(request["instance"], dict(id=1))
+        self.assertEqual(result, dict(compiler_out="Compiling sketch...\n", compiler_err="", success=True,
+                                      builder_result=dict(build_path="/tmp/build",
+                                                          executable_sections_size=[dict(name="text", size=444)])))
+
+    def test_board_list(self):
+        ports = [dict(port=dict(address="/dev/ttyACM0", protocol="serial"))]
+        context, transport, _ = self.__context(dict(BoardList=dict(ports=ports)))
+        result = BoardCommand(self.__BASE_ARGS, context).list(discovery_timeout="2s")["result"]
+        self.assertEqual(transport.calls[-1], ("BoardList", dict(timeout=2000, instance=dict(id=1))))
+        self.assertEqual(result, ports)
+
+    def test_install(self):
+        context, transport, fallback = self.__context(dict())
+        BoardCommand(self.__BASE_ARGS, context).list()
+        CoreCommand(self.__BASE_ARGS, context).install(["arduino:avr", "arduino:samd"])
+        LibCommand(self.__BASE_ARGS, context).install(["FastLED", "Servo@1.2.1"])
+        # run by arduino-cli to get its output, then the daemon reloads what they installed
+        self.assertEqual([command[3:5] for command in fallback.commands], [["core", "install"], ["lib", "install"]])
+        self.assertEqual([method for method, _ in transport.calls], ["Create", "Init", "BoardList", "Init", "Init"])
+
+    def test_version(self):
+        context, _, _ = self.__context(dict(Version=dict(version="1.0.4")))
+        result = VersionCommand(self.__BASE_ARGS, context)()["result"]
+        self.assertEqual(set(result), set(self._arduino.version()["result"]))
+        self.assertEqual(set(result), {"Application", "VersionString", "Commit", "Status", "Date"})
+        self.assertEqual(result["VersionString"], "1.0.4")
+
+    def test_error(self):
+        context, _, _ = self.__context(dict(BoardDetails=_FakeRpcError()))
+        with self.assertRaises(ArduinoError) as error:
+            BoardCommand(self.__BASE_ARGS, context).details("arduino:foo:bar")
+        self.assertEqual(error.exception.result["__stderr"], "Platform 'arduino:foo' not found")
+        self.assertEqual(json.loads(error.exception.result["__stdout"]),
+                         dict(error="Platform 'arduino:foo' not found"))
+
 
 if __name__ == '__main__':
     unittest.main()
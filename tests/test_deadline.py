@@ -0,0 +1,26 @@
+from . import *
+import threading
+
+
+class TestDeadline(TestBase):
+
+    def test_timeout(self):
+        with self.assertRaises(pyduinocli.ArduinoTimeoutError):
+            with pyduinocli.Deadline(timeout=2):
+                self._arduino.board.list(watch=True)
+
+    def test_cancel(self):
+        token = pyduinocli.CancellationToken()
+        threading.Timer(1, token.cancel).start()
+        with self.assertRaises(pyduinocli.ArduinoCancelledError):
+            with pyduinocli.Deadline(cancel=token):
+                self._arduino.board.list(watch=True)
+
+    def test_in_time(self):
+        with pyduinocli.Deadline(timeout=60):
+            version = self._arduino.version()["result"]
+        self.assertIn("VersionString", version)
+
+
+if __name__ == '__main__':
+    unittest.main()
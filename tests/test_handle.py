@@ -0,0 +1,50 @@
+from . import *
+import itertools
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _version(arduino, _):
+    return arduino.version()["result"]["VersionString"]
+
+
+class TestArduinoHandle(TestBase):
+
+    def test_pickle(self):
+        arduino = pickle.loads(pickle.dumps(self._arduino))
+        self.assertEqual(arduino._base_args, self._arduino._base_args)
+        self.assertIs(arduino, self._arduino.handle.open())
+        self.assertEqual(arduino.version()["result"], self._arduino.version()["result"])
+
+    def test_shared_state(self):
+        arduino = pyduinocli.Arduino._restore(self._arduino.handle.base_args, self._arduino.handle.options)
+        try:
+            self.assertIsNot(arduino, self._arduino)
+            self.assertIs(arduino._executor, self._arduino._executor)
+        finally:
+            arduino.close()
+        self.assertEqual(self._arduino.version()["result"], pickle.loads(pickle.dumps(arduino)).version()["result"])
+
+    def test_process_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            options = dict(self._arduino.handle.options, record_to=os.path.join(directory, "calls.jsonl"),
+                           trace_file=os.path.join(directory, "trace.json"))
+            arduino = pyduinocli.Arduino._restore(self._arduino.handle.base_args, options, os.getpid() + 1)
+            try:
+                arduino.version()
+            finally:
+                arduino.close()
+            self.assertEqual(sorted(os.listdir(directory)),
+                             ["calls-%d.jsonl" % os.getpid(), "trace-%d.json" % os.getpid()])
+
+    def test_process_pool(self):
+        expected = self._arduino.version()["result"]["VersionString"]
+        with ProcessPoolExecutor(2) as pool:
+            versions = set(pool.map(_version, itertools.repeat(self._arduino), range(4)))
+        self.assertEqual(versions, {expected})
+
+
+if __name__ == '__main__':
+    unittest.main()
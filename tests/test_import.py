@@ -0,0 +1,20 @@
+from . import *
+import subprocess
+import sys
+
+
+class TestImport(unittest.TestCase):
+
+    def test_no_heavy_imports(self):
+        probe = "import sys; before = set(sys.modules); import pyduinocli; print(' '.join(set(sys.modules) - before))"
+        modules = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout
+        for module in ("requests", "zipfile", "pkgutil", "asyncio", "grpc", "orjson"):
+            self.assertNotIn(module, modules.split())
+
+    def test_lazy_commands(self):
+        arduino = TestBase._arduino
+        self.assertIs(arduino.board, arduino.board)
+
+
+if __name__ == '__main__':
+    unittest.main()
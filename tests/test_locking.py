@@ -0,0 +1,79 @@
+from . import *
+import os
+import tempfile
+import threading
+import time
+from pyduinocli.executors import locking
+
+
+class TestLocking(TestBase):
+
+    def test_lock_mode(self):
+        self.assertEqual(locking.lock_mode(["arduino-cli", "core", "install", "arduino:avr"]), locking.EXCLUSIVE)
+        self.assertEqual(locking.lock_mode(["arduino-cli", "lib", "update-index"]), locking.EXCLUSIVE)
+        self.assertEqual(locking.lock_mode(["arduino-cli", "compile", "-b", "arduino:avr:uno", "sketch"]),
+                         locking.SHARED)
+        self.assertEqual(locking.lock_mode(["arduino-cli", "cache", "clean"]), locking.EXCLUSIVE)
+        self.assertIsNone(locking.lock_mode(["arduino-cli", "version"]))
+        self.assertIsNone(locking.lock_mode(["arduino-cli", "board", "list", "--watch"]))
+
+    def test_exclusive(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lock = locking.FileLock(os.path.join(directory, "lock"))
+            first = lock.acquire(False)
+            second = lock.acquire(False)
+            acquired = threading.Event()
+
+            def writer():
+                locking.FileLock.release(lock.acquire(True))
+                acquired.set()
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            self.assertFalse(acquired.wait(0.1))
+            locking.FileLock.release(first)
+            locking.FileLock.release(second)
+            self.assertTrue(acquired.wait(5))
+            thread.join()
+
+    def test_writer_not_starved(self):
+        with tempfile.TemporaryDirectory() as directory:
+            lock = locking.FileLock(os.path.join(directory, "lock"))
+            stop = threading.Event()
+            acquired = threading.Event()
+
+            def reader():
+                # the readers overlap, so that the lock is never free
+                while not stop.is_set():
+                    descriptor = lock.acquire(False)
+                    time.sleep(0.02)
+                    locking.FileLock.release(descriptor)
+
+            readers = [threading.Thread(target=reader) for _ in range(3)]
+            for thread in readers:
+                thread.start()
+                time.sleep(0.007)
+
+            def writer():
+                locking.FileLock.release(lock.acquire(True))
+                acquired.set()
+
+            thread = threading.Thread(target=writer, daemon=True)
+            thread.start()
+            try:
+                self.assertTrue(acquired.wait(5))
+            finally:
+                stop.set()
+                for reader_thread in readers:
+                    reader_thread.join()
+            thread.join()
+
+    def test_lock_wait(self):
+        arduino = pyduinocli.Arduino("./arduino-cli", file_locks=True)
+        self.assertIsNone(arduino.version().lock_wait)
+        self.assertGreaterEqual(arduino.core.list().lock_wait, 0)
+        arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
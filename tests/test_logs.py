@@ -0,0 +1,55 @@
+from . import *
+from pyduinocli.commands.logs import breakdown, phase_of, STARTUP
+
+
+class TestLogTimings(TestBase):
+
+    def test_phase_of(self):
+        self.assertEqual(phase_of("Loading index file: package_index.json"), "index")
+        self.assertEqual(phase_of("Downloading tool avrdude"), "download")
+        self.assertEqual(phase_of("Starting discovery builtin:serial-discovery"), "discovery")
+
+    def test_phase_of_log_lines(self):
+        lines = dict(
+            cli=["Executing `arduino-cli compile --fqbn arduino:avr:uno Blink`",
+                 "Using config file: /home/user/.arduino15/arduino-cli.yaml"],
+            download=["Downloading missing tool builtin:serial-discovery@1.4.1"],
+            index=["Loading index file: /home/user/.arduino15/package_index.json"],
+            platforms=["Loading hardware from: /home/user/.arduino15/packages",
+                       "Loading package arduino from: /home/user/.arduino15/packages/arduino/hardware",
+                       "Loading tools from dir: /home/user/.arduino15/packages/arduino/tools",
+                       "Loading platform release arduino:avr@1.8.6"],
+            libraries=["Adding libraries dir dir=/home/user/Arduino/libraries location=user"],
+            discovery=["Starting discovery builtin:serial-discovery process",
+                       "Sending command START_SYNC to discovery builtin:serial-discovery"],
+            toolchain=["Compile Blink for arduino:avr:uno started",
+                       "Compiling core", "Compiling libraries...", "Linking everything together...",
+                       "Running recipe: recipe.hooks.core.prebuild.1.pattern",
+                       "Running recipe: recipe.c.combine.pattern for board arduino:avr:uno",
+                       "Executing command: avrdude -Cavrdude.conf -v -patmega328p -carduino -P/dev/ttyACM0",
+                       "Upload Blink on /dev/ttyACM0 started"],
+        )
+        for phase, messages in lines.items():
+            for message in messages:
+                self.assertEqual(phase_of(message), phase, message)
+
+    def test_breakdown(self):
+        entries = [dict(msg="Loading index file", elapsed=0.1), dict(msg="Loading libraries", elapsed=0.3)]
+        phases = breakdown(entries, 1.0)
+        self.assertEqual(list(phases), [STARTUP, "index", "libraries"])
+        self.assertAlmostEqual(phases[STARTUP], 0.1)
+        self.assertAlmostEqual(phases["index"], 0.2)
+        self.assertAlmostEqual(phases["libraries"], 0.7)
+
+    def test_result_phases(self):
+        arduino = pyduinocli.Arduino("./arduino-cli", log_timings=True)
+        result = arduino.core.list()
+        self.assertIsInstance(result.phases, dict)
+        self.assertIn(STARTUP, result.phases)
+        self.assertIsInstance(result.log, list)
+        self.assertIsNone(self._arduino.version().phases)
+        arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+from . import *
+import os
+import shutil
+import contextlib
+import tempfile
+from pyduinocli.commands.matrix import compile_matrix
+
+
+class TestCompileMatrix(CoreNeedingTest):
+
+    def test_compile_matrix(self):
+        sketch_path = "TestMatrixSketch"
+        self._arduino.sketch.new(sketch_path)
+        try:
+            with tempfile.TemporaryDirectory() as directory:
+                targets = ["arduino:avr:uno", dict(fqbn="arduino:avr:mega", board_options=dict(cpu="atmega2560")),
+                           dict(name="unknown", fqbn="arduino:avr:unknown")]
+                results = {result.name: result for result in
+                           self._arduino.compile_matrix(sketch_path, targets, max_workers=2, output_root=directory)}
+                self.assertEqual(set(results), {"arduino_avr_uno", "arduino_avr_mega_cpu_atmega2560", "unknown"})
+                self.assertTrue(results["arduino_avr_uno"].ok)
+                self.assertTrue(os.listdir(results["arduino_avr_uno"].output_dir))
+                self.assertTrue(results["arduino_avr_mega_cpu_atmega2560"].ok)
+                self.assertFalse(results["unknown"].ok)
+                self.assertIsInstance(results["unknown"].error, pyduinocli.ArduinoError)
+        finally:
+            shutil.rmtree(sketch_path)
+
+
+class _FakeArduino:
+
+    def __init__(self, compile_scheduler=None):
+        self.compile_scheduler = compile_scheduler
+        self.jobs = []
+
+    def span(self, name, **args):
+        return contextlib.nullcontext()
+
+    def compile(self, sketch, **arguments):
+        self.jobs.append(arguments.get("jobs"))
+        return dict()
+
+
+class TestCompileMatrixJobs(unittest.TestCase):
+
+    def test_jobs(self):
+        arduino = _FakeArduino()
+        list(compile_matrix(arduino, "Sketch", ["a:b:c", "a:b:d"], max_workers=2))
+        self.assertEqual(arduino.jobs, [max(1, (os.cpu_count() or 1) // 2)] * 2)
+        arduino = _FakeArduino()
+        list(compile_matrix(arduino, "Sketch", ["a:b:c"], max_workers=2, jobs=3))
+        self.assertEqual(arduino.jobs, [3])
+        arduino = _FakeArduino(compile_scheduler=object())
+        list(compile_matrix(arduino, "Sketch", ["a:b:c"]))
+        self.assertEqual(arduino.jobs, [None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+from . import *
+from pyduinocli.commands.hooks import CommandHook
+from pyduinocli.commands.metrics import MetricsRegistry
+
+
+class _RecordingHook(CommandHook):
+
+    def __init__(self):
+        self.events = list()
+
+    def before(self, call):
+        self.events.append(("before", call.path))
+
+    def after(self, call):
+        self.events.append(("after", call.path, call.returncode))
+
+    def error(self, call, error):
+        self.events.append(("error", call.path, type(error)))
+
+
+class TestMetrics(TestBase):
+
+    def test_hooks(self):
+        hook = _RecordingHook()
+        self._arduino.add_hook(hook)
+        try:
+            self._arduino.version()
+            with self.assertRaises(pyduinocli.ArduinoError):
+                self._arduino.lib.install(["--not-a-library--"])
+        finally:
+            self._arduino.remove_hook(hook)
+        self.assertEqual(hook.events, [
+            ("before", "version"), ("after", "version", 0),
+            ("before", "lib install"), ("error", "lib install", pyduinocli.ArduinoError),
+        ])
+
+    def test_registry(self):
+        metrics = MetricsRegistry()
+        self._arduino.add_hook(metrics)
+        try:
+            self._arduino.version()["result"]
+        finally:
+            self._arduino.remove_hook(metrics)
+        version = metrics.snapshot()["version"]
+        self.assertEqual(version["calls"], {0: 1})
+        self.assertEqual(version["duration"]["count"], 1)
+        self.assertEqual(version["parse_time"]["count"], 1)
+        self.assertGreater(version["stdout_bytes"], 0)
+        exported = metrics.to_prometheus()
+        self.assertIn('pyduinocli_commands_total{command="version",returncode="0"} 1', exported)
+        self.assertIn('pyduinocli_command_duration_seconds_bucket{command="version",le="+Inf"} 1', exported)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+from . import *
+import time
+import pyduinocli.batch
+import pyduinocli.pipeline
+
+
+class TestPipeline(TestBase):
+
+    def test_resources(self):
+        self.assertEqual(pyduinocli.pipeline.resources_of("core update_index"), {pyduinocli.pipeline.DATA_WRITER})
+        self.assertEqual(pyduinocli.pipeline.resources_of("compile"),
+                         {pyduinocli.pipeline.DATA_READER, pyduinocli.pipeline.CPU})
+        self.assertIn(pyduinocli.pipeline.serial("/dev/ttyACM0"),
+                      pyduinocli.pipeline.resources_of("upload", dict(port="/dev/ttyACM0")))
+        upload = pyduinocli.batch.resolve(self._arduino, "upload")
+        self.assertIn(pyduinocli.pipeline.serial("/dev/ttyACM1"),
+                      pyduinocli.pipeline.resources_of("upload", None, ["Sketch", "arduino:avr:uno", None, None,
+                                                                       "/dev/ttyACM1"], upload))
+        self.assertIn(pyduinocli.pipeline.ANY_SERIAL, pyduinocli.pipeline.resources_of("upload", dict(fqbn="a:b:c")))
+
+    def test_any_serial(self):
+        pipeline = pyduinocli.pipeline.Pipeline(self._arduino)
+        pipeline.add("acm0", lambda arduino: time.sleep(0.2), resources=[pyduinocli.pipeline.serial("/dev/ttyACM0")])
+        pipeline.add("acm1", lambda arduino: time.sleep(0.2), resources=[pyduinocli.pipeline.serial("/dev/ttyACM1")])
+        pipeline.add("any", lambda arduino: time.sleep(0.2), resources=[pyduinocli.pipeline.ANY_SERIAL])
+        report = pipeline.run()
+        self.assertTrue(report.ok)
+        self.assertLess(report["acm1"].start, report["acm0"].end)
+        self.assertGreaterEqual(report["any"].start, max(report["acm0"].end, report["acm1"].end))
+
+    def test_run(self):
+        pipeline = pyduinocli.pipeline.Pipeline(self._arduino)
+        pipeline.add("version", "version")
+        pipeline.add("list", "core list", after=["version"])
+        pipeline.add("fail", lambda arduino: 1 / 0)
+        pipeline.add("skipped", "version", after=["fail"])
+        report = pipeline.run()
+        self.assertFalse(report.ok)
+        self.assertEqual(report["version"].status, pyduinocli.pipeline.DONE)
+        self.assertEqual(report["list"].status, pyduinocli.pipeline.DONE)
+        self.assertGreaterEqual(report["list"].start, report["version"].end)
+        self.assertEqual(report["fail"].status, pyduinocli.pipeline.FAILED)
+        self.assertEqual(report["skipped"].status, pyduinocli.pipeline.SKIPPED)
+        self.assertEqual(len(report.to_dict()["steps"]), 4)
+
+    def test_unknown_dependency(self):
+        with self.assertRaises(ValueError):
+            pyduinocli.pipeline.Pipeline(self._arduino).add("list", "core list", after=["missing"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+from . import *
+from pyduinocli.executors.base import SubprocessExecutor
+from pyduinocli.executors.progress import ProgressParser, DOWNLOAD, OUTPUT, STAGE, TASK, UPLOAD
+from pyduinocli.executors.textmode import json_output, text_command
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+
+
+class TestProgress(CoreNeedingTest):
+
+    def test_compile(self):
+        events = []
+        sketch_path = "TestProgressSketch"
+        self._arduino.sketch.new(sketch_path)
+        result = self._arduino.compile(sketch_path, fqbn="arduino:avr:uno", verbose=True, on_progress=events.append)
+        shutil.rmtree(sketch_path)
+        self.assertTrue(result["result"])
+        for event in events:
+            self.assertIsInstance(event, pyduinocli.ProgressEvent)
+        self.assertTrue([event for event in events if event.kind in (STAGE, OUTPUT)])
+        self.assertFalse([event for event in events if event.kind == DOWNLOAD])
+
+    def test_parser(self):
+        events = []
+        parser = ProgressParser(pyduinocli.Progress(events.append))
+        parser.feed(b"Compiling sketch...\nWriting | ####    | 50% 0.1")
+        parser.feed(b"0s\rarduino:avr@1.8.6 1.00 MiB / 4.00 MiB  25.00% 00m01s\n")
+        self.assertEqual([(e.kind, e.name, e.percent) for e in events],
+                         [(STAGE, "sketch", None), (UPLOAD, "writing", 50.0), (DOWNLOAD, "arduino:avr@1.8.6", 25.0)])
+
+
+    def test_json_output(self):
+        events = []
+        parser = ProgressParser(pyduinocli.Progress(events.append))
+        output = json.dumps(dict(compiler_out="Compiling sketch...\nSketch uses 444 bytes (1%) of program storage "
+                                              "space. Maximum is 32256 bytes.\n",
+                                 compiler_err="", builder_result=dict(build_path="/tmp/build"), success=True),
+                            indent=2).encode()
+        parser.feed(output, "stdout", report_output=False)
+        parser.flush()
+        self.assertEqual(events, [])
+        parser.output(output)
+        self.assertEqual([(e.kind, e.name, e.percent) for e in events],
+                         [(STAGE, "sketch", None), (OUTPUT, None, None)])
+
+
+_SLOW_INSTALL = """#!%s
+import os, sys, time
+if sys.argv[sys.argv.index("--format") + 1] != "text":
+    sys.exit(2)
+print("Installing arduino:avr@1.8.6...", flush=True)
+time.sleep(1)
+open(os.environ["FAKE_DONE"], "w").close()
+print("arduino:avr@1.8.6 installed", flush=True)
+"""
+
+_COMPILE_OUTPUT = """Compiling sketch...
+Sketch uses 924 bytes (2%) of program storage space. Maximum is 32256 bytes.
+Global variables use 9 bytes (0%) of dynamic memory, leaving 2039 bytes for local variables. Maximum is 2048 bytes.
+
+Used library Version Path
+Servo        1.2.1   /home/user/Arduino/libraries/Servo
+
+Used platform Version Path
+arduino:avr  1.8.6   /home/user/.arduino15/packages/arduino/hardware/avr/1.8.6
+"""
+
+
+class TestTextMode(unittest.TestCase):
+
+    @unittest.skipIf(os.name == "nt", "needs an executable script")
+    def test_live(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cli = os.path.join(directory, "arduino-cli")
+            with open(cli, "w") as f:
+                f.write(_SLOW_INSTALL % sys.executable)
+            os.chmod(cli, os.stat(cli).st_mode | stat.S_IEXEC)
+            done = os.path.join(directory, "done")
+            os.environ["FAKE_DONE"] = done
+            events = []
+
+            def callback(event):
+                events.append((event.kind, event.name, event.percent, os.path.exists(done)))
+
+            try:
+                with pyduinocli.Progress(callback):
+                    returncode, stdout, stderr = SubprocessExecutor().execute(
+                        [cli, "--format", "json", "core", "install", "arduino:avr"])
+            finally:
+                del os.environ["FAKE_DONE"]
+        self.assertEqual((returncode, stdout), (0, b""))
+        # the first event arrived while the command was still running
+        self.assertEqual(events, [(TASK, "arduino:avr@1.8.6", 0.0, False), (TASK, "arduino:avr@1.8.6", 100.0, True)])
+
+    def test_text_command(self):
+        self.assertEqual(text_command(["arduino-cli", "--format", "json", "lib", "install", "Servo"]),
+                         ["arduino-cli", "--format", "text", "lib", "install", "Servo"])
+        self.assertIsNone(text_command(["arduino-cli", "--format", "json", "lib", "list"]))
+
+    def test_compile_output(self):
+        command = ["arduino-cli", "--format", "json", "compile", "--build-path", "/tmp/build", "Sketch"]
+        returncode, stdout, stderr = json_output(command, 0, _COMPILE_OUTPUT.encode(), b"warning: unused\n")
+        result = json.loads(stdout)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["compiler_err"], "warning: unused\n")
+        self.assertTrue(result["compiler_out"].startswith("Compiling sketch..."))
+        self.assertNotIn("Used library", result["compiler_out"])
+        builder_result = result["builder_result"]
+        self.assertEqual(builder_result["build_path"], "/tmp/build")
+        self.assertEqual(builder_result["executable_sections_size"],
+                         [dict(name="text", size=924, max_size=32256), dict(name="data", size=9, max_size=2048)])
+        self.assertEqual(builder_result["used_libraries"],
+                         [dict(name="Servo", version="1.2.1", install_dir="/home/user/Arduino/libraries/Servo")])
+        self.assertEqual(builder_result["build_platform"]["id"], "arduino:avr")
+
+    def test_error_output(self):
+        command = ["arduino-cli", "--format", "json", "core", "install", "arduino:unknown"]
+        returncode, stdout, stderr = json_output(command, 1, b"", b"Error during install: Platform not found\n")
+        self.assertEqual(json.loads(stdout), dict(error="Error during install: Platform not found"))
+
+
+if __name__ == '__main__':
+    unittest.main()
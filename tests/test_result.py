@@ -0,0 +1,37 @@
+from . import *
+from pyduinocli.commands.result import CommandResult
+
+
+class TestCommandResult(TestBase):
+
+    _slim_arduino = pyduinocli.Arduino("./arduino-cli", keep_output=False)
+
+    def test_dict_compatible(self):
+        result = self._arduino.version()
+        self.assertEqual(set(result.keys()), {"__stdout", "__stderr", "result"})
+        self.assertIn("VersionString", result["result"])
+        self.assertEqual(result["result"], result.result)
+        self.assertIsInstance(result["__stdout"], str)
+        self.assertEqual(dict(result), result.to_dict())
+
+    def test_lazy(self):
+        result = CommandResult(0, b'{"a": [1, 2]}\r\n', b'')
+        self.assertFalse(result._parsed)
+        self.assertEqual(result["result"], {"a": [1, 2]})
+        self.assertEqual(result["__stdout"], '{"a": [1, 2]}\n')
+        self.assertEqual(CommandResult(0, b'not json', b'')["result"], "not json")
+
+    def test_keep_output(self):
+        result = self._slim_arduino.version()
+        self.assertEqual(list(result.keys()), ["result"])
+        self.assertIn("VersionString", result["result"])
+        self.assertIsNone(result.stdout)
+        with self.assertRaises(KeyError):
+            result["__stdout"]
+        with self.assertRaises(pyduinocli.ArduinoError) as context:
+            self._slim_arduino.board.details("not:a:board")
+        self.assertIn("__stderr", context.exception.result)
+
+
+if __name__ == '__main__':
+    unittest.main()
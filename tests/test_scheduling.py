@@ -0,0 +1,62 @@
+from . import *
+import threading
+import time
+from pyduinocli.errors.arduinoerror import ArduinoError
+from pyduinocli.executors.deadline import Deadline
+from pyduinocli.executors import scheduling
+
+
+class TestScheduling(TestBase):
+
+    def test_slots(self):
+        scheduler = scheduling.CompileScheduler(slots=4, reserved=0)
+        self.assertEqual(scheduler.acquire(3), 3)
+        self.assertEqual(scheduler.acquire(3), 1)
+        self.assertEqual(scheduler.stats()["in_use"], 4)
+        scheduler.release(4)
+        self.assertEqual(scheduler.stats()["in_use"], 0)
+
+    def test_priorities(self):
+        scheduler = scheduling.CompileScheduler(slots=2, reserved=1)
+        self.assertEqual(scheduler.acquire(2, scheduling.BATCH), 1)
+        self.assertEqual(scheduler.acquire(2, scheduling.INTERACTIVE), 1)
+        order = list()
+
+        def build(priority):
+            slots = scheduler.acquire(1, priority)
+            order.append(priority)
+            scheduler.release(slots)
+
+        threads = [threading.Thread(target=build, args=(priority,))
+                   for priority in (scheduling.BATCH, scheduling.CI, scheduling.INTERACTIVE)]
+        for thread in threads:
+            thread.start()
+            while sum(scheduler.stats()["queued"].values()) < threads.index(thread) + 1:
+                time.sleep(0.01)
+        self.assertEqual(scheduler.stats()["queued"][scheduling.CI], 1)
+        scheduler.release(1)
+        scheduler.release(1)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order[0], scheduling.INTERACTIVE)
+        self.assertEqual(order[1:], [scheduling.CI, scheduling.BATCH])
+        self.assertIn('pyduinocli_compile_wait_seconds_count{priority="batch"} 2', scheduler.to_prometheus())
+
+    def test_deadline(self):
+        scheduler = scheduling.CompileScheduler(slots=1)
+        slots = scheduler.acquire()
+        with Deadline(timeout=0.1):
+            self.assertRaises(ArduinoError, scheduler.acquire, deadline=Deadline.current())
+        self.assertEqual(sum(scheduler.stats()["queued"].values()), 0)
+        scheduler.release(slots)
+
+    def test_compile_scheduler(self):
+        arduino = pyduinocli.Arduino("./arduino-cli", compile_scheduler=True)
+        self.assertIs(arduino.compile_scheduler, scheduling.CompileScheduler.shared())
+        arduino.version()
+        self.assertEqual(arduino.compile_scheduler.stats()["in_use"], 0)
+        arduino.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+from . import *
+import json
+import threading
+import urllib.request
+import pyduinocli.batch
+import pyduinocli.service
+
+
+class TestService(TestBase):
+
+    def test_submit(self):
+        with pyduinocli.service.JobService(self._arduino, workers=2) as service:
+            job = service.submit("version")
+            status = service.wait(job, timeout=30)
+            self.assertEqual(status["status"], pyduinocli.service.DONE)
+            self.assertTrue(status["ok"])
+            self.assertIn("VersionString", status["result"])
+            with self.assertRaises(pyduinocli.batch.BatchJobError):
+                service.submit("config set", ["board_manager.additional_urls", "x"])
+            with self.assertRaises(KeyError):
+                service.status("unknown")
+
+    def test_http(self):
+        with pyduinocli.service.JobService(self._arduino, workers=1) as service:
+            server = pyduinocli.service.serve(service, port=0)
+            thread = threading.Thread(target=server.serve_forever)
+            thread.start()
+            try:
+                request = urllib.request.Request("http://127.0.0.1:%d/run/version?wait=30" % server.server_address[1],
+                                                 data=b"{}", method="POST")
+                with urllib.request.urlopen(request) as response:
+                    status = json.loads(response.read())
+                self.assertEqual(status["status"], pyduinocli.service.DONE)
+                self.assertIn("VersionString", status["result"])
+            finally:
+                server.shutdown()
+                server.server_close()
+                thread.join()
+
+
+if __name__ == '__main__':
+    unittest.main()
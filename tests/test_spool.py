@@ -0,0 +1,35 @@
+from . import *
+from pyduinocli.executors.spool import SpooledOutput
+
+
+class TestSpooledOutput(TestBase):
+
+    _spooled_arduino = pyduinocli.Arduino("./arduino-cli", spool_threshold=4096, stderr_limit=1024)
+
+    @classmethod
+    def setUpClass(cls):
+        cls._spooled_arduino.lib.update_index()
+
+    def test_iter_search(self):
+        libraries = list(self._spooled_arduino.lib.iter_search(["Servo"]))
+        self.assertEqual(libraries, self._arduino.lib.search(["Servo"])["result"]["libraries"])
+
+    def test_spooled_result(self):
+        result = self._spooled_arduino.lib.search(["Servo"])
+        self.assertTrue(result.raw_stdout.spooled)
+        self.assertIn("libraries", result["result"])
+
+    def test_threshold(self):
+        output = SpooledOutput(8)
+        try:
+            output.extend(b"12345678")
+            self.assertFalse(output.spooled)
+            output.extend(b"9")
+            self.assertTrue(output.spooled)
+            self.assertEqual(output.getvalue(), b"123456789")
+        finally:
+            output.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
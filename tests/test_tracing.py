@@ -0,0 +1,47 @@
+from . import *
+import json
+import os
+import tempfile
+from pyduinocli.commands.tracing import Tracer
+
+
+class TestTracer(TestBase):
+
+    def test_trace(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tracer = Tracer(os.path.join(directory, "trace-{pid}.json"))
+            self._arduino.add_hook(tracer)
+            try:
+                with tracer.span("versions", count=2):
+                    self._arduino.version()
+                    self._arduino.version()
+            finally:
+                self._arduino.remove_hook(tracer)
+                tracer.close()
+            with open(tracer.path) as trace:
+                events = [event for event in json.load(trace) if event["ph"] == "X"]
+        self.assertEqual([event["name"] for event in events], ["version", "version", "versions"])
+        span = events[-1]
+        for event in events[:-1]:
+            self.assertEqual(event["tid"], span["tid"])
+            self.assertGreaterEqual(event["ts"], span["ts"])
+            self.assertLessEqual(event["ts"] + event["dur"], span["ts"] + span["dur"])
+            self.assertEqual(event["args"]["returncode"], 0)
+
+    def test_pid(self):
+        with tempfile.TemporaryDirectory() as directory:
+            tracer = Tracer(os.path.join(directory, "trace.json"))
+            tracer.close()
+            self.assertEqual(tracer.path, os.path.join(directory, "trace-%d.json" % os.getpid()))
+            with open(tracer.path) as trace:
+                self.assertEqual(json.load(trace)[0]["pid"], os.getpid())
+            # the trace of a previous run is kept
+            second = Tracer(os.path.join(directory, "trace.json"))
+            second.close()
+            self.assertEqual(second.path, os.path.join(directory, "trace-%d.1.json" % os.getpid()))
+            with open(tracer.path) as trace:
+                self.assertEqual(len(json.load(trace)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()